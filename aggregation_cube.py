@@ -0,0 +1,97 @@
+"""
+========================================================================
+                    aggregation_cube.py - קוביית אגרגציה קטגוריה × מדד
+========================================================================
+קובייה מחושבת בעצלות עבור גרסת נתונים אחת: לכל עמודה קטגוריאלית נשמרים
+count, sum, sum of squares, min ו-max לכל העמודות הנומריות בסריקה אחת.
+מכאן נגזרים ממוצע, סטיית תקן ו-value_counts ללא סריקה חוזרת של הנתונים.
+"""
+
+import numpy as np
+import pandas as pd
+
+CUBE_STATS = ('count', 'sum', 'sumsq', 'min', 'max')
+
+
+class AggregationCube:
+    """Memoized per-category aggregates for one dataset version"""
+
+    def __init__(self, df, version):
+        self._df = df
+        self.version = version
+        self.numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        self._slices = {}   # category column -> {stat: DataFrame (category x numeric)}
+        self._sizes = {}    # category column -> row count per category
+
+    def _build_slice(self, cat_col):
+        """Aggregate every numeric column by one category column in a single pass"""
+        codes, uniques = pd.factorize(self._df[cat_col], sort=False)
+        valid = codes >= 0
+        codes_valid = codes[valid]
+        n_groups = len(uniques)
+        index = pd.Index(uniques, name=cat_col)
+
+        self._sizes[cat_col] = pd.Series(
+            np.bincount(codes_valid, minlength=n_groups), index=index, name='count'
+        )
+
+        stats = {name: {} for name in CUBE_STATS}
+        for col in self.numeric_cols:
+            if col == cat_col:
+                continue
+            values = self._df[col].to_numpy(dtype='float64', na_value=np.nan)[valid]
+            present = ~np.isnan(values)
+            group_codes = codes_valid[present]
+            present_values = values[present]
+
+            stats['count'][col] = np.bincount(group_codes, minlength=n_groups)
+            stats['sum'][col] = np.bincount(group_codes, weights=present_values, minlength=n_groups)
+            stats['sumsq'][col] = np.bincount(group_codes, weights=present_values ** 2, minlength=n_groups)
+
+            col_min = np.full(n_groups, np.inf)
+            col_max = np.full(n_groups, -np.inf)
+            np.minimum.at(col_min, group_codes, present_values)
+            np.maximum.at(col_max, group_codes, present_values)
+            empty = stats['count'][col] == 0
+            col_min[empty] = np.nan
+            col_max[empty] = np.nan
+            stats['min'][col] = col_min
+            stats['max'][col] = col_max
+
+        self._slices[cat_col] = {
+            name: pd.DataFrame(values, index=index) for name, values in stats.items()
+        }
+
+    def _slice(self, cat_col):
+        if cat_col not in self._slices:
+            self._build_slice(cat_col)
+        return self._slices[cat_col]
+
+    def stats(self, cat_col, val_col):
+        """count/sum/sumsq/min/max plus derived mean and std per category"""
+        cube = self._slice(cat_col)
+        table = pd.DataFrame({name: cube[name][val_col] for name in CUBE_STATS})
+        count = table['count'].astype('float64')
+        table['mean'] = table['sum'] / count.where(count > 0)
+        variance = (table['sumsq'] - table['sum'] ** 2 / count.where(count > 0)) / (count - 1).where(count > 1)
+        table['std'] = np.sqrt(variance.clip(lower=0))
+        return table
+
+    def mean(self, cat_col, val_col):
+        """Mean of a numeric column per category"""
+        return self.stats(cat_col, val_col)['mean'].rename(val_col)
+
+    def value_counts(self, cat_col):
+        """Row count per category, most frequent first (like Series.value_counts)"""
+        self._slice(cat_col)
+        return self._sizes[cat_col].sort_values(ascending=False, kind='stable')
+
+    def categories(self, cat_col):
+        """Distinct non-missing categories in order of first appearance"""
+        self._slice(cat_col)
+        return self._sizes[cat_col].index.tolist()
+
+    def nunique(self, cat_col):
+        """Number of distinct non-missing categories"""
+        self._slice(cat_col)
+        return len(self._sizes[cat_col])
@@ -0,0 +1,153 @@
+"""
+========================================================================
+                    anomaly.py - זיהוי אנומליות בקנה מידה גדול
+========================================================================
+גרסאות מדרגיות ל-Local Outlier Factor ול-One-Class SVM: LOF עם חיפוש
+שכנים מבוסס עץ על מדגם ייחוס וניקוד במקביל במאגר תהליכונים, ו-One-Class
+SVM עם קירוב גרעין (Nystroem) ומודל one-class לינארי. הבחירה בין המודל
+המדויק למדרגי נעשית אוטומטית לפי גודל הנתונים, כולל הערכת זמן ריצה.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import IsolationForest
+from sklearn.kernel_approximation import Nystroem
+from sklearn.linear_model import SGDOneClassSVM
+from sklearn.neighbors import LocalOutlierFactor
+from sklearn.svm import OneClassSVM
+
+METHODS = ("Isolation Forest", "Local Outlier Factor", "One-Class SVM")
+
+# Above these row counts the exact models are replaced by the scalable ones
+EXACT_ROW_LIMITS = {
+    "Local Outlier Factor": 50000,
+    "One-Class SVM": 10000,
+}
+
+# Scalable LOF: size of the reference set the neighbor tree is built on
+LOF_REFERENCE_SIZE = 50000
+LOF_NEIGHBORS = 20
+SCORE_CHUNK_SIZE = 20000
+
+# Scalable One-Class SVM: random features and the rows used to fit them
+KERNEL_COMPONENTS = 300
+KERNEL_FIT_SIZE = 5000
+
+# Rough per-unit costs in seconds, measured on a single core
+_COSTS = {
+    ("Isolation Forest", "exact"): lambda n, d: 0.1 + 1.5e-5 * n,
+    ("Local Outlier Factor", "exact"): lambda n, d: 2.2e-7 * n * np.log2(max(n, 2)) * d,
+    ("Local Outlier Factor", "scalable"): lambda n, d: 3.3e-7 * n * np.log2(min(n, LOF_REFERENCE_SIZE)) * d / _workers(),
+    ("One-Class SVM", "exact"): lambda n, d: 1.6e-9 * n * n * d,
+    ("One-Class SVM", "scalable"): lambda n, d: 4e-8 * n * KERNEL_COMPONENTS,
+}
+
+
+def _workers():
+    return os.cpu_count() or 1
+
+
+def choose_backend(method, n_rows):
+    """'exact' for small data (and always for Isolation Forest), 'scalable' above the row limit"""
+    limit = EXACT_ROW_LIMITS.get(method)
+    return 'scalable' if limit is not None and n_rows > limit else 'exact'
+
+
+def estimate_runtime(method, n_rows, n_features, backend=None):
+    """Estimated fit time in seconds for a method and backend on data of this size"""
+    backend = backend or choose_backend(method, n_rows)
+    return float(_COSTS[(method, backend)](n_rows, n_features))
+
+
+def _threshold_labels(scores, contamination):
+    """-1 for the `contamination` share of rows with the lowest normality score, 1 otherwise"""
+    threshold = np.quantile(scores, contamination)
+    return np.where(scores < threshold, -1, 1)
+
+
+def _scalable_lof(X, contamination, random_state):
+    """LOF against a tree built on a reference sample, scoring row chunks in a thread pool"""
+    rng = np.random.default_rng(random_state)
+    in_reference = np.ones(len(X), dtype=bool)
+    if len(X) > LOF_REFERENCE_SIZE:
+        in_reference[:] = False
+        in_reference[rng.choice(len(X), size=LOF_REFERENCE_SIZE, replace=False)] = True
+    # novelty mode with the contamination offset, so saved models can label new rows
+    model = LocalOutlierFactor(n_neighbors=LOF_NEIGHBORS, novelty=True, contamination=contamination,
+                               algorithm='kd_tree' if X.shape[1] <= 15 else 'ball_tree')
+    model.fit(X[in_reference])
+
+    # Reference rows would find themselves in the tree at distance 0; their
+    # scores come from the fit, which leaves each point out of its own neighbors
+    scores = np.empty(len(X))
+    scores[in_reference] = model.negative_outlier_factor_
+    rest = X[~in_reference]
+    chunks = [rest[start:start + SCORE_CHUNK_SIZE] for start in range(0, len(rest), SCORE_CHUNK_SIZE)]
+    if chunks:
+        with ThreadPoolExecutor(max_workers=_workers()) as pool:
+            scores[~in_reference] = np.concatenate(list(pool.map(model.score_samples, chunks)))
+    return model, _threshold_labels(scores, contamination)
+
+
+def _scalable_ocsvm(X, contamination, random_state):
+    """Nystroem RBF features with a linear one-class SVM trained by SGD"""
+    rng = np.random.default_rng(random_state)
+    fit_rows = X[rng.choice(len(X), size=min(len(X), KERNEL_FIT_SIZE), replace=False)]
+    # Same kernel width as OneClassSVM(gamma='scale')
+    gamma = 1.0 / (X.shape[1] * X.var()) if X.var() > 0 else 1.0
+    features = Nystroem(gamma=gamma, n_components=min(KERNEL_COMPONENTS, len(fit_rows)),
+                        random_state=random_state).fit(fit_rows)
+    Z = features.transform(X)
+    model = SGDOneClassSVM(nu=contamination, random_state=random_state).fit(Z)
+    return (features, model), _threshold_labels(model.decision_function(Z), contamination)
+
+
+def detect_anomalies(X, method, contamination=0.1, random_state=42, backend=None):
+    """
+    Fit an anomaly detector on a standardized matrix and label every row.
+
+    The backend is chosen by data size unless given. Scalable backends
+    flag exactly the `contamination` share of rows with the lowest scores,
+    matching the anomaly fraction the exact models aim for.
+
+    Returns a dict with the labels (-1 = anomaly), the fitted model(s)
+    and the backend that was used.
+    """
+    X = np.asarray(X, dtype='float64')
+    backend = backend or choose_backend(method, len(X))
+
+    if method == "Isolation Forest":
+        model = IsolationForest(contamination=contamination, random_state=random_state)
+        labels = model.fit_predict(X)
+    elif method == "Local Outlier Factor":
+        if backend == 'scalable':
+            model, labels = _scalable_lof(X, contamination, random_state)
+        else:
+            model = LocalOutlierFactor(contamination=contamination)
+            labels = model.fit_predict(X)
+    elif method == "One-Class SVM":
+        if backend == 'scalable':
+            model, labels = _scalable_ocsvm(X, contamination, random_state)
+        else:
+            model = OneClassSVM(gamma='scale', nu=contamination)
+            labels = model.fit_predict(X)
+    else:
+        raise ValueError(f"method must be one of {METHODS}")
+
+    return {'model': model, 'labels': labels, 'backend': backend}
+
+
+def scoring_model(model, X, contamination=0.1):
+    """
+    A detector that can label unseen rows, for saving and batch scoring.
+
+    Exact LOF only labels the rows it was fitted on, so it is refitted in
+    novelty mode on the same standardized matrix; every other model is
+    returned as is.
+    """
+    if isinstance(model, LocalOutlierFactor) and not model.novelty:
+        return LocalOutlierFactor(n_neighbors=model.n_neighbors, contamination=contamination,
+                                  novelty=True).fit(np.asarray(X, dtype='float64'))
+    return model
@@ -52,6 +52,7 @@ def is_mobile_browser():
 import pandas as pd                 # ספרייה לעבודה עם נתונים טבלאיים
 import plotly.express as px         # ספרייה ליצירת תרשימים אינטראקטיביים
 import plotly.graph_objects as go   # אובייקטים מתקדמים לתרשימים
+import plotly.io as pio             # המרת תרשימים ל-JSON וממנו (מטמון תרשימים)
 from plotly.subplots import make_subplots  # יצירת תרשימים מורכבים עם תתי-גרפים
 import numpy as np                  # ספרייה לחישובים נומריים
 from datetime import datetime, timedelta  # עבודה עם תאריכים וזמנים
@@ -69,8 +70,6 @@ import matplotlib.pyplot as plt    # פונקציות יצירת תרשימים
 # ========================================================================
 #                           ספריות למידת מכונה
 # ========================================================================
-from sklearn.cluster import KMeans              # אלגוריתם K-Means לקלאסטרינג
-from sklearn.decomposition import PCA          # ניתוח רכיבים ראשיים
 from sklearn.preprocessing import StandardScaler  # נרמול נתונים
 from scipy import stats                        # חישובים סטטיסטיים מתקדמים
 
@@ -80,7 +79,41 @@ from scipy import stats                        # חישובים סטטיסטיי
 import sqlite3                     # עבודה עם בסיס נתונים SQLite
 import os                          # פונקציות מערכת הפעלה  
 import io                          # פונקציות קלט/פלט
+import uuid                        # מזהה סשן אנונימי לבעלות על מודלים שמורים
 
+# ========================================================================
+#                           מנועי עיבוד נתונים פנימיים
+# ========================================================================
+import imputation                  # מילוי ערכים חסרים וקטורי
+from aggregation_cube import AggregationCube  # קוביית אגרגציה קטגוריה × מדד
+from utils import dataset_fingerprint          # טביעת אצבע לגרסת הנתונים
+import trends                      # ניתוח טרנדים וקטורי לכל העמודות
+import outliers                    # זיהוי ערכים חריגים וקטורי לכל העמודות
+import clustering                  # K-Means ו-silhouette בקנה מידה גדול
+from cluster_profile import profile_clusters  # פרופיל אשכולות במעבר אחד
+import pca_engine                  # PCA אקראי/מצטבר לנתונים רחבים וארוכים
+import anomaly                     # LOF ו-One-Class SVM מדרגיים
+import importance                  # חשיבות משתנים על סט מבחן, במקביל
+import model_registry              # שמירת מודלים מאומנים וניקוד קבצים חדשים
+import jobs                        # משימות רקע לניתוחים ארוכים
+import dataset_store               # מאגר נתונים משותף בין סשנים (עותק אחד לכל תוכן)
+from dataset_versions import VersionedDataset  # גרסאות נתונים עם ביטול/חזרה לשלבי ניקוי
+import synthetic_data              # נתוני דוגמה במטמון ומחולל נתונים סינתטיים גדולים
+from ml_cache import MLResultCache, make_key as make_ml_cache_key  # מטמון תוצאות ML
+import downsampling                # הקטנת נקודות בתרשימים (LTTB / דגימה משמרת-צפיפות)
+import chart_factory               # תרשימי פיזור וקו עם מעבר אוטומטי ל-WebGL
+import density_raster              # מפות צפיפות רסטר לפי חלון תצוגה
+import distributions               # היסטוגרמות ו-Box Plot מסיכומים מחושבים מראש
+import correlation_view            # מפות חום מסודרות לפי אשכולות לנתונים רחבים
+from timeseries import TimeSeriesRollups, detect_datetime_columns, DEFAULT_POINT_BUDGET  # סדרות זמן
+
+# הפעלת Copy-on-Write ב-pandas 2.x (ב-pandas 3 זו התנהגות ברירת המחדל)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+# קטעי עמוד שרצים מחדש בנפרד משאר הדף (Streamlit 1.37+); בגרסאות ישנות יותר
+# הקטע פשוט רץ כחלק מהדף המלא
+fragment = getattr(st, 'fragment', None) or (lambda func: func)
 
 
 
@@ -106,6 +139,7 @@ from reportlab.pdfgen import canvas         # יצירת קבצי PDF
 from reportlab.lib.pagesizes import letter  # גדלי עמודים לPDF
 import requests                             # בקשות HTTP
 import warnings                             # ניהול אזהרות
+from streamlit.runtime.scriptrunner import get_script_run_ctx  # זיהוי ריצה חלקית של קטע עמוד
 warnings.filterwarnings('ignore')          # השתקת אזהרות מיותרות
 
 # ========================================================================
@@ -335,6 +369,9 @@ def main():
             missing_pct = (df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100
             quality_color = "🟢" if missing_pct < 5 else "🟡" if missing_pct < 15 else "🔴"
             st.write(f"**Quality:** {quality_color} {100-missing_pct:.1f}%")
+            
+            # משימות רקע שרצות (או הסתיימו) בסשן הנוכחי
+            show_background_jobs()
         
         else:
             # ========================================================================
@@ -416,6 +453,9 @@ def main():
         show_database()
     elif page == "📄 Reports":                # דף דוחות
         show_reports()
+    
+    # רענון הדף בזמן שמשימת רקע שהוא מציג עדיין רצה
+    poll_background_jobs()
 
 # ========================================================================
 #                           פונקציות עזר ותובנות נתונים
@@ -492,14 +532,8 @@ def show_insights_and_advice(df):
         insights.append("✅ No duplicates detected")
     
     # Outlier analysis
-    outlier_cols = []
-    for col in numeric_cols:
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        outliers = df[(df[col] < Q1 - 1.5*IQR) | (df[col] > Q3 + 1.5*IQR)]
-        if len(outliers) > 0:
-            outlier_cols.append(col)
+    iqr_counts = get_outlier_report(df).counts['IQR']
+    outlier_cols = iqr_counts[iqr_counts > 0].index.tolist()
     
     if outlier_cols:
         insights.append(f"🎯 Outliers detected in {len(outlier_cols)} columns")
@@ -516,6 +550,415 @@ def show_insights_and_advice(df):
         for adv in advice:
             st.markdown(f'<div class="advice-box">{adv}</div>', unsafe_allow_html=True)
 
+# ========================================================================
+#                           נתוני הסשן - מאגר משותף וגרסאות
+# ========================================================================
+def use_session_frame(frame):
+    """
+    החלפת המסגרת שהסשן מחזיק במאגר הנתונים המשותף
+    
+    מטרת הפונקציה:
+    - הסשן מחזיק ידית למסגרת המשותפת במאגר ברמת התהליך במקום עותק משלו:
+      סשנים שטוענים את אותו תוכן חולקים עותק אחד בזיכרון
+    - st.session_state.data מצביע על המסגרת המשותפת - אסור לשנות אותה
+      במקומה; שינויים יוצרים מסגרת חדשה
+    - הידית הקודמת של הסשן משוחררת
+    
+    החזרה:
+        DataFrame: המסגרת המשותפת (שווה בתוכן ל-frame)
+    """
+    previous = st.session_state.get('dataset')
+    handle = dataset_store.default_store().acquire(frame)
+    st.session_state.dataset = handle
+    st.session_state.data = handle.frame
+    if previous is not None:
+        previous.release()
+    return handle.frame
+
+def set_session_data(df, step=None):
+    """
+    טעינת נתונים לסשן, או רישום תוצאת שלב ניקוי כגרסה חדשה
+    
+    מטרת הפונקציה:
+    - ללא step: נתונים חדשים (קובץ, נתוני דוגמה) פותחים היסטוריית גרסאות חדשה
+    - עם step: התוצאה נרשמת כגרסה אחרי הגרסה הנוכחית, כך שאפשר לבטל אותה
+      (undo) בלי לטעון ולפענח את הקובץ מחדש
+    - מזהה הגרסה הוא טביעת האצבע של הנתונים, ולכן מפתחות המטמון של
+      הניתוחים עוקבים אחרי הגרסה
+    
+    פרמטרים:
+        df (DataFrame): הנתונים
+        step (str, optional): תיאור שלב הניקוי שיצר את הנתונים
+    
+    החזרה:
+        DataFrame: המסגרת המשותפת של הגרסה הנוכחית
+    """
+    frame = use_session_frame(df)
+    versions = st.session_state.get('data_versions')
+    if step is None or versions is None:
+        st.session_state.data_versions = VersionedDataset(frame)
+        st.session_state.pop('upload_signature', None)
+    else:
+        versions.commit(frame, step)
+    return frame
+
+def undo_session_data():
+    """
+    חזרה לגרסת הנתונים הקודמת (רק הזזת מצביע - ללא חישוב או העתקה)
+    """
+    return use_session_frame(st.session_state.data_versions.undo().frame)
+
+def redo_session_data():
+    """
+    חזרה לגרסת הנתונים שבוטלה
+    """
+    return use_session_frame(st.session_state.data_versions.redo().frame)
+
+def clear_session_data():
+    """
+    הסרת הנתונים וההיסטוריה שלהם מהסשן ושחרור הידית במאגר המשותף
+    """
+    handle = st.session_state.pop('dataset', None)
+    st.session_state.pop('data', None)
+    st.session_state.pop('data_versions', None)
+    if handle is not None:
+        handle.release()
+
+# ========================================================================
+#                           קוביית אגרגציה לגרסת הנתונים הנוכחית
+# ========================================================================
+def get_aggregation_cube(df):
+    """
+    החזרת קוביית האגרגציה של גרסת הנתונים הנוכחית
+    
+    מטרת הפונקציה:
+    - בניית קובייה אחת לכל גרסת נתונים ושמירתה בסשן
+    - חישוב עצל: כל עמודה קטגוריאלית נסרקת פעם אחת בלבד
+    - החלפת הקטגוריה או המדד בתרשים ללא סריקה חוזרת של הנתונים
+    
+    פרמטרים:
+        df (DataFrame): מסגרת הנתונים הנוכחית
+    
+    החזרה:
+        AggregationCube: קובייה עם count/sum/sumsq/min/max לכל קטגוריה × מדד
+    """
+    version = dataset_fingerprint(df)
+    cube = st.session_state.get('agg_cube')
+    if cube is None or cube.version != version:
+        cube = AggregationCube(df, version)
+        st.session_state.agg_cube = cube
+    return cube
+
+def get_trend_table(df):
+    """
+    טבלת טרנדים לכל העמודות הנומריות עבור גרסת הנתונים הנוכחית
+    
+    מטרת הפונקציה:
+    - התאמת קו מגמה לכל העמודות הנומריות בפתרון מטריצי אחד
+    - שמירת הטבלה בסשן כך שלוח הבקרה והדוחות ישתמשו באותה תוצאה
+    
+    פרמטרים:
+        df (DataFrame): מסגרת הנתונים הנוכחית
+    
+    החזרה:
+        DataFrame: שורה לכל עמודה עם slope, intercept, r2, pct_change, n_obs, direction, strength
+    """
+    version = dataset_fingerprint(df)
+    cached = st.session_state.get('trend_table')
+    if cached is None or cached[0] != version:
+        cached = (version, trends.fit_trends(df))
+        st.session_state.trend_table = cached
+    return cached[1]
+
+def get_outlier_report(df):
+    """
+    דוח ערכים חריגים לכל העמודות הנומריות עבור גרסת הנתונים הנוכחית
+    
+    מטרת הפונקציה:
+    - זיהוי חריגים בשיטות IQR, Z-Score ו-Modified Z-Score לכל העמודות במעבר אחד
+    - שמירת התוצאה בסשן כך שהתובנות, הסטטיסטיקות והדוחות ישתמשו באותה תוצאה
+    
+    פרמטרים:
+        df (DataFrame): מסגרת הנתונים הנוכחית
+    
+    החזרה:
+        OutlierResult: מסכת ביטים לכל תא וספירות לכל עמודה ושיטה
+    """
+    version = dataset_fingerprint(df)
+    cached = st.session_state.get('outlier_report')
+    if cached is None or cached[0] != version:
+        cached = (version, outliers.detect_outliers(df))
+        st.session_state.outlier_report = cached
+    return cached[1]
+
+def get_ml_cache():
+    """
+    מטמון התוצאות של עמוד למידת המכונה עבור הסשן הנוכחי
+    
+    מטרת הפונקציה:
+    - שמירת מודלים מאומנים ותוצאותיהם בין ריצות חוזרות של Streamlit
+    - שינוי ווידג'ט שאינו קשור (או חזרה להגדרה קודמת) לא מאמן מחדש
+    - הגבלת הזיכרון: התוצאות הישנות ביותר מפונות כשהמטמון מתמלא
+    
+    החזרה:
+        MLResultCache: מטמון LRU מוגבל בזיכרון
+    """
+    if 'ml_cache' not in st.session_state:
+        st.session_state.ml_cache = MLResultCache()
+    return st.session_state.ml_cache
+
+def ml_cache_key(df, kind, features, params):
+    """
+    מפתח מטמון לתוצאת למידת מכונה: גרסת הנתונים, סוג הניתוח, העמודות וההיפר-פרמטרים
+    """
+    return make_ml_cache_key(dataset_fingerprint(df), kind, features, params)
+
+def model_owner():
+    """
+    בעלים של המודלים השמורים עבור המשתמש הנוכחי
+    
+    מטרת הפונקציה:
+    - משתמש מחובר מזוהה לפי האימייל שלו, כך שהמודלים שלו זמינים בכל סשן
+    - משתמש אנונימי מקבל מזהה אקראי לסשן בלבד
+    - המזהים הם מחרוזות עם קידומת, כך שלא יתנגשו במזהי הצ'אט המספריים של הבוט
+    
+    החזרה:
+        str: מזהה הבעלים לשמירה, לרשימה ולמחיקה של מודלים
+    """
+    if AUTH_AVAILABLE and auth.check_authentication() and st.session_state.get('user_email'):
+        return f"user:{st.session_state.user_email}"
+    if 'model_owner_session' not in st.session_state:
+        st.session_state.model_owner_session = f"session:{uuid.uuid4().hex}"
+    return st.session_state.model_owner_session
+
+def render_model_saver(df, kind, features, params, metrics, n_rows, build_pipeline):
+    """
+    כפתור שמירת המודל המאומן במאגר המודלים
+    
+    מטרת הפונקציה:
+    - שמירת צינור הנרמול + המודל לדיסק עם מטא-דאטה וטביעת האצבע של הנתונים
+    - המודל השמור משמש לניקוד קבצים חדשים בלי לאמן מחדש (📦 Batch Scoring)
+    
+    פרמטרים:
+        df (DataFrame): הנתונים שעליהם אומן המודל
+        kind (str): סוג המודל ('clustering', 'pca', 'anomalies')
+        features (list): עמודות הקלט של המודל
+        params (dict): ההיפר-פרמטרים
+        metrics (dict): מדדי איכות לשמירה במטא-דאטה
+        n_rows (int): מספר שורות האימון
+        build_pipeline (callable): בונה את הצינור רק בעת השמירה
+    """
+    with st.expander("💾 Save model for batch scoring"):
+        name = st.text_input("Model name", value=f"{kind} · {', '.join(features[:3])}",
+                             key=f"save_model_name_{kind}")
+        if st.button("💾 Save model", key=f"save_model_{kind}"):
+            metadata = model_registry.save_model(
+                build_pipeline(), kind, features, dataset_fingerprint(df),
+                params=params, metrics=metrics, n_rows=n_rows, name=name, owner=model_owner()
+            )
+            st.success(f"✅ Saved as `{metadata['id']}`. Score new files under 📦 Batch Scoring.")
+
+# Seconds between refreshes of a page waiting for its background job
+JOB_POLL_SECONDS = 1.0
+
+def start_job(key, name, fn, *args, **kwargs):
+    """
+    שליחת ניתוח ארוך למשימת רקע
+    
+    מטרת הפונקציה:
+    - הרצת הניתוח במאגר תהליכונים שחי מעבר לריצות החוזרות של Streamlit
+    - רישום מזהה המשימה בסשן תחת מפתח הניתוח, כדי שהדף יאסוף את התוצאה
+    - המשתמש יכול לעבור לדף אחר בזמן שהמשימה רצה
+    
+    פרמטרים:
+        key: מפתח הניתוח (לרוב מפתח מטמון ה-ML)
+        name (str): שם המשימה לתצוגה
+        fn (callable): פונקציית הניתוח (ללא קריאות ממשק וללא גישה לסשן)
+    
+    החזרה:
+        jobs.Job: המשימה שנשלחה
+    """
+    # Workers are shared by every session, so fn gets all its inputs as arguments
+    # and never reads st.session_state
+    job = jobs.default_runner().submit(name, fn, *args, **kwargs)
+    st.session_state.setdefault('jobs', {})[key] = job.id
+    return job
+
+def job_state(key, on_error=None):
+    """
+    מצב משימת הרקע של ניתוח: משימה שעדיין רצה, או התוצאה של משימה שהסתיימה
+    
+    משימה שהסתיימה נאספת פעם אחת ומוסרת מהסשן; כישלון מוצג כהודעת שגיאה.
+    
+    החזרה:
+        tuple: (משימה שרצה או None, תוצאה או None)
+    """
+    job_id = st.session_state.get('jobs', {}).get(key)
+    job = jobs.default_runner().get(job_id) if job_id is not None else None
+    if job is None:
+        st.session_state.get('jobs', {}).pop(key, None)
+        return None, None
+    if not job.done:
+        return job, None
+    
+    st.session_state.jobs.pop(key, None)
+    jobs.default_runner().discard(job.id)
+    if job.status == jobs.FAILED:
+        st.error(f"❌ {job.name} failed: {job.error}")
+        if on_error is not None:
+            on_error()
+    elif job.status == jobs.CANCELLED:
+        st.info(f"⏹️ {job.name} was cancelled")
+    return None, job.result
+
+def show_job_progress(job):
+    """
+    הצגת התקדמות משימת רקע במקום התוצאה, עם אפשרות ביטול
+    
+    הדף מתרענן אוטומטית (ראו poll_background_jobs) עד שהמשימה מסתיימת.
+    מעבר לדף אחר עוצר את הרענון בלבד - המשימה ממשיכה לרוץ, והתוצאה
+    מוצגת כשחוזרים לדף.
+    """
+    st.progress(job.progress, text=f"⏳ {job.name}: {job.message} ({job.elapsed:.0f}s)")
+    st.caption("Running in the background: you can explore other pages, the result will be here when you come back.")
+    if st.button("⏹️ Cancel", key=f"cancel_job_{job.id}"):
+        job.cancel()
+    st.session_state.job_poll = True
+
+def poll_background_jobs(fragment_scope=False):
+    """
+    רענון הדף אחרי שהוא סיים להיטען, כל עוד הוא מציג משימת רקע שרצה
+    
+    קטע עמוד (st.fragment) שמציג משימות קורא לפונקציה בסופו עם
+    fragment_scope=True: כשרק הקטע רץ מחדש, רק הוא מתרענן; בריצה מלאה של
+    הדף הרענון נשאר לסוף main.
+    """
+    if fragment_scope:
+        ctx = get_script_run_ctx()
+        if not getattr(ctx, 'fragment_ids_this_run', None):
+            return
+    if st.session_state.pop('job_poll', False):
+        time.sleep(JOB_POLL_SECONDS)
+        if fragment_scope:
+            st.rerun(scope="fragment")
+        st.rerun()
+
+def show_background_jobs():
+    """
+    רשימת משימות הרקע של הסשן בסרגל הצד, בכל דף
+    """
+    runner = jobs.default_runner()
+    session_jobs = [runner.get(job_id) for job_id in st.session_state.get('jobs', {}).values()]
+    session_jobs = [job for job in session_jobs if job is not None]
+    if not session_jobs:
+        return
+    st.markdown("---")
+    st.markdown("### ⏳ Background Jobs")
+    for job in session_jobs:
+        if job.done:
+            st.write(f"✅ {job.name}: {job.status}, open its page to see the result")
+        else:
+            st.progress(job.progress, text=f"{job.name} ({job.elapsed:.0f}s)")
+
+def get_time_rollups(df, time_col):
+    """
+    החזרת ה-rollups של סדרת הזמן עבור עמודת תאריך בגרסת הנתונים הנוכחית
+    
+    מטרת הפונקציה:
+    - בניית rollups (שעה/יום/שבוע/חודש) פעם אחת לכל עמודת זמן וגרסת נתונים
+    - שמירת התוצאה בסשן כך שתרשימי טרנד וממוצע נע לא יסרקו את הנתונים מחדש
+    
+    פרמטרים:
+        df (DataFrame): מסגרת הנתונים הנוכחית
+        time_col (str): עמודת התאריך/זמן
+    
+    החזרה:
+        TimeSeriesRollups: אובייקט rollups עם בחירת רזולוציה אוטומטית
+    """
+    version = dataset_fingerprint(df)
+    cache = st.session_state.get('ts_rollups')
+    if cache is None or cache.get('version') != version:
+        cache = {'version': version, 'rollups': {}}
+        st.session_state.ts_rollups = cache
+    if time_col not in cache['rollups']:
+        cache['rollups'][time_col] = TimeSeriesRollups(df, time_col, version)
+    return cache['rollups'][time_col]
+
+def get_chart_points(frame, spec, kind, columns, x=None, keep=None):
+    """
+    הקטנת מספר הנקודות שנשלחות לדפדפן עבור תרשים קו או פיזור גדול
+    
+    מטרת הפונקציה:
+    - מעל תקציב הנקודות: LTTB לתרשימי קו ודגימה משמרת-צפיפות לתרשימי פיזור
+    - ערכים חריגים (ושורות המסומנות ב-keep, כמו אנומליות) נשארים גלויים
+    - שמירת התוצאה במטמון הסשן לפי מפרט התרשים, כך שריצה חוזרת לא מחשבת שוב
+    
+    פרמטרים:
+        frame (DataFrame): הנתונים של התרשים
+        spec: מפתח שמזהה את גרסת הנתונים ואת התרשים (למשל מפתח מטמון ML)
+        kind (str): 'line' או 'scatter'
+        columns (list): עמודות ה-Y בתרשים קו, או הצירים בתרשים פיזור
+        x (str): עמודת ה-X בתרשים קו (None = סדר השורות)
+        keep (str): עמודה בוליאנית של שורות שחייבות להופיע בתרשים פיזור
+    
+    החזרה:
+        DataFrame: השורות לציור (המסגרת המקורית אם היא בתוך התקציב)
+    """
+    budget = downsampling.LINE_POINT_BUDGET if kind == 'line' else downsampling.SCATTER_POINT_BUDGET
+    if len(frame) <= budget:
+        return frame
+    if 'chart_points' not in st.session_state:
+        st.session_state.chart_points = MLResultCache(max_bytes=64 * 1024 ** 2)
+    cache = st.session_state.chart_points
+    key = (spec, kind, tuple(columns), x, keep)
+    points = cache.get(key)
+    if points is None:
+        if kind == 'line':
+            points = downsampling.reduce_line(frame, x, columns, budget)
+        else:
+            points = downsampling.reduce_scatter(frame, columns, budget, keep=keep)
+        points = cache.put(key, points)
+    return points
+
+def show_point_reduction_note(points, frame):
+    """
+    הערה מתחת לתרשים כשמוצגת רק חלק מהנקודות (points - הנקודות המוצגות או מספרן)
+    """
+    shown = points if isinstance(points, int) else len(points)
+    if shown < len(frame):
+        st.caption(f"⚡ Showing {shown:,} of {len(frame):,} points (shape- and outlier-preserving sample)")
+
+def cached_figure(df, chart, params, build):
+    """
+    החזרת תרשים Plotly ממטמון הסשן, או בנייתו ושמירתו כ-JSON
+    
+    מטרת הפונקציה:
+    - ריצה חוזרת שבה הנתונים ופרמטרי התרשים לא השתנו עולה חיפוש במטמון
+      במקום בנייה מחדש של התרשים מהנתונים המלאים
+    - המטמון שומר את ה-JSON של התרשים ומוגבל בגודל (פינוי LRU)
+    - בהחטאה מוחזר התרשים שנבנה עצמו; JSON מפוענח רק בפגיעה במטמון
+    
+    פרמטרים:
+        df (DataFrame): הנתונים שמהם התרשים נבנה (טביעת האצבע שלהם היא חלק מהמפתח)
+        chart (str): שם התרשים
+        params (dict): כל הקלטים שמשפיעים על התרשים (ערכים ניתנים לגיבוב)
+        build (callable): פונקציה ללא פרמטרים שבונה את התרשים
+    
+    החזרה:
+        go.Figure: התרשים
+    """
+    if 'figure_cache' not in st.session_state:
+        st.session_state.figure_cache = MLResultCache(max_bytes=64 * 1024 ** 2)
+    cache = st.session_state.figure_cache
+    key = make_ml_cache_key(dataset_fingerprint(df), chart, [], params)
+    payload = cache.get(key)
+    if payload is None:
+        # The stored JSON is a snapshot, so the caller may still change the figure it gets
+        fig = build()
+        cache.put(key, fig.to_json())
+        return fig
+    return pio.from_json(payload)
+
 def show_dashboard():
     """
     הצגת לוח הבקרה הראשי של האפליקציה
@@ -542,21 +985,22 @@ def show_dashboard():
         
         with col1:
             st.markdown("### 🚀 Get Started")
+            # Demo datasets are fixed presets: built once per process, then served from cache
             if st.button("🎲 Load Demo Data"):
-                demo_data = create_demo_data()
-                st.session_state.data = demo_data
+                demo_data = synthetic_data.cached_preset('demo', create_demo_data)
+                set_session_data(demo_data)
                 st.success("Demo data loaded! 🎉")
                 st.rerun()
             
             if st.button("🛒 Load E-commerce Data"):
-                ecommerce_data = create_ecommerce_data()
-                st.session_state.data = ecommerce_data
+                ecommerce_data = synthetic_data.cached_preset('ecommerce', create_ecommerce_data)
+                set_session_data(ecommerce_data)
                 st.success("E-commerce data loaded! 💰")
                 st.rerun()
             
             if st.button("📊 Generate Financial Data"):
-                financial_data = create_financial_data()
-                st.session_state.data = financial_data
+                financial_data = synthetic_data.cached_preset('financial', create_financial_data)
+                set_session_data(financial_data)
                 st.success("Financial data loaded! 💹")
                 st.rerun()
         
@@ -646,36 +1090,7 @@ def show_dashboard():
     tab1, tab2, tab3, tab4 = st.tabs(["📊 Quick Viz", "🔍 Data Explorer", "🎯 Recommendations", "📈 Trends"])
     
     with tab1:
-        # Quick visualizations
-        if len(numeric_cols) > 0:
-            viz_col1, viz_col2 = st.columns(2)
-            
-            with viz_col1:
-                # Auto-select best chart for first numeric column
-                selected_col = st.selectbox("Select metric for quick viz", numeric_cols, key="quick_viz")
-                
-                if len(numeric_cols) >= 2:
-                    fig = px.line(df.reset_index(), x='index', y=selected_col, 
-                                title=f"Trend: {selected_col}")
-                    st.plotly_chart(fig, use_container_width=True)
-                else:
-                    fig = px.histogram(df, x=selected_col, title=f"Distribution: {selected_col}")
-                    st.plotly_chart(fig, use_container_width=True)
-            
-            with viz_col2:
-                if len(numeric_cols) > 1:
-                    # Correlation heatmap
-                    corr_matrix = df[numeric_cols].corr()
-                    fig = px.imshow(corr_matrix, title="Correlation Matrix", 
-                                  color_continuous_scale="RdBu")
-                    st.plotly_chart(fig, use_container_width=True)
-                elif len(text_cols) > 0:
-                    # Category distribution
-                    cat_col = text_cols[0]
-                    value_counts = df[cat_col].value_counts().head(10)
-                    fig = px.bar(x=value_counts.index, y=value_counts.values,
-                               title=f"Top Categories: {cat_col}")
-                    st.plotly_chart(fig, use_container_width=True)
+        quick_viz_panel(df, numeric_cols, text_cols)
     
     with tab2:
         # Data explorer
@@ -688,10 +1103,11 @@ def show_dashboard():
             if len(text_cols) > 0:
                 selected_category = st.selectbox("Filter by category", ["All"] + list(text_cols))
                 if selected_category != "All":
+                    category_options = get_aggregation_cube(df).categories(selected_category)
                     category_values = st.multiselect(
                         f"Select {selected_category} values",
-                        df[selected_category].unique(),
-                        default=df[selected_category].unique()[:5]
+                        category_options,
+                        default=category_options[:5]
                     )
                     if category_values:
                         df_filtered = df[df[selected_category].isin(category_values)]
@@ -733,66 +1149,218 @@ def show_dashboard():
         generate_dashboard_recommendations(df)
     
     with tab4:
-        # Trend analysis
-        st.markdown("#### 📈 Trend Analysis")
-        if len(numeric_cols) > 0:
-            trend_col = st.selectbox("Select column for trend analysis", numeric_cols, key="trend_analysis")
-            
-            # Create trend visualization
-            df_trend = df.copy()
-            df_trend['index'] = range(len(df_trend))
+        trend_analysis_panel(df, numeric_cols)
+
+@fragment
+def quick_viz_panel(df, numeric_cols, text_cols):
+    """
+    לשונית התרשימים המהירים של לוח הבקרה
+    
+    מטרת הפונקציה:
+    - רץ מחדש לבדו (st.fragment): החלפת עמודה בתרשים מהיר מציירת מחדש
+      רק את הלשונית, בלי סרגל הצד ושאר חלקי לוח הבקרה
+    
+    פרמטרים:
+        df (DataFrame): הנתונים הטעונים
+        numeric_cols (Index): העמודות הנומריות
+        text_cols (Index): העמודות הטקסטואליות
+    """
+    # Quick visualizations
+    if len(numeric_cols) > 0:
+        viz_col1, viz_col2 = st.columns(2)
+        
+        with viz_col1:
+            # Auto-select best chart for first numeric column
+            selected_col = st.selectbox("Select metric for quick viz", numeric_cols, key="quick_viz")
             
-            # Calculate moving average
-            window_size = min(20, len(df_trend) // 10)
-            if window_size > 1:
-                df_trend[f'{trend_col}_MA'] = df_trend[trend_col].rolling(window=window_size).mean()
+            if len(numeric_cols) >= 2:
+                line_data = get_chart_points(df, dataset_fingerprint(df), 'line', [selected_col])
+                fig = cached_figure(df, 'quick_viz_line', {'col': selected_col}, lambda: chart_factory.line(
+                    line_data.reset_index(), x='index', y=selected_col, title=f"Trend: {selected_col}"
+                ))
+                st.plotly_chart(fig, use_container_width=True)
+                show_point_reduction_note(line_data, df)
+            else:
+                fig = cached_figure(df, 'quick_viz_histogram', {'col': selected_col}, lambda: distributions.histogram_figure(
+                    distributions.cached_histogram(dataset_fingerprint(df), df, selected_col),
+                    f"Distribution: {selected_col}", selected_col
+                ))
+                st.plotly_chart(fig, use_container_width=True)
+        
+        with viz_col2:
+            if len(numeric_cols) > 1:
+                # Correlation heatmap (clustered order, most correlated variables on wide data)
+                def build_heatmap():
+                    view = correlation_view.heatmap_view(df, numeric_cols, dataset_fingerprint(df))
+                    return px.imshow(view['matrix'], title="Correlation Matrix" + correlation_view.title_suffix(view), 
+                                     color_continuous_scale="RdBu")
+                fig = cached_figure(df, 'quick_viz_heatmap', {'columns': tuple(numeric_cols)}, build_heatmap)
+                st.plotly_chart(fig, use_container_width=True)
+            elif len(text_cols) > 0:
+                # Category distribution
+                cat_col = text_cols[0]
+                def build_categories():
+                    value_counts = get_aggregation_cube(df).value_counts(cat_col).head(10)
+                    return px.bar(x=value_counts.index, y=value_counts.values,
+                                  title=f"Top Categories: {cat_col}")
+                fig = cached_figure(df, 'quick_viz_categories', {'col': cat_col}, build_categories)
+                st.plotly_chart(fig, use_container_width=True)
+
+@fragment
+def trend_analysis_panel(df, numeric_cols):
+    """
+    לשונית ניתוח הטרנדים והתנודתיות של לוח הבקרה
+    
+    מטרת הפונקציה:
+    - רץ מחדש לבדו (st.fragment): בחירת עמודה, ציר זמן או רזולוציה
+      מעדכנת רק את הלשונית
+    
+    פרמטרים:
+        df (DataFrame): הנתונים הטעונים
+        numeric_cols (Index): העמודות הנומריות
+    """
+    # Trend analysis
+    st.markdown("#### 📈 Trend Analysis")
+    if len(numeric_cols) > 0:
+        trend_col = st.selectbox("Select column for trend analysis", numeric_cols, key="trend_analysis")
+        time_cols = detect_datetime_columns(df)
+        time_axis = st.selectbox(
+            "Time axis", ["Row index"] + time_cols,
+            index=1 if time_cols else 0, key="trend_time_axis"
+        )
+        
+        if time_axis != "Row index":
+            # Serve the chart from cached rollups at a resolution that fits the point budget
+            rollups = get_time_rollups(df, time_axis)
+            resolution = st.selectbox(
+                "Resolution", ["Auto"] + rollups.available_resolutions(), key="trend_resolution"
+            )
+            if resolution == "Auto":
+                resolution = rollups.choose_resolution()
             
-            fig = go.Figure()
+            def build_rollup_trend():
+                trend_frame = rollups.frame(trend_col, resolution)
+                window_size = min(20, len(trend_frame) // 10)
+                
+                fig = go.Figure()
             
-            # Original data
-            fig.add_trace(go.Scatter(
-                x=df_trend['index'],
-                y=df_trend[trend_col],
-                mode='lines',
-                name='Original',
-                opacity=0.6
-            ))
+                # Min-max band per bucket
+                fig.add_trace(chart_factory.trace(
+                    x=trend_frame.index, y=trend_frame['max'],
+                    mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'
+                ))
+                fig.add_trace(chart_factory.trace(
+                    x=trend_frame.index, y=trend_frame['min'],
+                    mode='lines', line=dict(width=0), fill='tonexty',
+                    fillcolor='rgba(31, 119, 180, 0.15)', name='Min-Max range'
+                ))
             
-            # Moving average
-            if window_size > 1:
-                fig.add_trace(go.Scatter(
-                    x=df_trend['index'],
-                    y=df_trend[f'{trend_col}_MA'],
+                # Bucket means
+                fig.add_trace(chart_factory.trace(
+                    x=trend_frame.index,
+                    y=trend_frame['mean'],
                     mode='lines',
-                    name=f'Moving Average ({window_size})',
-                    line=dict(width=3)
+                    name=f'{resolution.title()} mean',
+                    opacity=0.6
                 ))
             
-            fig.update_layout(
-                title=f"Trend Analysis: {trend_col}",
-                xaxis_title="Data Points",
-                yaxis_title=trend_col
-            )
+                # Moving average over the buckets
+                if window_size > 1:
+                    fig.add_trace(chart_factory.trace(
+                        x=trend_frame.index,
+                        y=rollups.moving_average(trend_col, resolution, window_size),
+                        mode='lines',
+                        name=f'Moving Average ({window_size} {resolution}s)',
+                        line=dict(width=3)
+                    ))
             
-            st.plotly_chart(fig, use_container_width=True)
+                fig.update_layout(
+                    title=f"Trend Analysis: {trend_col} ({resolution})",
+                    xaxis_title=time_axis,
+                    yaxis_title=trend_col,
+                    meta={'buckets': len(trend_frame)}
+                )
+                return fig
             
-            # Trend insights
-            trend_analysis = analyze_trend(df[trend_col])
-            st.info(f"📈 Trend Analysis: {trend_analysis}")
+            fig = cached_figure(df, 'trend_rollup', {'col': trend_col, 'time_axis': time_axis,
+                                                     'resolution': resolution}, build_rollup_trend)
             
-            # Additional trend metrics
-            if len(df) > 10:
-                first_quarter = df[trend_col][:len(df)//4].mean()
-                last_quarter = df[trend_col][-len(df)//4:].mean()
-                overall_change = ((last_quarter - first_quarter) / first_quarter) * 100
-                
-                if abs(overall_change) > 5:
-                    change_direction = "increased" if overall_change > 0 else "decreased"
-                    st.write(f"📊 Overall trend: {trend_col} has {change_direction} by {abs(overall_change):.1f}%")
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"⏱️ {fig.layout.meta['buckets']:,} {resolution} buckets drawn from {len(df):,} rows")
+        else:
+            def build_index_trend():
+                # Create trend visualization
+                df_trend = df.copy()
+                df_trend['index'] = range(len(df_trend))
         
-        # Volatility analysis
-        if len(numeric_cols) > 0:
-            st.markdown("#### 📊 Volatility Analysis")
+                # Calculate moving average
+                window_size = min(20, len(df_trend) // 10)
+                if window_size > 1:
+                    df_trend[f'{trend_col}_MA'] = df_trend[trend_col].rolling(window=window_size).mean()
+                trend_points = get_chart_points(df_trend, dataset_fingerprint(df), 'line',
+                                                [col for col in (trend_col, f'{trend_col}_MA') if col in df_trend],
+                                                x='index')
+        
+                fig = go.Figure()
+        
+                # Original data
+                fig.add_trace(chart_factory.trace(
+                    x=trend_points['index'],
+                    y=trend_points[trend_col],
+                    mode='lines',
+                    name='Original',
+                    opacity=0.6
+                ))
+        
+                # Moving average
+                if window_size > 1:
+                    fig.add_trace(chart_factory.trace(
+                        x=trend_points['index'],
+                        y=trend_points[f'{trend_col}_MA'],
+                        mode='lines',
+                        name=f'Moving Average ({window_size})',
+                        line=dict(width=3)
+                    ))
+        
+                fig.update_layout(
+                    title=f"Trend Analysis: {trend_col}",
+                    xaxis_title="Data Points",
+                    yaxis_title=trend_col,
+                    meta={'points': len(trend_points)}
+                )
+                return fig
+        
+            fig = cached_figure(df, 'trend_index', {'col': trend_col}, build_index_trend)
+        
+            st.plotly_chart(fig, use_container_width=True)
+            show_point_reduction_note(fig.layout.meta['points'], df)
+        
+        # Trend insights
+        trend_table = get_trend_table(df)
+        st.info(f"📈 Trend Analysis: {trends.describe_trend(trend_table.loc[trend_col])}")
+        
+        with st.expander(f"📋 Trend summary for all {len(trend_table)} numeric columns"):
+            summary_table = trend_table.dropna(subset=['r2']).sort_values('r2', ascending=False)
+            st.dataframe(
+                summary_table[['direction', 'strength', 'slope', 'r2', 'pct_change', 'n_obs']].round(4),
+                use_container_width=True
+            )
+        
+        # Additional trend metrics
+        if len(df) > 10:
+            first_quarter = df[trend_col][:len(df)//4].mean()
+            last_quarter = df[trend_col][-len(df)//4:].mean()
+            overall_change = ((last_quarter - first_quarter) / first_quarter) * 100
+            
+            if abs(overall_change) > 5:
+                change_direction = "increased" if overall_change > 0 else "decreased"
+                st.write(f"📊 Overall trend: {trend_col} has {change_direction} by {abs(overall_change):.1f}%")
+    
+    # Volatility analysis
+    if len(numeric_cols) > 0:
+        st.markdown("#### 📊 Volatility Analysis")
+        
+        def build_volatility():
             volatility_data = {}
             
             for col in numeric_cols[:5]:  # Analyze top 5 numeric columns
@@ -801,10 +1369,11 @@ def show_dashboard():
             
             volatility_df = pd.DataFrame(list(volatility_data.items()), 
                                        columns=['Metric', 'Coefficient of Variation (%)'])
-            
-            fig = px.bar(volatility_df, x='Metric', y='Coefficient of Variation (%)',
-                        title="Data Volatility Analysis")
-            st.plotly_chart(fig, use_container_width=True)
+            return px.bar(volatility_df, x='Metric', y='Coefficient of Variation (%)',
+                          title="Data Volatility Analysis")
+        
+        fig = cached_figure(df, 'volatility', {'columns': tuple(numeric_cols[:5])}, build_volatility)
+        st.plotly_chart(fig, use_container_width=True)
 
 def generate_smart_insights(df):
     """
@@ -865,13 +1434,7 @@ def generate_smart_insights(df):
             insights.append(f"🔗 **Strong Relationship**: '{best_pair[0]}' and '{best_pair[1]}' are highly correlated ({best_pair[2]:.3f})")
     
     # Outlier insights
-    outlier_summary = {}
-    for col in numeric_cols:
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        outliers = df[(df[col] < Q1 - 1.5*IQR) | (df[col] > Q3 + 1.5*IQR)]
-        outlier_summary[col] = len(outliers)
+    outlier_summary = get_outlier_report(df).counts['IQR'].to_dict()
     
     if outlier_summary:
         max_outlier_col = max(outlier_summary, key=outlier_summary.get)
@@ -1037,16 +1600,14 @@ def create_financial_data():
     # Simulate stock prices with some trend and volatility
     initial_price = 100
     returns = np.random.normal(0.001, 0.02, n_records)  # Daily returns
-    prices = [initial_price]
-    
-    for r in returns[1:]:
-        prices.append(prices[-1] * (1 + r))
+    returns[0] = 0
+    prices = initial_price * np.cumprod(1 + returns)
     
     data = {
         'Date': dates,
         'Stock_Price': prices,
         'Volume': np.random.lognormal(10, 1, n_records).astype(int),
-        'Market_Cap': np.array(prices) * np.random.uniform(1000000, 5000000, n_records),
+        'Market_Cap': prices * np.random.uniform(1000000, 5000000, n_records),
         'P_E_Ratio': np.random.uniform(10, 30, n_records),
         'Dividend_Yield': np.random.uniform(0, 0.05, n_records),
         'Sector': np.random.choice(['Technology', 'Healthcare', 'Finance', 'Energy'], n_records),
@@ -1067,6 +1628,51 @@ def create_financial_data():
     
     return df
 
+def generate_synthetic_data(params):
+    """
+    יצירת נתונים סינתטיים במשימת רקע, עם דיווח התקדמות לכל חלק
+    """
+    return synthetic_data.synthetic_dataset(progress=jobs.report_progress, **params)
+
+def show_synthetic_data_generator():
+    """
+    טופס מחולל הנתונים הסינתטיים
+    
+    מטרת הפונקציה:
+    - יצירת נתונים גדולים וריאליסטיים (עד מיליוני שורות) לבדיקת ביצועים של כל הדפים
+    - בחירת תמהיל העמודות, שיעור הערכים החסרים ושיעור השורות הכפולות
+    - אותו seed ואותן הגדרות מחזירים תמיד את אותם נתונים (מהמטמון, בלי ליצור מחדש)
+    - היצירה רצה כמשימת רקע עם פס התקדמות
+    """
+    gen_col1, gen_col2, gen_col3 = st.columns(3)
+    with gen_col1:
+        n_rows = st.number_input("Rows", 1000, synthetic_data.MAX_ROWS, 1000000, step=100000,
+                                 key="synthetic_rows")
+        seed = st.number_input("Seed", 0, 2 ** 31 - 1, 42, key="synthetic_seed")
+    with gen_col2:
+        n_numeric = st.slider("Numeric columns", 0, 50, 6, key="synthetic_numeric")
+        n_categorical = st.slider("Categorical columns", 0, 20, 3, key="synthetic_categorical")
+        n_datetime = st.slider("Time columns", 0, 3, 1, key="synthetic_datetime")
+    with gen_col3:
+        missing_pct = st.slider("Missing values (%)", 0.0, 50.0, 2.0, step=0.5, key="synthetic_missing")
+        duplicate_pct = st.slider("Duplicate rows (%)", 0.0, 50.0, 0.0, step=0.5, key="synthetic_duplicates")
+    
+    params = {'n_rows': int(n_rows), 'n_numeric': n_numeric, 'n_categorical': n_categorical,
+              'n_datetime': n_datetime, 'missing_rate': missing_pct / 100,
+              'duplicate_rate': duplicate_pct / 100, 'seed': int(seed)}
+    
+    job, result = job_state('synthetic_data')
+    if result is not None:
+        set_session_data(result)
+        st.success(f"🧪 Synthetic data loaded: {len(result):,} rows, {len(result.columns)} columns")
+    
+    if st.button("🧪 Generate", disabled=job is not None, key="synthetic_generate"):
+        job = start_job('synthetic_data', f"Synthetic data ({params['n_rows']:,} rows)",
+                        generate_synthetic_data, params)
+    
+    if job is not None:
+        show_job_progress(job)
+
 def show_upload():
     """
     הצגת ממשק העלאת קבצים עם תמיכה למכשירים ניידים ודסקטופ
@@ -1120,129 +1726,32 @@ def show_upload():
             st.success("🚀 Opening Telegram Bot...")
             st.markdown("👉 **[Click here to open bot](https://t.me/maydatabot123_bot)**")
             st.info("💡 The bot offers stable file uploads and mobile-friendly interface!")
+        
+        # ========================================================================
+        #                           נתונים סינתטיים לבדיקות עומס
+        # ========================================================================
+        st.markdown("---")
+        with st.expander("🧪 Generate synthetic data (load testing)"):
+            show_synthetic_data_generator()
 
     if uploaded_files:
-        # Desktop processing - clean and fast
-        st.info("🚀 **Processing files...**")
+        # Each set of uploaded files is parsed once; reruns, cleaning steps and undo
+        # work on the session's dataset versions instead of parsing the files again
+        upload_signature = tuple((f.name, f.size, getattr(f, 'file_id', None)) for f in uploaded_files)
+        if st.session_state.get('upload_signature') != upload_signature or 'data' not in st.session_state:
+            # Desktop processing - clean and fast
+            st.info("🚀 **Processing files...**")
+            
+            # Clear any cached data that might cause conflicts
+            clear_session_data()
+            
+            combined_df = read_uploaded_files(uploaded_files, max_size)
+            if combined_df is not None:
+                set_session_data(combined_df)
+                st.session_state.upload_signature = upload_signature
         
-        # Clear any cached data that might cause conflicts
         if 'data' in st.session_state:
-            del st.session_state['data']
-        
-        dfs = []
-        
-        # Progress bar for desktop processing
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        for i, uploaded_file in enumerate(uploaded_files):
-            try:
-                # Check file size
-                file_size = uploaded_file.size if hasattr(uploaded_file, 'size') else len(uploaded_file.getvalue())
-                
-                if file_size > max_size:
-                    st.error(f"❌ {uploaded_file.name}: File too large ({file_size/(1024*1024):.1f}MB). Max: {max_size/(1024*1024)}MB")
-                    continue
-                
-                status_text.text(f"📂 Processing {uploaded_file.name}...")
-                file_name = uploaded_file.name.lower()
-                
-                # Desktop processing - no retries needed
-                max_retries = 1
-                df = None
-                
-                for attempt in range(max_retries):
-                    try:
-                        if file_name.endswith('.csv'):
-                            # Try to determine delimiter
-                            try:
-                                sample = str(uploaded_file.read(1024))
-                                uploaded_file.seek(0)
-                                
-                                # Desktop processing - full file reading
-                                if ';' in sample:
-                                    df = pd.read_csv(uploaded_file, sep=';', encoding='utf-8')
-                                else:
-                                    df = pd.read_csv(uploaded_file, encoding='utf-8')
-                            except UnicodeDecodeError:
-                                # Fallback encoding for problematic files
-                                uploaded_file.seek(0)
-                                df = pd.read_csv(uploaded_file, encoding='latin-1')
-                                
-                        elif file_name.endswith(('.xlsx', '.xls')):
-                            df = pd.read_excel(uploaded_file)
-                        elif file_name.endswith('.json'):
-                            df = pd.read_json(uploaded_file)
-                        else:
-                            st.error(f"❌ Unsupported format: {file_name}")
-                            break
-                        
-                        # If successful, break retry loop
-                        if df is not None:
-                            break
-                            
-                    except Exception as retry_error:
-                        if attempt < max_retries - 1:
-                            st.warning(f"⚠️ Attempt {attempt + 1} failed for {uploaded_file.name}, retrying...")
-                            time.sleep(1)  # Brief pause before retry
-                        else:
-                            raise retry_error
-                
-                if df is not None:
-                    
-                    dfs.append(df)
-                    st.success(f"✅ {uploaded_file.name} — Loaded {len(df)} rows, {len(df.columns)} columns")
-                
-                # Update progress
-                progress_bar.progress((i + 1) / len(uploaded_files))
-
-            except Exception as e:
-                error_msg = str(e).lower()
-                st.error(f"⚠️ Error reading {uploaded_file.name}: {str(e)}")
-                
-                # Specific AxiosError handling
-                if 'network' in error_msg or 'axios' in error_msg or 'timeout' in error_msg:
-                    st.error("🚨 **AxiosError/Network Error Detected!**")
-                    st.info("🔧 **Try these solutions:**")
-                    st.markdown("""
-                    - ✅ **Enable Mobile Mode** in sidebar
-                    - 🔄 **Refresh page** and try again
-                    - 📶 **Check internet connection**
-                    - 📱 **Use Telegram bot** instead
-                    - 📝 **Try smaller file** (<5MB)
-                    """)
-        
-        # Clear progress indicators
-        progress_bar.empty()
-        status_text.empty()
-
-        if dfs:
-            if len(dfs) == 1:
-                combined_df = dfs[0]
-            else:
-                # בדיקת זיכרון לפני איחוד קבצים
-                total_rows = sum(len(df) for df in dfs)
-                total_memory_mb = sum(df.memory_usage(deep=True).sum() / (1024*1024) for df in dfs)
-                
-                # אזהרה אם הנתונים גדולים מדי
-                if total_rows > 1000000:  # יותר ממיליון שורות
-                    st.warning(f"⚠️ **Large dataset detected:** {total_rows:,} total rows, ~{total_memory_mb:.1f} MB")
-                    st.info("This may use significant memory. Consider processing files individually if you experience issues.")
-                elif total_memory_mb > 500:  # יותר מ-500MB
-                    st.warning(f"⚠️ **Memory usage:** ~{total_memory_mb:.1f} MB - Processing large dataset...")
-                
-                # Combine files with improved error handling
-                try:
-                    with st.spinner("🔄 Combining files..."):
-                        combined_df = pd.concat(dfs, ignore_index=True)
-                except MemoryError:
-                    st.error("❌ **Memory Error:** Dataset too large to combine. Try processing files individually.")
-                    combined_df = dfs[0]  # Use first file as fallback
-                except Exception as e:
-                    st.error(f"Error combining files: {e}")
-                    combined_df = dfs[0]  # Use first file
-            
-            st.session_state.data = combined_df
+            combined_df = st.session_state.data
             st.success(f"📊 Total loaded: {len(combined_df)} rows, {len(combined_df.columns)} columns")
             
             # Preview
@@ -1260,16 +1769,22 @@ def show_upload():
                 if st.button("🗑️ Remove Duplicates"):
                     initial_len = len(combined_df)
                     combined_df = combined_df.drop_duplicates()
-                    st.session_state.data = combined_df
                     removed = initial_len - len(combined_df)
                     st.success(f"Removed {removed} duplicates")
                     if removed > 0:
+                        set_session_data(combined_df, step=f"Remove duplicates (-{removed:,} rows)")
                         st.rerun()
             
             with col2:
+                group_options = ["None"] + combined_df.select_dtypes(include=['object', 'category']).columns.tolist()
+                impute_group = st.selectbox("Impute by group", group_options, key="impute_group",
+                                            help="Fill numeric gaps with the median of each group")
                 if st.button("🔧 Fill Missing Values"):
-                    combined_df = fill_missing_values(combined_df)
-                    st.session_state.data = combined_df
+                    combined_df = fill_missing_values(
+                        combined_df, group_by=None if impute_group == "None" else impute_group
+                    )
+                    step = "Fill missing values" + ("" if impute_group == "None" else f" by {impute_group}")
+                    set_session_data(combined_df, step=step)
                     st.success("Missing values filled!")
                     st.rerun()
             
@@ -1281,8 +1796,156 @@ def show_upload():
                         st.dataframe(combined_df[numeric_cols].describe())
                     else:
                         st.info("No numeric columns for analysis")
-
-def show_charts():
+            
+            # Undo / redo between the cleaning steps (only moves between stored versions)
+            versions = st.session_state.data_versions
+            undo_col, redo_col, current_col = st.columns([1, 1, 4])
+            with undo_col:
+                if st.button("↩️ Undo", disabled=not versions.can_undo, key="undo_cleaning"):
+                    undo_session_data()
+                    st.rerun()
+            with redo_col:
+                if st.button("↪️ Redo", disabled=not versions.can_redo, key="redo_cleaning"):
+                    redo_session_data()
+                    st.rerun()
+            with current_col:
+                st.caption(f"Current version: **{versions.current.step}** (`{versions.current.id}`)")
+            
+            with st.expander("🕘 Cleaning history"):
+                for version, is_current in versions.history():
+                    marker = "👉 " if is_current else ""
+                    shared = (f" · shares {len(version.shared)} of {len(version.frame.columns)} columns with the previous version"
+                              if version.parent_id is not None else "")
+                    st.write(f"{marker}**{version.step}**: {len(version.frame):,} rows × "
+                             f"{len(version.frame.columns)} columns · `{version.id}`{shared}")
+
+def read_uploaded_files(uploaded_files, max_size):
+    """
+    קריאת הקבצים שהועלו (CSV, Excel, JSON) ואיחודם למסגרת נתונים אחת
+    
+    פרמטרים:
+        uploaded_files (list): הקבצים מ-st.file_uploader
+        max_size (int): גודל קובץ מרבי בבתים
+    
+    החזרה:
+        DataFrame או None: הנתונים המאוחדים, או None אם אף קובץ לא נקרא
+    """
+    dfs = []
+    
+    # Progress bar for desktop processing
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    
+    for i, uploaded_file in enumerate(uploaded_files):
+        try:
+            # Check file size
+            file_size = uploaded_file.size if hasattr(uploaded_file, 'size') else len(uploaded_file.getvalue())
+            
+            if file_size > max_size:
+                st.error(f"❌ {uploaded_file.name}: File too large ({file_size/(1024*1024):.1f}MB). Max: {max_size/(1024*1024)}MB")
+                continue
+            
+            status_text.text(f"📂 Processing {uploaded_file.name}...")
+            file_name = uploaded_file.name.lower()
+            
+            # Desktop processing - no retries needed
+            max_retries = 1
+            df = None
+            
+            for attempt in range(max_retries):
+                try:
+                    if file_name.endswith('.csv'):
+                        # Try to determine delimiter
+                        try:
+                            sample = str(uploaded_file.read(1024))
+                            uploaded_file.seek(0)
+                            
+                            # Desktop processing - full file reading
+                            if ';' in sample:
+                                df = pd.read_csv(uploaded_file, sep=';', encoding='utf-8')
+                            else:
+                                df = pd.read_csv(uploaded_file, encoding='utf-8')
+                        except UnicodeDecodeError:
+                            # Fallback encoding for problematic files
+                            uploaded_file.seek(0)
+                            df = pd.read_csv(uploaded_file, encoding='latin-1')
+                            
+                    elif file_name.endswith(('.xlsx', '.xls')):
+                        df = pd.read_excel(uploaded_file)
+                    elif file_name.endswith('.json'):
+                        df = pd.read_json(uploaded_file)
+                    else:
+                        st.error(f"❌ Unsupported format: {file_name}")
+                        break
+                    
+                    # If successful, break retry loop
+                    if df is not None:
+                        break
+                        
+                except Exception as retry_error:
+                    if attempt < max_retries - 1:
+                        st.warning(f"⚠️ Attempt {attempt + 1} failed for {uploaded_file.name}, retrying...")
+                        time.sleep(1)  # Brief pause before retry
+                    else:
+                        raise retry_error
+            
+            if df is not None:
+                
+                dfs.append(df)
+                st.success(f"✅ {uploaded_file.name} — Loaded {len(df)} rows, {len(df.columns)} columns")
+            
+            # Update progress
+            progress_bar.progress((i + 1) / len(uploaded_files))
+
+        except Exception as e:
+            error_msg = str(e).lower()
+            st.error(f"⚠️ Error reading {uploaded_file.name}: {str(e)}")
+            
+            # Specific AxiosError handling
+            if 'network' in error_msg or 'axios' in error_msg or 'timeout' in error_msg:
+                st.error("🚨 **AxiosError/Network Error Detected!**")
+                st.info("🔧 **Try these solutions:**")
+                st.markdown("""
+                - ✅ **Enable Mobile Mode** in sidebar
+                - 🔄 **Refresh page** and try again
+                - 📶 **Check internet connection**
+                - 📱 **Use Telegram bot** instead
+                - 📝 **Try smaller file** (<5MB)
+                """)
+    
+    # Clear progress indicators
+    progress_bar.empty()
+    status_text.empty()
+
+    if not dfs:
+        return None
+    if len(dfs) == 1:
+        combined_df = dfs[0]
+    else:
+        # בדיקת זיכרון לפני איחוד קבצים
+        total_rows = sum(len(df) for df in dfs)
+        total_memory_mb = sum(df.memory_usage(deep=True).sum() / (1024*1024) for df in dfs)
+        
+        # אזהרה אם הנתונים גדולים מדי
+        if total_rows > 1000000:  # יותר ממיליון שורות
+            st.warning(f"⚠️ **Large dataset detected:** {total_rows:,} total rows, ~{total_memory_mb:.1f} MB")
+            st.info("This may use significant memory. Consider processing files individually if you experience issues.")
+        elif total_memory_mb > 500:  # יותר מ-500MB
+            st.warning(f"⚠️ **Memory usage:** ~{total_memory_mb:.1f} MB - Processing large dataset...")
+        
+        # Combine files with improved error handling
+        try:
+            with st.spinner("🔄 Combining files..."):
+                combined_df = pd.concat(dfs, ignore_index=True)
+        except MemoryError:
+            st.error("❌ **Memory Error:** Dataset too large to combine. Try processing files individually.")
+            combined_df = dfs[0]  # Use first file as fallback
+        except Exception as e:
+            st.error(f"Error combining files: {e}")
+            combined_df = dfs[0]  # Use first file
+    return combined_df
+
+def show_charts():
     """
     הצגת ממשק ויזואליזציות נתונים אינטראקטיביות
     
@@ -1319,12 +1982,27 @@ def show_charts():
     df = st.session_state.data
     numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
     text_cols = df.select_dtypes(include=['object', 'string']).columns.tolist()
-    datetime_cols = df.select_dtypes(include=['datetime64']).columns.tolist()
     
+    chart_builder(df, numeric_cols, text_cols)
+
+@fragment
+def chart_builder(df, numeric_cols, text_cols):
+    """
+    בונה התרשימים: בחירת סוג התרשים, ההגדרות שלו והתרשים עצמו
+    
+    מטרת הפונקציה:
+    - רץ מחדש לבדו (st.fragment): שינוי עמודה, סוג תרשים או טווח תצוגה
+      מצייר מחדש רק את התרשים, בלי סרגל הצד ושאר הדף
+    
+    פרמטרים:
+        df (DataFrame): הנתונים הטעונים
+        numeric_cols (list): העמודות הנומריות
+        text_cols (list): העמודות הטקסטואליות
+    """
     # Chart type selection
     chart_type = st.selectbox(
         "📊 Select chart type", 
-        ["📈 Line Chart", "📊 Bar Chart", "🔵 Scatter Plot", "🌐 3D Scatter Plot",
+        ["📈 Line Chart", "📊 Bar Chart", "🔵 Scatter Plot", "🔥 Density Raster", "🌐 3D Scatter Plot",
          "📉 Area Chart", "🗺️ Heatmap", "🥧 Pie Chart", 
          "📦 Box Plot", "📊 Histogram", "🎻 Violin Plot"]
     )
@@ -1338,16 +2016,32 @@ def show_charts():
         with col2:
             x_col = st.selectbox("X-axis (optional)", ["Index"] + list(df.columns))
         
+        line_data = df
         if x_col == "Index":
-            fig = px.line(df, y=y_col, title=f"Trend: {y_col}")
+            line_data = get_chart_points(df, dataset_fingerprint(df), 'line', [y_col])
+            fig = cached_figure(df, 'line', {'y': y_col}, lambda: chart_factory.line(
+                line_data, y=y_col, title=f"Trend: {y_col}"
+            ))
+        elif len(df) > DEFAULT_POINT_BUDGET and x_col in detect_datetime_columns(df[[x_col]]):
+            # Large time series: draw bucket means from the cached rollups
+            rollups = get_time_rollups(df, x_col)
+            resolution = rollups.choose_resolution()
+            rollup_data = rollups.series(y_col, resolution, 'mean').reset_index()
+            fig = cached_figure(df, 'line_rollup', {'x': x_col, 'y': y_col, 'resolution': resolution},
+                                lambda: chart_factory.line(rollup_data, x=x_col, y=y_col,
+                                                           title=f"{y_col} by {x_col} ({resolution} mean)"))
         else:
-            fig = px.line(df, x=x_col, y=y_col, title=f"{y_col} by {x_col}")
+            line_data = get_chart_points(df, dataset_fingerprint(df), 'line', [y_col], x=x_col)
+            fig = cached_figure(df, 'line', {'x': x_col, 'y': y_col}, lambda: chart_factory.line(
+                line_data, x=x_col, y=y_col, title=f"{y_col} by {x_col}"
+            ))
         
         st.plotly_chart(fig, use_container_width=True)
+        show_point_reduction_note(line_data, df)
         
         # Insights for line chart
         if len(numeric_cols) > 0:
-            trend_analysis = analyze_trend(df[y_col])
+            trend_analysis = trends.describe_trend(get_trend_table(df).loc[y_col])
             st.info(f"📈 Trend: {trend_analysis}")
     
     elif chart_type == "📊 Bar Chart":
@@ -1360,10 +2054,11 @@ def show_charts():
             with col2:
                 val_col = st.selectbox("Value", numeric_cols)
             
-            # Data aggregation
-            agg_data = df.groupby(cat_col)[val_col].mean().reset_index()
-            fig = px.bar(agg_data, x=cat_col, y=val_col, 
-                        title=f"Average {val_col} by {cat_col}")
+            # Data aggregation (served from the memoized cube)
+            agg_data = get_aggregation_cube(df).mean(cat_col, val_col).reset_index()
+            fig = cached_figure(df, 'bar', {'category': cat_col, 'value': val_col}, lambda: px.bar(
+                agg_data, x=cat_col, y=val_col, title=f"Average {val_col} by {cat_col}"
+            ))
             st.plotly_chart(fig, use_container_width=True)
             
             # Insights
@@ -1386,56 +2081,58 @@ def show_charts():
             color_col = st.selectbox("Color by", ["None"] + text_cols, key="3d_color")
         
         # Create 3D scatter plot
-        fig = go.Figure()
-        
-        if color_col == "None":
-            fig.add_trace(go.Scatter3d(
-                x=df[x_col],
-                y=df[y_col],
-                z=df[z_col],
-                mode='markers',
-                marker=dict(
-                    size=5,
-                    color=df[z_col],
-                    colorscale='Viridis',
-                    colorbar=dict(title=z_col),
-                    opacity=0.8
-                ),
-                text=[f'{x_col}: {x}<br>{y_col}: {y}<br>{z_col}: {z}' 
-                      for x, y, z in zip(df[x_col], df[y_col], df[z_col])],
-                hovertemplate='%{text}<extra></extra>'
-            ))
-        else:
-            for category in df[color_col].unique():
-                mask = df[color_col] == category
-                fig.add_trace(go.Scatter3d(
-                    x=df[mask][x_col],
-                    y=df[mask][y_col],
-                    z=df[mask][z_col],
+        points = get_chart_points(df, dataset_fingerprint(df), 'scatter', [x_col, y_col, z_col])
+        def build_3d():
+            fig = go.Figure()
+        
+            if color_col == "None":
+                fig.add_trace(chart_factory.trace3d(
+                    x=points[x_col],
+                    y=points[y_col],
+                    z=points[z_col],
                     mode='markers',
-                    name=str(category),
-                    marker=dict(size=5, opacity=0.8),
-                    text=[f'{x_col}: {x}<br>{y_col}: {y}<br>{z_col}: {z}<br>{color_col}: {c}' 
-                          for x, y, z, c in zip(df[mask][x_col], df[mask][y_col], 
-                                               df[mask][z_col], df[mask][color_col])],
-                    hovertemplate='%{text}<extra></extra>'
+                    marker=dict(
+                        size=5,
+                        color=points[z_col],
+                        colorscale='Viridis',
+                        colorbar=dict(title=z_col),
+                        opacity=0.8
+                    ),
+                    labels=(x_col, y_col, z_col)
                 ))
+            else:
+                for category in points[color_col].unique():
+                    mask = points[color_col] == category
+                    fig.add_trace(chart_factory.trace3d(
+                        x=points[mask][x_col],
+                        y=points[mask][y_col],
+                        z=points[mask][z_col],
+                        mode='markers',
+                        name=str(category),
+                        marker=dict(size=5, opacity=0.8),
+                        labels=(x_col, y_col, z_col),
+                        extra={color_col: category}
+                    ))
         
-        fig.update_layout(
-            title=f"3D Scatter Plot: {x_col} vs {y_col} vs {z_col}",
-            scene=dict(
-                xaxis_title=x_col,
-                yaxis_title=y_col,
-                zaxis_title=z_col,
-                camera=dict(
-                    eye=dict(x=1.2, y=1.2, z=1.2)
-                )
-            ),
-            width=800,
-            height=600
-        )
+            fig.update_layout(
+                title=f"3D Scatter Plot: {x_col} vs {y_col} vs {z_col}",
+                scene=dict(
+                    xaxis_title=x_col,
+                    yaxis_title=y_col,
+                    zaxis_title=z_col,
+                    camera=dict(
+                        eye=dict(x=1.2, y=1.2, z=1.2)
+                    )
+                ),
+                width=800,
+                height=600
+            )
+            return fig
+        
+        fig = cached_figure(df, 'scatter_3d', {'x': x_col, 'y': y_col, 'z': z_col, 'color': color_col}, build_3d)
         
         st.plotly_chart(fig, use_container_width=True)
+        show_point_reduction_note(points, df)
         
         # 3D correlation analysis
         st.markdown("#### 🔗 3D Correlation Analysis")
@@ -1473,13 +2170,17 @@ def show_charts():
         with col3:
             color_col = st.selectbox("Color by", ["None"] + list(text_cols))
         
-        if color_col == "None":
-            fig = px.scatter(df, x=x_col, y=y_col, title=f"{y_col} vs {x_col}")
-        else:
-            fig = px.scatter(df, x=x_col, y=y_col, color=color_col, 
-                           title=f"{y_col} vs {x_col} (color: {color_col})")
+        points = get_chart_points(df, dataset_fingerprint(df), 'scatter', [x_col, y_col])
+        
+        def build_scatter():
+            if color_col == "None":
+                return chart_factory.scatter(points, x=x_col, y=y_col, title=f"{y_col} vs {x_col}")
+            return chart_factory.scatter(points, x=x_col, y=y_col, color=color_col, 
+                                         title=f"{y_col} vs {x_col} (color: {color_col})")
+        fig = cached_figure(df, 'scatter', {'x': x_col, 'y': y_col, 'color': color_col}, build_scatter)
         
         st.plotly_chart(fig, use_container_width=True)
+        show_point_reduction_note(points, df)
         
         # Correlation analysis
         correlation = df[x_col].corr(df[y_col])
@@ -1490,43 +2191,101 @@ def show_charts():
         else:
             st.warning(f"📉 Weak correlation: {correlation:.3f}")
     
+    elif chart_type == "🔥 Density Raster" and len(numeric_cols) >= 2:
+        st.markdown("### 🔥 Density Raster")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            x_col = st.selectbox("X-axis", numeric_cols, key="raster_x")
+        with col2:
+            y_col = st.selectbox("Y-axis", [col for col in numeric_cols if col != x_col], key="raster_y")
+        with col3:
+            how = st.selectbox("Aggregate", density_raster.AGGREGATES, key="raster_how")
+        with col4:
+            value_col = None
+            if how != "count":
+                value_col = st.selectbox("Value column", numeric_cols, key="raster_value")
+        width = st.select_slider("Resolution (cells across)", [100, 200, 400, 800],
+                                 value=density_raster.DEFAULT_WIDTH, key="raster_width")
+        
+        # Viewport: narrowing the ranges zooms in and re-aggregates the rows in view
+        x_full = density_raster.value_range(df[x_col])
+        y_full = density_raster.value_range(df[y_col])
+        x_key, y_key = f"raster_xview_{x_col}", f"raster_yview_{y_col}"
+        
+        def reset_raster_view():
+            st.session_state.pop(x_key, None)
+            st.session_state.pop(y_key, None)
+        
+        view_col1, view_col2, view_col3 = st.columns([3, 3, 1])
+        with view_col1:
+            x_view = st.slider(f"{x_col} range", x_full[0], x_full[1], x_full,
+                               step=(x_full[1] - x_full[0]) / 200, key=x_key)
+        with view_col2:
+            y_view = st.slider(f"{y_col} range", y_full[0], y_full[1], y_full,
+                               step=(y_full[1] - y_full[0]) / 200, key=y_key)
+        with view_col3:
+            st.button("🔄 Reset view", on_click=reset_raster_view, key="raster_reset")
+        
+        grid = density_raster.cached_grid(
+            dataset_fingerprint(df), df, x_col, y_col, value_col, how,
+            tuple(x_view), tuple(y_view), width=width, height=width * 3 // 4
+        )
+        value_label = "count" if how == "count" else f"{how} {value_col}"
+        
+        def build_raster():
+            fig = go.Figure(density_raster.heatmap_trace(grid, value_label=value_label))
+            fig.update_layout(
+                title=f"{y_col} vs {x_col} ({value_label} per cell)",
+                xaxis_title=x_col,
+                yaxis_title=y_col
+            )
+            return fig
+        raster_params = {'x': x_col, 'y': y_col, 'value': value_col, 'how': how, 'width': width,
+                         'x_view': tuple(x_view), 'y_view': tuple(y_view)}
+        fig = cached_figure(df, 'density_raster', raster_params, build_raster)
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(f"🔥 {grid.n_points:,} rows in view aggregated into "
+                   f"{grid.values.shape[1]}×{grid.values.shape[0]} cells")
+    
     elif chart_type == "🗺️ Heatmap" and len(numeric_cols) >= 2:
         st.markdown("### 🗺️ Correlation Heatmap")
         
-        corr_matrix = df[numeric_cols].corr()
-        fig = px.imshow(corr_matrix, 
-                       title="Correlation Matrix",
-                       color_continuous_scale="RdBu",
-                       aspect="auto")
+        # Clustered order; wide data shows its most correlated variables, values only on small matrices
+        view = correlation_view.heatmap_view(df, numeric_cols, dataset_fingerprint(df))
+        fig = cached_figure(df, 'heatmap', {'columns': tuple(numeric_cols)}, lambda: px.imshow(
+            view['matrix'], 
+            title="Correlation Matrix" + correlation_view.title_suffix(view),
+            color_continuous_scale="RdBu",
+            aspect="auto",
+            text_auto='.2f' if view['annotate'] else False
+        ))
         st.plotly_chart(fig, use_container_width=True)
         
-        # Find strong correlations
-        strong_corrs = []
-        for i in range(len(corr_matrix.columns)):
-            for j in range(i+1, len(corr_matrix.columns)):
-                corr_val = corr_matrix.iloc[i, j]
-                if abs(corr_val) > 0.7:
-                    strong_corrs.append(
-                        (corr_matrix.columns[i], corr_matrix.columns[j], corr_val)
-                    )
+        # Find strong correlations (over all variables)
+        strong_corrs = correlation_view.strong_pairs(view['corr'], 0.7)
         
         if strong_corrs:
             st.markdown("#### 🔗 Strong Correlations:")
-            for var1, var2, corr in strong_corrs:
+            for var1, var2, corr in strong_corrs[:20]:
                 st.write(f"• {var1} ↔ {var2}: {corr:.3f}")
+            if len(strong_corrs) > 20:
+                st.caption(f"...and {len(strong_corrs) - 20} more pairs")
     
     elif chart_type == "🥧 Pie Chart" and len(text_cols) > 0:
         st.markdown("### 🥧 Pie Chart")
         
         cat_col = st.selectbox("Select category", text_cols)
-        value_counts = df[cat_col].value_counts().head(10)  # Top-10 categories
+        cube = get_aggregation_cube(df)
+        value_counts = cube.value_counts(cat_col).head(10)  # Top-10 categories
         
-        fig = px.pie(values=value_counts.values, names=value_counts.index,
-                    title=f"Distribution of {cat_col}")
+        fig = cached_figure(df, 'pie', {'category': cat_col}, lambda: px.pie(
+            values=value_counts.values, names=value_counts.index, title=f"Distribution of {cat_col}"
+        ))
         st.plotly_chart(fig, use_container_width=True)
         
         # Statistics
-        st.write(f"📊 Total unique values: {df[cat_col].nunique()}")
+        st.write(f"📊 Total unique values: {cube.nunique(cat_col)}")
         dominant_cat = value_counts.index[0]
         dominant_pct = (value_counts.iloc[0] / len(df)) * 100
         st.info(f"🎯 Dominant category: {dominant_cat} ({dominant_pct:.1f}%)")
@@ -1540,22 +2299,25 @@ def show_charts():
         with col2:
             group_col = st.selectbox("Grouping", ["None"] + list(text_cols))
         
-        if group_col == "None":
-            fig = px.box(df, y=num_col, title=f"Distribution of {num_col}")
-        else:
-            fig = px.box(df, x=group_col, y=num_col, 
-                        title=f"Distribution of {num_col} by {group_col}")
+        # Boxes drawn from precomputed quartiles, whiskers and a capped outlier sample
+        def build_box():
+            version = dataset_fingerprint(df)
+            if group_col == "None":
+                summaries = [(num_col, distributions.cached_box(version, df, num_col))]
+                return distributions.box_figure(summaries, f"Distribution of {num_col}", num_col,
+                                                colors=px.colors.qualitative.Plotly)
+            summaries = distributions.cached_box(version, df, num_col, group_col)
+            return distributions.box_figure(summaries, f"Distribution of {num_col} by {group_col}",
+                                            num_col, x_title=group_col, colors=px.colors.qualitative.Plotly)
+        fig = cached_figure(df, 'box', {'col': num_col, 'group': group_col}, build_box)
         
         st.plotly_chart(fig, use_container_width=True)
         
         # Outlier analysis
-        Q1 = df[num_col].quantile(0.25)
-        Q3 = df[num_col].quantile(0.75)
-        IQR = Q3 - Q1
-        outliers = df[(df[num_col] < Q1 - 1.5*IQR) | (df[num_col] > Q3 + 1.5*IQR)]
+        outlier_count = get_outlier_report(df).counts.loc[num_col, 'IQR']
         
-        if len(outliers) > 0:
-            st.warning(f"⚠️ Outliers detected: {len(outliers)} ({len(outliers)/len(df)*100:.1f}%)")
+        if outlier_count > 0:
+            st.warning(f"⚠️ Outliers detected: {outlier_count} ({outlier_count/len(df)*100:.1f}%)")
         else:
             st.success("✅ No outliers detected")
 
@@ -1570,25 +2332,31 @@ def show_charts():
         with col3:
             show_normal = st.checkbox("Show normal curve", False)
         
-        fig = px.histogram(df, x=hist_col, nbins=bins, title=f"Distribution: {hist_col}")
+        def build_histogram():
+            summary = distributions.cached_histogram(dataset_fingerprint(df), df, hist_col, bins)
+            fig = distributions.histogram_figure(summary, f"Distribution: {hist_col}", hist_col)
         
-        if show_normal:
-            # Add normal distribution overlay
-            mean_val = df[hist_col].mean()
-            std_val = df[hist_col].std()
-            x_range = np.linspace(df[hist_col].min(), df[hist_col].max(), 100)
-            normal_curve = stats.norm.pdf(x_range, mean_val, std_val)
+            if show_normal:
+                # Add normal distribution overlay
+                mean_val = df[hist_col].mean()
+                std_val = df[hist_col].std()
+                x_range = np.linspace(df[hist_col].min(), df[hist_col].max(), 100)
+                normal_curve = stats.norm.pdf(x_range, mean_val, std_val)
             
-            # Scale normal curve to match histogram
-            normal_curve = normal_curve * len(df) * (df[hist_col].max() - df[hist_col].min()) / bins
+                # Scale normal curve to match histogram
+                normal_curve = normal_curve * len(df) * (df[hist_col].max() - df[hist_col].min()) / bins
             
-            fig.add_trace(go.Scatter(
-                x=x_range,
-                y=normal_curve,
-                mode='lines',
-                name='Normal Distribution',
-                line=dict(color='red', width=2)
-            ))
+                fig.add_trace(chart_factory.trace(
+                    x=x_range,
+                    y=normal_curve,
+                    mode='lines',
+                    name='Normal Distribution',
+                    line=dict(color='red', width=2)
+                ))
+            return fig
+        
+        fig = cached_figure(df, 'histogram', {'col': hist_col, 'bins': bins, 'normal': show_normal},
+                            build_histogram)
         
         st.plotly_chart(fig, use_container_width=True)
         
@@ -1612,25 +2380,30 @@ def show_charts():
         with col2:
             group_by = st.selectbox("Group by", ["None"] + text_cols, key="violin_group")
         
-        if group_by == "None":
-            fig = go.Figure()
-            fig.add_trace(go.Violin(
-                y=df[violin_col],
-                name=violin_col,
-                box_visible=True,
-                meanline_visible=True
-            ))
-            fig.update_layout(title=f"Violin Plot: {violin_col}")
-        else:
-            fig = px.violin(df, y=violin_col, x=group_by, box=True,
-                          title=f"Violin Plot: {violin_col} by {group_by}")
+        def build_violin():
+            if group_by == "None":
+                fig = go.Figure()
+                fig.add_trace(go.Violin(
+                    y=df[violin_col],
+                    name=violin_col,
+                    box_visible=True,
+                    meanline_visible=True
+                ))
+                fig.update_layout(title=f"Violin Plot: {violin_col}")
+            else:
+                fig = px.violin(df, y=violin_col, x=group_by, box=True,
+                              title=f"Violin Plot: {violin_col} by {group_by}")
+            return fig
+        
+        fig = cached_figure(df, 'violin', {'col': violin_col, 'group': group_by}, build_violin)
         
         st.plotly_chart(fig, use_container_width=True)
         
         # Violin plot insights
         if group_by != "None":
             st.markdown("#### 📊 Group Comparison")
-            group_stats = df.groupby(group_by)[violin_col].agg(['mean', 'std', 'median']).round(2)
+            group_stats = get_aggregation_cube(df).stats(group_by, violin_col)
+            group_stats = group_stats[['count', 'mean', 'std', 'min', 'max']].round(2)
             st.dataframe(group_stats)
     
     elif chart_type == "📉 Area Chart" and len(numeric_cols) > 0:
@@ -1645,19 +2418,28 @@ def show_charts():
             normalize = st.checkbox("Normalize (0-1)", False)
         
         if area_cols:
-            df_area = df[area_cols].copy()
+            def build_area():
+                df_area = df[area_cols].copy()
+            
+                if normalize:
+                    df_area = (df_area - df_area.min()) / (df_area.max() - df_area.min())
             
-            if normalize:
-                df_area = (df_area - df_area.min()) / (df_area.max() - df_area.min())
+                if cumulative:
+                    df_area = df_area.cumsum()
             
-            if cumulative:
-                df_area = df_area.cumsum()
+                df_area['index'] = range(len(df_area))
             
-            df_area['index'] = range(len(df_area))
+                area_spec = (dataset_fingerprint(df), cumulative, normalize)
+                area_points = get_chart_points(df_area, area_spec, 'line', area_cols, x='index')
+                fig = chart_factory.area(area_points, x='index', y=area_cols,
+                                         title="Area Chart" + (" (Cumulative)" if cumulative else "") + (" (Normalized)" if normalize else ""))
+                fig.update_layout(meta={'points': len(area_points)})
+                return fig
             
-            fig = px.area(df_area, x='index', y=area_cols,
-                         title="Area Chart" + (" (Cumulative)" if cumulative else "") + (" (Normalized)" if normalize else ""))
+            area_params = {'columns': tuple(area_cols), 'cumulative': cumulative, 'normalize': normalize}
+            fig = cached_figure(df, 'area', area_params, build_area)
             st.plotly_chart(fig, use_container_width=True)
+            show_point_reduction_note(fig.layout.meta['points'], df)
     
     else:
         if len(numeric_cols) < 2:
@@ -1677,6 +2459,9 @@ def analyze_trend(series):
     - הערכת שיעור השינוי האחוזי בסדרה
     - מתן תיאור מילולי מפורט של הטרנד
     
+    החישוב עצמו מתבצע במנוע הטרנדים הווקטורי (trends.py), אותו מנוע
+    שמחשב את טבלת הטרנדים לכל העמודות בלוח הבקרה ובדוחות
+    
     פרמטרים:
         series (pandas.Series): סדרת הנתונים לניתוח
     
@@ -1690,76 +2475,8 @@ def analyze_trend(series):
     if len(series) < 2:
         return "Insufficient data"
     
-    # Remove NaN values
-    clean_series = series.dropna()
-    if len(clean_series) < 2:
-        return "Insufficient clean data"
-    
-    # Linear regression trend
-    x = np.arange(len(clean_series))
-    z = np.polyfit(x, clean_series, 1)
-    slope = z[0]
-    
-    # Calculate trend strength
-    correlation = np.corrcoef(x, clean_series)[0, 1]
-    
-    # Determine trend direction and strength
-    if abs(correlation) > 0.7:
-        strength = "strong"
-    elif abs(correlation) > 0.4:
-        strength = "moderate"
-    else:
-        strength = "weak"
-    
-    if slope > 0:
-        direction = "upward"
-    elif slope < 0:
-        direction = "downward"
-    else:
-        direction = "flat"
-    
-    # Calculate percentage change
-    first_val = clean_series.iloc[0]
-    last_val = clean_series.iloc[-1]
-    pct_change = ((last_val - first_val) / first_val) * 100 if first_val != 0 else 0
-    
-    return f"{strength.title()} {direction} trend (R²={correlation**2:.3f}, {pct_change:+.1f}% change)"
-
-def analyze_trend(series):
-    """
-    ניתוח טרנדים פשוט של סדרת נתונים
-    
-    מטרת הפונקציה:
-    - השוואה בין החצי הראשון לחצי השני של הסדרה
-    - חישוב שיעור השינוי בין החלקים
-    - קביעת כיוון הטרנד על בסיס השוואה זו
-    
-    פרמטרים:
-        series (pandas.Series): סדרת הנתונים לניתוח
-    
-    החזרה:
-        str: תיאור קצר של הטרנד
-        
-    דוגמאות לתוצאות:
-    - "Growing trend (+8.5%)"
-    - "Declining trend (-12.3%)"
-    - "Stable trend (+2.1%)"
-    """
-    if len(series) < 2:
-        return "Insufficient data"
-    
-    # Simple trend analysis
-    first_half = series[:len(series)//2].mean()
-    second_half = series[len(series)//2:].mean()
-    
-    change_pct = ((second_half - first_half) / first_half) * 100
-    
-    if change_pct > 5:
-        return f"Growing trend (+{change_pct:.1f}%)"
-    elif change_pct < -5:
-        return f"Declining trend ({change_pct:.1f}%)"
-    else:
-        return f"Stable trend ({change_pct:.1f}%)"
+    trend = trends.fit_trends(series.to_frame(name='value')).iloc[0]
+    return trends.describe_trend(trend)
 
 def show_stats():
     """
@@ -1816,40 +2533,46 @@ def show_stats():
         
         with col_a:
             # Histogram
-            fig_hist = px.histogram(df, x=selected_col, title=f"Histogram: {selected_col}",
-                                  nbins=30)
+            fig_hist = cached_figure(df, 'stats_histogram', {'col': selected_col}, lambda: distributions.histogram_figure(
+                distributions.cached_histogram(dataset_fingerprint(df), df, selected_col, 30),
+                f"Histogram: {selected_col}", selected_col
+            ))
             st.plotly_chart(fig_hist, use_container_width=True)
         
         with col_b:
             # Q-Q plot for normality testing
-            from scipy import stats as scipy_stats
-            data_clean = df[selected_col].dropna()
+            def build_qq():
+                from scipy import stats as scipy_stats
+                data_clean = df[selected_col].dropna()
             
-            fig_qq = go.Figure()
+                fig_qq = go.Figure()
             
-            # Theoretical quantiles of normal distribution
-            theoretical_quantiles = scipy_stats.norm.ppf(np.linspace(0.01, 0.99, len(data_clean)))
-            sample_quantiles = np.sort(data_clean)
+                # Theoretical quantiles of normal distribution
+                theoretical_quantiles = scipy_stats.norm.ppf(np.linspace(0.01, 0.99, len(data_clean)))
+                sample_quantiles = np.sort(data_clean)
             
-            fig_qq.add_trace(go.Scatter(
-                x=theoretical_quantiles,
-                y=sample_quantiles,
-                mode='markers',
-                name='Data'
-            ))
+                fig_qq.add_trace(chart_factory.trace(
+                    x=theoretical_quantiles,
+                    y=sample_quantiles,
+                    mode='markers',
+                    name='Data'
+                ))
             
-            # Normal distribution line
-            fig_qq.add_trace(go.Scatter(
-                x=theoretical_quantiles,
-                y=theoretical_quantiles * data_clean.std() + data_clean.mean(),
-                mode='lines',
-                name='Normal Distribution',
-                line=dict(color='red', dash='dash')
-            ))
+                # Normal distribution line
+                fig_qq.add_trace(chart_factory.trace(
+                    x=theoretical_quantiles,
+                    y=theoretical_quantiles * data_clean.std() + data_clean.mean(),
+                    mode='lines',
+                    name='Normal Distribution',
+                    line=dict(color='red', dash='dash')
+                ))
             
-            fig_qq.update_layout(title=f"Q-Q Plot: {selected_col}",
-                               xaxis_title="Theoretical Quantiles",
-                               yaxis_title="Sample Quantiles")
+                fig_qq.update_layout(title=f"Q-Q Plot: {selected_col}",
+                                   xaxis_title="Theoretical Quantiles",
+                                   yaxis_title="Sample Quantiles")
+                return chart_factory.simplify(fig_qq)
+            
+            fig_qq = cached_figure(df, 'stats_qq', {'col': selected_col}, build_qq)
             st.plotly_chart(fig_qq, use_container_width=True)
     
     with col2:
@@ -1909,11 +2632,15 @@ def show_stats():
         # Outlier analysis
         st.markdown("#### 🎯 Outlier Analysis")
         if st.button("🔍 Find Outliers"):
-            outliers_info = detect_outliers_advanced(df[selected_col])
+            outlier_report = get_outlier_report(df)
+            outliers_info = outlier_report.method_results(selected_col)
             
             st.write("**Detection Methods:**")
             for method, data in outliers_info.items():
                 st.write(f"• {method}: {data['count']} outliers ({data['percentage']:.1f}%)")
+            
+            with st.expander(f"📋 Outliers in all {len(outlier_report.columns)} numeric columns"):
+                st.dataframe(outlier_report.counts, use_container_width=True)
 
 def detect_outliers_advanced(series):
     """
@@ -1940,43 +2667,102 @@ def detect_outliers_advanced(series):
             - 'z_score_outliers': רשימת ערכים חריגים בZ-Score
             - 'modified_z_outliers': רשימת ערכים חריגים בModified Z-Score
             - 'summary': סיכום כמותי של הערכים החריגים
+    
+    החישוב מתבצע במנוע הווקטורי (outliers.py) שמשמש גם לניתוח כל העמודות יחד
     """
     
-    results = {}
-    clean_data = series.dropna()
+    return outliers.detect_outliers(series.to_frame(name='value')).method_results('value')
+
+def run_clustering(df, features, n_clusters, scale_data, random_state):
+    """
+    אימון K-Means על העמודות שנבחרו (רץ כמשימת רקע)
     
-    # IQR method
-    Q1 = clean_data.quantile(0.25)
-    Q3 = clean_data.quantile(0.75)
-    IQR = Q3 - Q1
-    iqr_outliers = clean_data[(clean_data < Q1 - 1.5*IQR) | (clean_data > Q3 + 1.5*IQR)]
+    החזרה:
+        dict: הנתונים, ה-scaler, המודל, התוויות וציון ה-silhouette
+    """
+    # Data preparation
+    X = df[features].dropna()
     
-    results['IQR'] = {
-        'count': len(iqr_outliers),
-        'percentage': len(iqr_outliers) / len(clean_data) * 100
-    }
+    jobs.report_progress(0.1, "Scaling features")
+    if scale_data:
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+    else:
+        scaler = None
+        X_scaled = X.values
     
-    # Z-score method
-    z_scores = np.abs((clean_data - clean_data.mean()) / clean_data.std())
-    z_outliers = clean_data[z_scores > 3]
+    # Clustering (MiniBatchKMeans above the row threshold)
+    jobs.report_progress(0.2, f"Fitting {n_clusters} clusters on {len(X):,} rows")
+    kmeans, clusters = clustering.fit_kmeans(np.asarray(X_scaled), n_clusters, random_state)
     
-    results['Z-Score'] = {
-        'count': len(z_outliers),
-        'percentage': len(z_outliers) / len(clean_data) * 100
-    }
+    # Clustering quality metric (stratified sample for large data)
+    jobs.report_progress(0.8, "Scoring cluster quality")
+    silhouette_avg = clustering.sampled_silhouette(np.asarray(X_scaled), clusters, random_state=random_state)
     
-    # Modified Z-score (median)
-    median = clean_data.median()
-    mad = np.median(np.abs(clean_data - median))
-    modified_z_scores = 0.6745 * (clean_data - median) / mad
-    modified_z_outliers = clean_data[np.abs(modified_z_scores) > 3.5]
+    # Sizes, centroids and deviations of every cluster in one grouped pass
+    jobs.report_progress(0.9, "Profiling clusters")
+    profile = profile_clusters(X, clusters)
     
-    results['Modified Z-Score'] = {
-        'count': len(modified_z_outliers),
-        'percentage': len(modified_z_outliers) / len(clean_data) * 100
-    }
+    return {'X': X, 'scaler': scaler, 'model': kmeans, 'clusters': clusters,
+            'silhouette': silhouette_avg, 'profile': profile}
+
+def run_pca(df, features):
+    """
+    PCA על העמודות שנבחרו, עם ה-solver המתאים לצורת הנתונים (רץ כמשימת רקע)
+    """
+    # Data preparation
+    X = df[features].dropna()
+    
+    # Normalization
+    jobs.report_progress(0.1, "Scaling features")
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    
+    # PCA (randomized SVD for wide data, IncrementalPCA for tall data)
+    jobs.report_progress(0.3, f"Decomposing {len(X):,} rows x {len(features)} columns")
+    result = pca_engine.fit_pca(X_scaled)
+    result['scaler'] = scaler
+    return result
+
+def run_anomaly_detection(df, features, method, contamination):
+    """
+    זיהוי אנומליות בשיטה שנבחרה (רץ כמשימת רקע)
+    """
+    # Data preparation
+    X = df[features].dropna()
+    
+    # Normalization
+    jobs.report_progress(0.1, "Scaling features")
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    
+    # Anomaly detection (scalable LOF / One-Class SVM above the row limits)
+    jobs.report_progress(0.2, f"Fitting {method} on {len(X):,} rows")
+    detection = anomaly.detect_anomalies(X_scaled, method, contamination)
+    detection['X'] = X
+    detection['scaler'] = scaler
+    return detection
+
+def run_feature_importance(df, features, target_col, algorithm, n_estimators, random_state):
+    """
+    חשיבות משתנים על סט מבחן (רץ כמשימת רקע)
+    """
+    # Data preparation
+    feature_data = df[features + [target_col]].dropna()
     
-    return results
+    if len(feature_data) < 10:
+        raise ValueError("Not enough data for reliable feature importance analysis.")
+    
+    X = feature_data[features]
+    y = feature_data[target_col]
+    
+    # Held-out permutation importance on all cores
+    jobs.report_progress(0.1, f"Training {algorithm} on {len(X):,} rows")
+    result = importance.compute_importance(
+        X, y, algorithm, n_estimators, random_state,
+        version=dataset_fingerprint(df)
+    )
+    return {**result, 'target_correlations': X.corrwith(y)}
 
 def show_ml():
     """
@@ -2034,9 +2820,26 @@ def show_ml():
         st.warning("🔢 Need at least 2 numeric columns for ML analysis!")
         return
     
+    ml_workspace(df, numeric_cols)
+
+@fragment
+def ml_workspace(df, numeric_cols):
+    """
+    סביבת העבודה של עמוד למידת המכונה: סוג הניתוח, ההגדרות והתוצאות
+    
+    מטרת הפונקציה:
+    - רץ מחדש לבדו (st.fragment): שינוי הגדרה או הרצת מודל מעדכנים רק את
+      סביבת העבודה, בלי סרגל הצד ושאר הדף
+    - בזמן שמשימת רקע רצה, רק סביבת העבודה מתרעננת (poll_background_jobs)
+    
+    פרמטרים:
+        df (DataFrame): הנתונים הטעונים
+        numeric_cols (list): העמודות הנומריות
+    """
     ml_type = st.selectbox(
         "🤖 Select analysis type",
-        ["🎯 Clustering", "📉 PCA Analysis", "🔍 Anomaly Detection", "📊 Feature Importance"]
+        ["🎯 Clustering", "📉 PCA Analysis", "🔍 Anomaly Detection", "📊 Feature Importance",
+         "📦 Batch Scoring"]
     )
     
     if ml_type == "🎯 Clustering":
@@ -2058,92 +2861,98 @@ def show_ml():
             scale_data = st.checkbox("Normalize data", True)
             random_state = st.number_input("Random State", 0, 1000, 42)
         
-        if len(selected_features) >= 2 and st.button("🚀 Run Clustering"):
-            with st.spinner("Performing clustering..."):
-                # Data preparation
-                X = df[selected_features].dropna()
+        # Results are cached per dataset version, features and hyperparameters
+        params = {'n_clusters': n_clusters, 'scale_data': scale_data, 'random_state': int(random_state)}
+        cache_key = ml_cache_key(df, 'clustering', selected_features, params)
+        result = get_ml_cache().get(cache_key)
+        
+        # Fitting runs as a background job; a finished job's result moves into the cache
+        job, job_result = job_state(cache_key)
+        if job_result is not None:
+            result = get_ml_cache().put(cache_key, job_result)
+        
+        if len(selected_features) >= 2 and st.button("🚀 Run Clustering") and result is None and job is None:
+            job = start_job(cache_key, "K-Means clustering", run_clustering,
+                            df, selected_features, n_clusters, scale_data, int(random_state))
+        
+        if result is not None and len(selected_features) >= 2:
+            X, scaler, kmeans, clusters = result['X'], result['scaler'], result['model'], result['clusters']
+            
+            # Add clusters to data
+            df_clustered = X.copy()
+            df_clustered['Cluster'] = clusters
+            
+            # Visualization
+            if len(selected_features) >= 2:
+                cluster_points = get_chart_points(df_clustered, cache_key, 'scatter', selected_features[:2])
+                fig = chart_factory.scatter(
+                    cluster_points, 
+                    x=selected_features[0], 
+                    y=selected_features[1],
+                    color='Cluster',
+                    title="K-Means Clustering Results",
+                    color_discrete_sequence=px.colors.qualitative.Set1
+                )
                 
+                # Add centroids
                 if scale_data:
-                    scaler = StandardScaler()
-                    X_scaled = scaler.fit_transform(X)
+                    centroids_original = scaler.inverse_transform(kmeans.cluster_centers_)
                 else:
-                    X_scaled = X.values
-                
-                # Clustering
-                kmeans = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10)
-                clusters = kmeans.fit_predict(X_scaled)
-                
-                # Add clusters to data
-                df_clustered = X.copy()
-                df_clustered['Cluster'] = clusters
-                
-                # Visualization
-                if len(selected_features) >= 2:
-                    fig = px.scatter(
-                        df_clustered, 
-                        x=selected_features[0], 
-                        y=selected_features[1],
-                        color='Cluster',
-                        title="K-Means Clustering Results",
-                        color_discrete_sequence=px.colors.qualitative.Set1
-                    )
-                    
-                    # Add centroids
-                    if scale_data:
-                        centroids_original = scaler.inverse_transform(kmeans.cluster_centers_)
-                    else:
-                        centroids_original = kmeans.cluster_centers_
-                    
-                    fig.add_trace(go.Scatter(
-                        x=centroids_original[:, 0],
-                        y=centroids_original[:, 1],
-                        mode='markers',
-                        marker=dict(symbol='x', size=15, color='black'),
-                        name='Centroids'
-                    ))
-                    
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                # Cluster statistics
-                st.markdown("### 📊 Cluster Statistics")
-                cluster_stats = df_clustered.groupby('Cluster')[selected_features].agg(['mean', 'count'])
-                st.dataframe(cluster_stats)
+                    centroids_original = kmeans.cluster_centers_
                 
-                # Cluster analysis
-                st.markdown("### 💡 Cluster Analysis")
-                for i in range(n_clusters):
-                    cluster_data = df_clustered[df_clustered['Cluster'] == i]
-                    cluster_size = len(cluster_data)
-                    cluster_pct = (cluster_size / len(df_clustered)) * 100
-                    
-                    st.write(f"**Cluster {i}**: {cluster_size} points ({cluster_pct:.1f}%)")
-                    
-                    # Cluster characteristics
-                    for feature in selected_features[:3]:  # Show first 3 features
-                        mean_val = cluster_data[feature].mean()
-                        overall_mean = df_clustered[feature].mean()
-                        diff_pct = ((mean_val - overall_mean) / overall_mean) * 100
-                        
-                        if abs(diff_pct) > 10:
-                            if diff_pct > 0:
-                                st.write(f"  • {feature}: above average by {diff_pct:.1f}%")
-                            else:
-                                st.write(f"  • {feature}: below average by {abs(diff_pct):.1f}%")
+                fig.add_trace(chart_factory.trace(
+                    x=centroids_original[:, 0],
+                    y=centroids_original[:, 1],
+                    mode='markers',
+                    marker=dict(symbol='x', size=15, color='black'),
+                    name='Centroids'
+                ))
                 
-                # Clustering quality metric
-                from sklearn.metrics import silhouette_score
-                silhouette_avg = silhouette_score(X_scaled, clusters)
-                st.metric("Silhouette Score", f"{silhouette_avg:.3f}")
+                st.plotly_chart(fig, use_container_width=True)
+                show_point_reduction_note(cluster_points, df_clustered)
+            
+            # Cluster statistics (profile computed with the clustering, one grouped pass)
+            profile = result['profile']
+            st.markdown("### 📊 Cluster Statistics")
+            st.dataframe(profile.summary())
+            
+            # Cluster analysis
+            st.markdown("### 💡 Cluster Analysis")
+            pct_differences = profile.pct_differences()
+            for i in profile.clusters:
+                st.write(f"**Cluster {i}**: {profile.sizes[i]} points ({profile.shares[i]:.1f}%)")
                 
-                if silhouette_avg > 0.7:
-                    st.success("🎉 Excellent clustering quality!")
-                elif silhouette_avg > 0.5:
-                    st.info("👍 Good clustering quality")
-                elif silhouette_avg > 0.3:
-                    st.warning("⚠️ Satisfactory quality")
-                else:
-                    st.error("❌ Poor clustering quality")
-    
+                # Cluster characteristics: the features that set it apart most
+                for feature, z in profile.top_features(i):
+                    diff_pct = pct_differences.loc[i, feature]
+                    direction = "above" if z > 0 else "below"
+                    change = f" by {abs(diff_pct):.1f}%" if pd.notna(diff_pct) else ""
+                    st.write(f"  • {feature}: {direction} average{change} ({z:+.2f} std)")
+            
+            # Clustering quality metric (stratified sample for large data)
+            silhouette_avg = result['silhouette']
+            st.metric("Silhouette Score", f"{silhouette_avg:.3f}")
+            if len(X) > clustering.SILHOUETTE_SAMPLE_SIZE:
+                st.caption(f"Silhouette computed on a stratified sample of {clustering.SILHOUETTE_SAMPLE_SIZE:,} rows")
+            
+            if silhouette_avg > 0.7:
+                st.success("🎉 Excellent clustering quality!")
+            elif silhouette_avg > 0.5:
+                st.info("👍 Good clustering quality")
+            elif silhouette_avg > 0.3:
+                st.warning("⚠️ Satisfactory quality")
+            else:
+                st.error("❌ Poor clustering quality")
+            
+            render_model_saver(
+                df, 'clustering', selected_features, params,
+                {'silhouette': float(silhouette_avg)}, len(X),
+                lambda: model_registry.build_pipeline(scaler, kmeans)
+            )
+        
+        if job is not None:
+            show_job_progress(job)
+
     elif ml_type == "📉 PCA Analysis":
         st.markdown("### 📉 Principal Component Analysis (PCA)")
         
@@ -2153,86 +2962,100 @@ def show_ml():
             default=numeric_cols
         )
         
-        if len(selected_features) >= 2 and st.button("🔍 Perform PCA"):
-            with st.spinner("Performing PCA analysis..."):
-                # Data preparation
-                X = df[selected_features].dropna()
-                
-                # Normalization
-                scaler = StandardScaler()
-                X_scaled = scaler.fit_transform(X)
-                
-                # PCA
-                pca = PCA()
-                X_pca = pca.fit_transform(X_scaled)
-                
-                # Explained variance
-                explained_variance = pca.explained_variance_ratio_
-                cumulative_variance = np.cumsum(explained_variance)
-                
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    # Scree plot
-                    fig_scree = px.bar(
-                        x=range(1, len(explained_variance) + 1),
-                        y=explained_variance,
-                        title="Explained Variance by Component",
-                        labels={'x': 'Principal Component', 'y': 'Explained Variance'}
-                    )
-                    st.plotly_chart(fig_scree, use_container_width=True)
-                
-                with col2:
-                    # Cumulative explained variance
-                    fig_cum = px.line(
-                        x=range(1, len(cumulative_variance) + 1),
-                        y=cumulative_variance,
-                        title="Cumulative Explained Variance",
-                        labels={'x': 'Number of Components', 'y': 'Cumulative Variance'}
-                    )
-                    fig_cum.add_hline(y=0.95, line_dash="dash", line_color="red", 
-                                     annotation_text="95% variance")
-                    st.plotly_chart(fig_cum, use_container_width=True)
-                
-                # PCA scatter plot (first 2 components)
-                if len(X_pca) > 0:
-                    pca_df = pd.DataFrame({
-                        'PC1': X_pca[:, 0],
-                        'PC2': X_pca[:, 1] if X_pca.shape[1] > 1 else np.zeros(len(X_pca))
-                    })
-                    
-                    fig_scatter = px.scatter(
-                        pca_df, x='PC1', y='PC2',
-                        title=f"PCA: first 2 components (explain {cumulative_variance[1]*100:.1f}% variance)"
-                    )
-                    st.plotly_chart(fig_scatter, use_container_width=True)
-                
-                # Feature importance for first components
-                st.markdown("### 📊 Feature Contribution to Principal Components")
-                
-                components_df = pd.DataFrame(
-                    pca.components_[:min(3, len(pca.components_))].T,
-                    columns=[f'PC{i+1}' for i in range(min(3, len(pca.components_)))],
-                    index=selected_features
+        cache_key = ml_cache_key(df, 'pca', selected_features, {})
+        result = get_ml_cache().get(cache_key)
+        
+        job, job_result = job_state(cache_key)
+        if job_result is not None:
+            result = get_ml_cache().put(cache_key, job_result)
+        
+        if len(selected_features) >= 2 and st.button("🔍 Perform PCA") and result is None and job is None:
+            job = start_job(cache_key, "PCA", run_pca, df, selected_features)
+        
+        if result is not None and len(selected_features) >= 2:
+            pca, X_pca = result['model'], result['embedding']
+            if result['solver'] != 'full':
+                st.caption(f"⚡ {result['solver'].title()} PCA: {len(pca.components_)} leading "
+                           f"components out of {len(selected_features)}")
+            
+            # Explained variance
+            explained_variance = pca.explained_variance_ratio_
+            cumulative_variance = np.cumsum(explained_variance)
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Scree plot
+                fig_scree = px.bar(
+                    x=range(1, len(explained_variance) + 1),
+                    y=explained_variance,
+                    title="Explained Variance by Component",
+                    labels={'x': 'Principal Component', 'y': 'Explained Variance'}
+                )
+                st.plotly_chart(fig_scree, use_container_width=True)
+            
+            with col2:
+                # Cumulative explained variance
+                fig_cum = chart_factory.line(
+                    x=range(1, len(cumulative_variance) + 1),
+                    y=cumulative_variance,
+                    title="Cumulative Explained Variance",
+                    labels={'x': 'Number of Components', 'y': 'Cumulative Variance'}
                 )
+                fig_cum.add_hline(y=0.95, line_dash="dash", line_color="red", 
+                                 annotation_text="95% variance")
+                st.plotly_chart(fig_cum, use_container_width=True)
+            
+            # PCA scatter plot (first 2 components)
+            if len(X_pca) > 0:
+                pca_df = pd.DataFrame({
+                    'PC1': X_pca[:, 0],
+                    'PC2': X_pca[:, 1] if X_pca.shape[1] > 1 else np.zeros(len(X_pca))
+                })
                 
-                fig_components = px.bar(
-                    components_df.reset_index().melt(id_vars='index'),
-                    x='index', y='value', color='variable',
-                    title="Feature Contribution to Principal Components",
-                    labels={'index': 'Features', 'value': 'Contribution', 'variable': 'Component'}
+                pca_points = get_chart_points(pca_df, cache_key, 'scatter', ['PC1', 'PC2'])
+                fig_scatter = chart_factory.scatter(
+                    pca_points, x='PC1', y='PC2',
+                    title=f"PCA: first 2 components (explain {cumulative_variance[1]*100:.1f}% variance)"
                 )
-                st.plotly_chart(fig_components, use_container_width=True)
+                st.plotly_chart(fig_scatter, use_container_width=True)
+                show_point_reduction_note(pca_points, pca_df)
+            
+            # Feature importance for first components
+            st.markdown("### 📊 Feature Contribution to Principal Components")
+            
+            components_df = pd.DataFrame(
+                pca.components_[:min(3, len(pca.components_))].T,
+                columns=[f'PC{i+1}' for i in range(min(3, len(pca.components_)))],
+                index=selected_features
+            )
+            
+            fig_components = px.bar(
+                components_df.reset_index().melt(id_vars='index'),
+                x='index', y='value', color='variable',
+                title="Feature Contribution to Principal Components",
+                labels={'index': 'Features', 'value': 'Contribution', 'variable': 'Component'}
+            )
+            st.plotly_chart(fig_components, use_container_width=True)
+            
+            # Recommendations
+            components_95 = np.where(cumulative_variance >= 0.95)[0]
+            if len(components_95) > 0:
+                n_components_95 = components_95[0] + 1
+                st.info(f"💡 To explain 95% variance, {n_components_95} components out of {len(selected_features)} are sufficient")
                 
-                # Recommendations
-                components_95 = np.where(cumulative_variance >= 0.95)[0]
-                if len(components_95) > 0:
-                    n_components_95 = components_95[0] + 1
-                    st.info(f"💡 To explain 95% variance, {n_components_95} components out of {len(selected_features)} are sufficient")
-                    
-                    reduction_pct = (1 - n_components_95/len(selected_features)) * 100
-                    st.success(f"🎯 Possible dimensionality reduction by {reduction_pct:.1f}%")
-    
+                reduction_pct = (1 - n_components_95/len(selected_features)) * 100
+                st.success(f"🎯 Possible dimensionality reduction by {reduction_pct:.1f}%")
+            
+            render_model_saver(
+                df, 'pca', selected_features, {'solver': result['solver']},
+                {'explained_variance': [float(v) for v in explained_variance[:model_registry.PCA_OUTPUT_COMPONENTS]]},
+                len(X_pca), lambda: model_registry.build_pipeline(result['scaler'], pca)
+            )
+        
+        if job is not None:
+            show_job_progress(job)
+
     elif ml_type == "🔍 Anomaly Detection":
         st.markdown("### 🔍 Anomaly Detection")
         
@@ -2246,81 +3069,95 @@ def show_ml():
             )
         
         with col2:
-            method = st.selectbox("Method", ["Isolation Forest", "Local Outlier Factor", "One-Class SVM"])
+            method = st.selectbox("Method", list(anomaly.METHODS))
             contamination = st.slider("Anomaly fraction", 0.01, 0.3, 0.1)
         
-        if len(selected_features) >= 1 and st.button("🔍 Find Anomalies"):
-            with st.spinner("Searching for anomalies..."):
-                # Data preparation
-                X = df[selected_features].dropna()
-                
-                # Normalization
-                scaler = StandardScaler()
-                X_scaled = scaler.fit_transform(X)
-                
-                # Anomaly detection
-                if method == "Isolation Forest":
-                    from sklearn.ensemble import IsolationForest
-                    detector = IsolationForest(contamination=contamination, random_state=42)
-                elif method == "Local Outlier Factor":
-                    from sklearn.neighbors import LocalOutlierFactor
-                    detector = LocalOutlierFactor(contamination=contamination)
-                elif method == "One-Class SVM":
-                    from sklearn.svm import OneClassSVM
-                    detector = OneClassSVM(gamma='scale', nu=contamination)
-                
-                if method == "Local Outlier Factor":
-                    anomaly_labels = detector.fit_predict(X_scaled)
-                else:
-                    anomaly_labels = detector.fit_predict(X_scaled)
-                
-                # Create DataFrame with results
-                results_df = X.copy()
-                results_df['Anomaly'] = anomaly_labels == -1
-                results_df['Type'] = results_df['Anomaly'].map({True: 'Anomaly', False: 'Normal'})
-                
-                # Visualization
-                if len(selected_features) >= 2:
-                    fig = px.scatter(
-                        results_df,
-                        x=selected_features[0],
-                        y=selected_features[1],
-                        color='Type',
-                        title=f"Anomaly Detection: {method}",
-                        color_discrete_map={'Normal': 'blue', 'Anomaly': 'red'}
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-                
-                # Statistics
-                n_anomalies = sum(anomaly_labels == -1)
-                anomaly_pct = (n_anomalies / len(X)) * 100
-                
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Total points", len(X))
-                with col2:
-                    st.metric("Anomalies found", n_anomalies)
-                with col3:
-                    st.metric("Anomaly percentage", f"{anomaly_pct:.2f}%")
+        # Exact or scalable backend by data size, with the expected fit time
+        if selected_features:
+            n_rows = int(df[selected_features].notna().all(axis=1).sum())
+            backend = anomaly.choose_backend(method, n_rows)
+            estimate = anomaly.estimate_runtime(method, n_rows, len(selected_features), backend)
+            backend_label = "scalable approximation" if backend == 'scalable' else "exact model"
+            st.caption(f"⚙️ {method}: {backend_label} for {n_rows:,} rows, estimated runtime ~{estimate:.1f}s")
+        
+        params = {'method': method, 'contamination': contamination}
+        cache_key = ml_cache_key(df, 'anomalies', selected_features, params)
+        result = get_ml_cache().get(cache_key)
+        
+        job, job_result = job_state(cache_key)
+        if job_result is not None:
+            result = get_ml_cache().put(cache_key, job_result)
+        
+        if len(selected_features) >= 1 and st.button("🔍 Find Anomalies") and result is None and job is None:
+            job = start_job(cache_key, f"Anomaly detection ({method})", run_anomaly_detection,
+                            df, selected_features, method, contamination)
+        
+        if result is not None and len(selected_features) >= 1:
+            X, anomaly_labels = result['X'], result['labels']
+            
+            # Create DataFrame with results
+            results_df = X.copy()
+            results_df['Anomaly'] = anomaly_labels == -1
+            results_df['Type'] = results_df['Anomaly'].map({True: 'Anomaly', False: 'Normal'})
+            
+            # Visualization
+            if len(selected_features) >= 2:
+                # Every anomaly stays visible; the normal points are density-sampled
+                anomaly_points = get_chart_points(results_df, cache_key, 'scatter', selected_features[:2],
+                                                  keep='Anomaly')
+                fig = chart_factory.scatter(
+                    anomaly_points,
+                    x=selected_features[0],
+                    y=selected_features[1],
+                    color='Type',
+                    title=f"Anomaly Detection: {method}",
+                    color_discrete_map={'Normal': 'blue', 'Anomaly': 'red'}
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                show_point_reduction_note(anomaly_points, results_df)
+            
+            # Statistics
+            n_anomalies = sum(anomaly_labels == -1)
+            anomaly_pct = (n_anomalies / len(X)) * 100
+            
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total points", len(X))
+            with col2:
+                st.metric("Anomalies found", n_anomalies)
+            with col3:
+                st.metric("Anomaly percentage", f"{anomaly_pct:.2f}%")
+            
+            # Show top anomalies
+            if n_anomalies > 0:
+                st.markdown("### 🚨 Top-10 Anomalies")
+                anomalies = results_df[results_df['Anomaly']].head(10)
+                st.dataframe(anomalies[selected_features])
                 
-                # Show top anomalies
-                if n_anomalies > 0:
-                    st.markdown("### 🚨 Top-10 Anomalies")
-                    anomalies = results_df[results_df['Anomaly']].head(10)
-                    st.dataframe(anomalies[selected_features])
+                # Anomaly analysis
+                st.markdown("### 📊 Anomaly Characteristics")
+                for feature in selected_features:
+                    normal_mean = results_df[~results_df['Anomaly']][feature].mean()
+                    anomaly_mean = results_df[results_df['Anomaly']][feature].mean()
                     
-                    # Anomaly analysis
-                    st.markdown("### 📊 Anomaly Characteristics")
-                    for feature in selected_features:
-                        normal_mean = results_df[~results_df['Anomaly']][feature].mean()
-                        anomaly_mean = results_df[results_df['Anomaly']][feature].mean()
-                        
-                        if not pd.isna(anomaly_mean) and not pd.isna(normal_mean):
-                            diff_pct = ((anomaly_mean - normal_mean) / normal_mean) * 100
-                            if abs(diff_pct) > 5:
-                                direction = "higher" if diff_pct > 0 else "lower"
-                                st.write(f"• **{feature}**: anomalies on average {direction} by {abs(diff_pct):.1f}%")
-    
+                    if not pd.isna(anomaly_mean) and not pd.isna(normal_mean):
+                        diff_pct = ((anomaly_mean - normal_mean) / normal_mean) * 100
+                        if abs(diff_pct) > 5:
+                            direction = "higher" if diff_pct > 0 else "lower"
+                            st.write(f"• **{feature}**: anomalies on average {direction} by {abs(diff_pct):.1f}%")
+            
+            render_model_saver(
+                df, 'anomalies', selected_features, {**params, 'backend': result['backend']},
+                {'anomaly_pct': float(anomaly_pct)}, len(X),
+                lambda: model_registry.build_pipeline(
+                    result['scaler'],
+                    anomaly.scoring_model(result['model'], result['scaler'].transform(X), contamination)
+                )
+            )
+        
+        if job is not None:
+            show_job_progress(job)
+
     elif ml_type == "📊 Feature Importance":
         st.markdown("### 📊 Feature Importance Analysis")
         
@@ -2340,166 +3177,268 @@ def show_ml():
                 numeric_cols,
                 help="Variable to predict using other features"
             )
-        
-        with col2:
-            st.markdown("#### ⚙️ Settings")
-            algorithm = st.selectbox(
-                "Algorithm", 
-                ["Random Forest", "Gradient Boosting", "Extra Trees"],
-                help="Machine learning algorithm for feature importance"
-            )
-            n_estimators = st.slider("Number of trees", 10, 200, 100)
-            random_state = st.number_input("Random State", 0, 1000, 42)
-        
-        if len(selected_features) >= 2 and target_col and target_col not in selected_features:
-            if st.button("📊 Calculate Feature Importance"):
-                with st.spinner("Calculating feature importance..."):
-                    # Data preparation
-                    feature_data = df[selected_features + [target_col]].dropna()
-                    
-                    if len(feature_data) < 10:
-                        st.warning("⚠️ Not enough data for reliable feature importance analysis.")
-                        return
-                    
-                    X = feature_data[selected_features]
-                    y = feature_data[target_col]
-                    
-                    # Choose algorithm
-                    if algorithm == "Random Forest":
-                        from sklearn.ensemble import RandomForestRegressor
-                        model = RandomForestRegressor(
-                            n_estimators=n_estimators, 
-                            random_state=random_state,
-                            n_jobs=-1
-                        )
-                    elif algorithm == "Gradient Boosting":
-                        from sklearn.ensemble import GradientBoostingRegressor
-                        model = GradientBoostingRegressor(
-                            n_estimators=n_estimators, 
-                            random_state=random_state
-                        )
-                    else:  # Extra Trees
-                        from sklearn.ensemble import ExtraTreesRegressor
-                        model = ExtraTreesRegressor(
-                            n_estimators=n_estimators, 
-                            random_state=random_state,
-                            n_jobs=-1
-                        )
-                    
-                    # Fit model
-                    model.fit(X, y)
-                    
-                    # Get feature importance
-                    importance_scores = model.feature_importances_
-                    feature_importance_df = pd.DataFrame({
-                        'Feature': selected_features,
-                        'Importance': importance_scores,
-                        'Importance_Pct': (importance_scores / importance_scores.sum()) * 100
-                    }).sort_values('Importance', ascending=False)
-                    
-                    # Model performance
-                    train_score = model.score(X, y)
-                    
-                    # Display results
-                    col1, col2 = st.columns([1, 1])
-                    
-                    with col1:
-                        st.markdown("### 📊 Feature Importance Ranking")
-                        st.dataframe(
-                            feature_importance_df,
-                            use_container_width=True,
-                            hide_index=True
-                        )
-                        
-                        st.metric("Model R² Score", f"{train_score:.4f}")
-                    
-                    with col2:
-                        # Bar chart
-                        fig_bar = px.bar(
-                            feature_importance_df,
-                            x='Importance_Pct',
-                            y='Feature',
-                            orientation='h',
-                            title=f'Feature Importance ({algorithm})',
-                            labels={'Importance_Pct': 'Importance (%)', 'Feature': 'Features'},
-                            color='Importance_Pct',
-                            color_continuous_scale='viridis'
-                        )
-                        fig_bar.update_layout(
-                            yaxis={'categoryorder': 'total ascending'},
-                            height=400
-                        )
-                        st.plotly_chart(fig_bar, use_container_width=True)
-                    
-                    # Detailed insights
-                    st.markdown("### 🔍 Insights")
-                    
-                    # Top 3 features
-                    top_features = feature_importance_df.head(3)
-                    st.markdown("**🥇 Top 3 Most Important Features:**")
-                    for i, (_, row) in enumerate(top_features.iterrows(), 1):
-                        emoji = ["🥇", "🥈", "🥉"][i-1]
-                        st.write(f"{emoji} **{row['Feature']}**: {row['Importance_Pct']:.1f}% importance")
-                    
-                    # Cumulative importance
-                    feature_importance_df['Cumulative_Pct'] = feature_importance_df['Importance_Pct'].cumsum()
-                    features_80pct = len(feature_importance_df[feature_importance_df['Cumulative_Pct'] <= 80])
-                    features_90pct = len(feature_importance_df[feature_importance_df['Cumulative_Pct'] <= 90])
-                    
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("Features for 80% importance", f"{features_80pct}/{len(selected_features)}")
-                    with col2:
-                        st.metric("Features for 90% importance", f"{features_90pct}/{len(selected_features)}")
-                    with col3:
-                        least_important = feature_importance_df.iloc[-1]['Feature']
-                        st.metric("Least important feature", least_important)
-                    
-                    # Feature correlation with target
-                    st.markdown("### 🎯 Feature-Target Correlations")
-                    correlations = []
-                    for feature in selected_features:
-                        corr = feature_data[feature].corr(feature_data[target_col])
-                        correlations.append({
-                            'Feature': feature,
-                            'Correlation': corr,
-                            'Abs_Correlation': abs(corr)
-                        })
-                    
-                    corr_df = pd.DataFrame(correlations).sort_values('Abs_Correlation', ascending=False)
-                    
-                    fig_corr = px.bar(
-                        corr_df,
-                        x='Feature',
-                        y='Correlation',
-                        title=f'Feature Correlations with {target_col}',
-                        color='Correlation',
-                        color_continuous_scale='RdBu_r'
+        
+        with col2:
+            st.markdown("#### ⚙️ Settings")
+            algorithm = st.selectbox(
+                "Algorithm", 
+                list(importance.ALGORITHMS),
+                help="Machine learning algorithm for feature importance "
+                     "(Gradient Boosting switches to the histogram-based variant on large data)"
+            )
+            n_estimators = st.slider("Number of trees", 10, 200, 100)
+            random_state = st.number_input("Random State", 0, 1000, 42)
+        
+        if len(selected_features) >= 2 and target_col and target_col not in selected_features:
+            params = {'target': target_col, 'algorithm': algorithm,
+                      'n_estimators': n_estimators, 'random_state': int(random_state)}
+            cache_key = ml_cache_key(df, 'importance', selected_features, params)
+            result = get_ml_cache().get(cache_key)
+            
+            job, job_result = job_state(cache_key)
+            if job_result is not None:
+                result = get_ml_cache().put(cache_key, job_result)
+            
+            if st.button("📊 Calculate Feature Importance") and result is None and job is None:
+                job = start_job(cache_key, f"Feature importance ({algorithm})", run_feature_importance,
+                                df, selected_features, target_col, algorithm, n_estimators, int(random_state))
+            
+            if result is not None:
+                test_score = result['test_r2']
+                
+                # Permutation importance on the held-out split
+                feature_importance_df = result['importances'].copy()
+                
+                # Display results
+                col1, col2 = st.columns([1, 1])
+                
+                with col1:
+                    st.markdown("### 📊 Feature Importance Ranking")
+                    st.dataframe(
+                        feature_importance_df,
+                        use_container_width=True,
+                        hide_index=True
                     )
-                    fig_corr.add_hline(y=0, line_dash="dash", line_color="black")
-                    st.plotly_chart(fig_corr, use_container_width=True)
-                    
-                    # Recommendations
-                    st.markdown("### 💡 Recommendations")
-                    high_importance = feature_importance_df[feature_importance_df['Importance_Pct'] > 15]
-                    low_importance = feature_importance_df[feature_importance_df['Importance_Pct'] < 2]
-                    
-                    if len(high_importance) > 0:
-                        st.success(f"🎯 **Focus on high-impact features**: {', '.join(high_importance['Feature'].tolist())}")
                     
-                    if len(low_importance) > 0:
-                        st.info(f"🔍 **Consider removing low-impact features**: {', '.join(low_importance['Feature'].tolist())}")
-                    
-                    if train_score < 0.5:
-                        st.warning("⚠️ **Low model performance**: Consider feature engineering or different algorithms")
-                    elif train_score > 0.8:
-                        st.success("✅ **Good model performance**: Features explain the target well")
-        
+                    st.metric("Held-out R² Score", f"{test_score:.4f}",
+                              delta=f"train R² {result['train_r2']:.4f}", delta_color="off")
+                    st.caption(f"{result['algorithm']} trained on {result['n_train']:,} rows, "
+                               f"permutation importance on {result['n_test']:,} held-out rows")
+                
+                with col2:
+                    # Bar chart
+                    fig_bar = px.bar(
+                        feature_importance_df,
+                        x='Importance_Pct',
+                        y='Feature',
+                        orientation='h',
+                        title=f"Feature Importance ({result['algorithm']})",
+                        labels={'Importance_Pct': 'Importance (%)', 'Feature': 'Features'},
+                        color='Importance_Pct',
+                        color_continuous_scale='viridis'
+                    )
+                    fig_bar.update_layout(
+                        yaxis={'categoryorder': 'total ascending'},
+                        height=400
+                    )
+                    st.plotly_chart(fig_bar, use_container_width=True)
+                
+                # Detailed insights
+                st.markdown("### 🔍 Insights")
+                
+                # Top 3 features
+                top_features = feature_importance_df.head(3)
+                st.markdown("**🥇 Top 3 Most Important Features:**")
+                for i, (_, row) in enumerate(top_features.iterrows(), 1):
+                    emoji = ["🥇", "🥈", "🥉"][i-1]
+                    st.write(f"{emoji} **{row['Feature']}**: {row['Importance_Pct']:.1f}% importance")
+                
+                # Cumulative importance
+                feature_importance_df['Cumulative_Pct'] = feature_importance_df['Importance_Pct'].cumsum()
+                features_80pct = len(feature_importance_df[feature_importance_df['Cumulative_Pct'] <= 80])
+                features_90pct = len(feature_importance_df[feature_importance_df['Cumulative_Pct'] <= 90])
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Features for 80% importance", f"{features_80pct}/{len(selected_features)}")
+                with col2:
+                    st.metric("Features for 90% importance", f"{features_90pct}/{len(selected_features)}")
+                with col3:
+                    least_important = feature_importance_df.iloc[-1]['Feature']
+                    st.metric("Least important feature", least_important)
+                
+                # Feature correlation with target
+                st.markdown("### 🎯 Feature-Target Correlations")
+                correlations = []
+                for feature in selected_features:
+                    corr = result['target_correlations'][feature]
+                    correlations.append({
+                        'Feature': feature,
+                        'Correlation': corr,
+                        'Abs_Correlation': abs(corr)
+                    })
+                
+                corr_df = pd.DataFrame(correlations).sort_values('Abs_Correlation', ascending=False)
+                
+                fig_corr = px.bar(
+                    corr_df,
+                    x='Feature',
+                    y='Correlation',
+                    title=f'Feature Correlations with {target_col}',
+                    color='Correlation',
+                    color_continuous_scale='RdBu_r'
+                )
+                fig_corr.add_hline(y=0, line_dash="dash", line_color="black")
+                st.plotly_chart(fig_corr, use_container_width=True)
+                
+                # Recommendations
+                st.markdown("### 💡 Recommendations")
+                high_importance = feature_importance_df[feature_importance_df['Importance_Pct'] > 15]
+                low_importance = feature_importance_df[feature_importance_df['Importance_Pct'] < 2]
+                
+                if len(high_importance) > 0:
+                    st.success(f"🎯 **Focus on high-impact features**: {', '.join(high_importance['Feature'].tolist())}")
+                
+                if len(low_importance) > 0:
+                    st.info(f"🔍 **Consider removing low-impact features**: {', '.join(low_importance['Feature'].tolist())}")
+                
+                if test_score < 0.5:
+                    st.warning("⚠️ **Low model performance**: Consider feature engineering or different algorithms")
+                elif test_score > 0.8:
+                    st.success("✅ **Good model performance**: Features explain the target well")
+            
+            if job is not None:
+                show_job_progress(job)
+    
         elif target_col in selected_features:
             st.warning("⚠️ Target variable cannot be in the feature list!")
         elif len(selected_features) < 2:
             st.warning("⚠️ Select at least 2 features for analysis!")
 
+    elif ml_type == "📦 Batch Scoring":
+        show_batch_scoring(df)
+    
+    poll_background_jobs(fragment_scope=True)
+
+def show_batch_scoring(df):
+    """
+    ניקוד קבצים חדשים עם מודל שמור מהמאגר
+    
+    מטרת הפונקציה:
+    - בחירת מודל שמור (אשכולות, PCA או גלאי אנומליות) והצגת המטא-דאטה שלו
+    - החלת המודל על קובץ חדש או על הנתונים הנוכחיים במקטעים, במעבר לינארי אחד
+    - הורדת התוצאות כ-CSV עם עמודות הפלט של המודל
+    
+    פרמטרים:
+        df (DataFrame): הנתונים הטעונים כרגע (אפשרות לניקוד במקום קובץ חדש)
+    """
+    st.markdown("### 📦 Batch Scoring with Saved Models")
+    
+    # Only the caller's own models can be listed, scored or deleted
+    models = model_registry.list_models(owner=model_owner())
+    if not models:
+        st.info("💡 No saved models yet. Fit clustering, PCA or anomaly detection and use "
+                "💾 Save model to add one.")
+        return
+    
+    labels = {m['id']: f"{m['name']} ({m['kind']}, {m['created']})" for m in models}
+    model_id = st.selectbox("Saved model", list(labels), format_func=labels.get)
+    metadata = next(m for m in models if m['id'] == model_id)
+    
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.write(f"**Features:** {', '.join(metadata['features'])}")
+        st.caption(f"Trained on {metadata.get('n_rows') or 0:,} rows · dataset fingerprint "
+                   f"`{metadata['fingerprint']}` · params {metadata['params']}")
+        if metadata['fingerprint'] == dataset_fingerprint(df):
+            st.caption("ℹ️ The loaded dataset is the one this model was trained on")
+    with col2:
+        if metadata['metrics']:
+            st.json(metadata['metrics'])
+        if st.button("🗑️ Delete model"):
+            model_registry.delete_model(model_id)
+            st.rerun()
+    
+    source = st.radio("Data to score", ["Upload a new file", "Current dataset"], horizontal=True)
+    uploaded = None
+    if source == "Upload a new file":
+        uploaded = st.file_uploader("File to score", type=['csv', 'xlsx', 'xls'], key="batch_scoring_file")
+    chunk_size = st.number_input("Rows per chunk", 1000, 1000000, model_registry.SCORE_CHUNK_SIZE, step=10000)
+    
+    # Scoring runs as a background job; the last result stays in the session for download
+    scoring_key = ('batch_scoring',)
+    job, job_result = job_state(scoring_key)
+    if job_result is not None:
+        st.session_state.batch_scoring_result = job_result
+    
+    if st.button("🚀 Score") and (uploaded is not None or source == "Current dataset") and job is None:
+        if uploaded is not None:
+            data, filename = uploaded.getvalue(), uploaded.name
+        else:
+            data, filename = df, None
+        job = start_job(scoring_key, f"Batch scoring ({metadata['name']})", run_batch_scoring,
+                        model_id, data, filename, int(chunk_size))
+    
+    scored = st.session_state.get('batch_scoring_result')
+    if scored is not None and scored['model_id'] == model_id:
+        summary, metadata = scored['summary'], scored['metadata']
+        if scored['warning']:
+            st.warning(f"⚠️ {scored['warning']}")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Rows", f"{summary['rows']:,}")
+        with col2:
+            st.metric("Scored rows", f"{summary['scored']:,}")
+        if summary['counts']:
+            counts = pd.Series(summary['counts'], name='Rows').sort_index()
+            st.dataframe(counts.rename_axis('Cluster' if metadata['kind'] == 'clustering' else 'Anomaly'))
+        if summary['preview'] is not None:
+            st.dataframe(summary['preview'], use_container_width=True)
+        
+        st.download_button(
+            label="💾 Download scored CSV",
+            data=scored['csv'],
+            file_name=f'{scored["base_name"]}_scored_{metadata["kind"]}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+            mime='text/csv'
+        )
+    
+    if job is not None:
+        show_job_progress(job)
+
+def run_batch_scoring(model_id, data, filename, chunk_size):
+    """
+    ניקוד קובץ (או מסגרת נתונים) עם מודל שמור, מקטע אחר מקטע (רץ כמשימת רקע)
+    
+    פרמטרים:
+        model_id (str): מזהה המודל במאגר
+        data: תוכן הקובץ בבתים, או DataFrame כשמנקדים את הנתונים הנוכחיים
+        filename (str): שם הקובץ (None עבור DataFrame)
+        chunk_size (int): מספר שורות בכל מקטע
+    
+    החזרה:
+        dict: סיכום הניקוד, תוכן ה-CSV והמטא-דאטה של המודל
+    """
+    pipeline, metadata = model_registry.load_model(model_id)
+    if filename is not None:
+        chunks = model_registry.iter_file_chunks(io.BytesIO(data), filename, chunk_size)
+        base_name, total = os.path.splitext(filename)[0], None
+    else:
+        chunks = model_registry.iter_frame_chunks(data, chunk_size)
+        base_name, total = "current_data", len(data)
+    
+    def progress(rows):
+        # Streamed CSVs have no known length up front
+        jobs.report_progress(rows / total if total else 0.0, f"Scored {rows:,} rows")
+    
+    output = io.StringIO()
+    summary = model_registry.score_to_csv(pipeline, metadata, chunks, output, progress=progress)
+    return {
+        'model_id': model_id, 'metadata': metadata, 'summary': summary,
+        'csv': output.getvalue(), 'base_name': base_name,
+        'warning': model_registry.compatibility_warning(metadata)
+    }
+
 def show_ab_testing():
     """
     הצגת ממשק לביצוע בדיקות A/B ובדיקות סטטיסטיות השוואתיות
@@ -2551,8 +3490,8 @@ def show_ab_testing():
     with col1:
         st.markdown("### 🎲 Generate Test Data")
         if st.button("📊 Create A/B Test Data"):
-            ab_data = generate_ab_test_data()
-            st.session_state.data = ab_data
+            ab_data = synthetic_data.cached_preset('ab_test', generate_ab_test_data)
+            set_session_data(ab_data)
             st.success("A/B test data created!")
             st.rerun()
     
@@ -2579,302 +3518,380 @@ def show_ab_testing():
         else:
             metric_col = st.selectbox("Metric for analysis", df.columns)
     
-    if st.button("🧪 Conduct A/B Test Analysis"):
+    # The analysis runs as a background job; the last result stays in the session
+    ab_key = ('ab_test', dataset_fingerprint(df), group_col, metric_col)
+    job, job_result = job_state(ab_key, on_error=show_ab_troubleshooting)
+    if job_result is not None:
+        st.session_state.ab_test_result = (ab_key, job_result)
+    
+    if st.button("🧪 Conduct A/B Test Analysis") and job is None:
+        job = start_job(ab_key, "A/B test analysis", run_ab_test, df, group_col, metric_col)
+    
+    saved = st.session_state.get('ab_test_result')
+    if saved is not None and saved[0] == ab_key:
+        result = saved[1]
         try:
-            with st.spinner("Analyzing A/B test..."):
-                # Data preparation
-                test_data = df[[group_col, metric_col]].dropna()
-                
-                # Get unique groups
-                groups = test_data[group_col].unique()
-                
-                if len(groups) != 2:
-                    st.warning(f"⚠️ Found {len(groups)} groups. A/B test works with 2 groups.")
-                    st.write("Available groups:", groups)
-                    
-                    # Take first 2 groups
-                    if len(groups) > 2:
-                        groups = groups[:2]
-                        test_data = test_data[test_data[group_col].isin(groups)]
-                        st.info(f"Analyzing groups: {groups[0]} vs {groups[1]}")
-                
-                # Split into control and treatment groups
-                control = test_data[test_data[group_col] == groups[0]][metric_col]
-                treatment = test_data[test_data[group_col] == groups[1]][metric_col]
-                
-                # Basic statistics
-                control_mean = control.mean()
-                treatment_mean = treatment.mean()
-                control_std = control.std()
-                treatment_std = treatment.std()
-                
-                # Statistical tests
-                # T-test (Welch's t-test for unequal variances)
-                t_stat, p_value_ttest = stats.ttest_ind(control, treatment, equal_var=False)
-                
-                # Mann-Whitney U test (non-parametric)
-                try:
-                    u_stat, p_value_mannwhitney = stats.mannwhitneyu(control, treatment, alternative='two-sided')
-                except Exception as e:
-                    st.warning(f"Mann-Whitney test failed: {e}")
-                    p_value_mannwhitney = np.nan
-                
-                # Effect (difference of means)
-                effect = treatment_mean - control_mean
-                effect_pct = (effect / control_mean) * 100 if control_mean != 0 else 0
-                
-                # Cohen's d (effect size) - corrected calculation
-                pooled_std = np.sqrt(((len(control) - 1) * control_std**2 + (len(treatment) - 1) * treatment_std**2) / (len(control) + len(treatment) - 2))
-                cohens_d = effect / pooled_std if pooled_std != 0 else 0
-                
-                # Confidence interval for the difference
-                se_diff = np.sqrt(control_std**2/len(control) + treatment_std**2/len(treatment))
-                ci_lower = effect - 1.96 * se_diff
-                ci_upper = effect + 1.96 * se_diff
-                
-                # Statistical power calculation
-                from scipy.stats import norm
-                pooled_se = np.sqrt(control_std**2/len(control) + treatment_std**2/len(treatment))
-                z_score = abs(effect) / pooled_se if pooled_se != 0 else 0
-                current_power = 1 - norm.cdf(1.96 - z_score) + norm.cdf(-1.96 - z_score) if pooled_se != 0 else 0
-                
-                # Sample size for 80% power
-                if control_std > 0 and treatment_std > 0:
-                    pooled_variance = (control_std**2 + treatment_std**2) / 2
-                    n_per_group_80 = 2 * pooled_variance * ((1.96 + 0.84)**2) / (effect**2) if effect != 0 else np.inf
-                else:
-                    n_per_group_80 = np.inf
-                
-                # Display results
-                st.markdown("### 📊 A/B Test Results")
-                
-                # Group metrics
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric(f"{groups[0]} (mean)", f"{control_mean:.3f}")
-                with col2:
-                    st.metric(f"{groups[1]} (mean)", f"{treatment_mean:.3f}")
-                with col3:
-                    st.metric("Difference", f"{effect:.3f}")
-                with col4:
-                    st.metric("Change %", f"{effect_pct:+.2f}%")
-                
-                # Statistical significance
-                col1, col2, col3, col4 = st.columns(4)
-                
-                with col1:
-                    st.metric("P-value (t-test)", f"{p_value_ttest:.4f}")
-                with col2:
-                    if not np.isnan(p_value_mannwhitney):
-                        st.metric("P-value (Mann-Whitney)", f"{p_value_mannwhitney:.4f}")
-                    else:
-                        st.metric("P-value (Mann-Whitney)", "N/A")
-                with col3:
-                    st.metric("Cohen's d", f"{cohens_d:.3f}")
-                with col4:
-                    st.metric("95% CI", f"[{ci_lower:.3f}, {ci_upper:.3f}]")
-                
-                # Results interpretation
-                alpha = 0.05
-                
-                # Statistical significance
-                st.markdown("#### 📊 Statistical Significance")
-                if p_value_ttest < alpha:
-                    st.success(f"🎉 **Statistically significant difference!** (t-test, p = {p_value_ttest:.4f})")
-                    if ci_lower > 0:
-                        st.info("✅ Confidence interval doesn't include 0 - effect is likely real")
-                    elif ci_upper < 0:
-                        st.info("✅ Confidence interval doesn't include 0 - effect is likely real")
-                else:
-                    st.warning(f"❌ **No statistically significant difference** (t-test, p = {p_value_ttest:.4f})")
-                    st.info("🔍 This could mean: no real effect, insufficient sample size, or high variability")
-                
+            test_data = result['test_data']
+            groups = result['groups']
+            control = result['control']
+            treatment = result['treatment']
+            control_mean = result['control_mean']
+            treatment_mean = result['treatment_mean']
+            control_std = result['control_std']
+            treatment_std = result['treatment_std']
+            p_value_ttest = result['p_value_ttest']
+            p_value_mannwhitney = result['p_value_mannwhitney']
+            effect = result['effect']
+            effect_pct = result['effect_pct']
+            cohens_d = result['cohens_d']
+            ci_lower = result['ci_lower']
+            ci_upper = result['ci_upper']
+            current_power = result['current_power']
+            n_per_group_80 = result['n_per_group_80']
+            
+            for level, message in result['notes']:
+                getattr(st, level)(message)
+            
+            # Display results
+            st.markdown("### 📊 A/B Test Results")
+            
+            # Group metrics
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric(f"{groups[0]} (mean)", f"{control_mean:.3f}")
+            with col2:
+                st.metric(f"{groups[1]} (mean)", f"{treatment_mean:.3f}")
+            with col3:
+                st.metric("Difference", f"{effect:.3f}")
+            with col4:
+                st.metric("Change %", f"{effect_pct:+.2f}%")
+            
+            # Statistical significance
+            col1, col2, col3, col4 = st.columns(4)
+            
+            with col1:
+                st.metric("P-value (t-test)", f"{p_value_ttest:.4f}")
+            with col2:
                 if not np.isnan(p_value_mannwhitney):
-                    if p_value_mannwhitney < alpha:
-                        st.success(f"🎉 **Mann-Whitney test also significant!** (p = {p_value_mannwhitney:.4f})")
-                    else:
-                        st.warning(f"❌ **Mann-Whitney test not significant** (p = {p_value_mannwhitney:.4f})")
-                
-                # Effect size interpretation
-                st.markdown("#### 📏 Effect Size Analysis")
-                if abs(cohens_d) < 0.2:
-                    effect_size = "negligible"
-                    effect_color = "🔵"
-                elif abs(cohens_d) < 0.5:
-                    effect_size = "small"
-                    effect_color = "🟡"
-                elif abs(cohens_d) < 0.8:
-                    effect_size = "medium"
-                    effect_color = "🟠"
+                    st.metric("P-value (Mann-Whitney)", f"{p_value_mannwhitney:.4f}")
                 else:
-                    effect_size = "large"
-                    effect_color = "🔴"
-                
-                st.write(f"{effect_color} **Effect size: {effect_size}** (Cohen's d = {cohens_d:.3f})")
-                
-                # Practical significance
-                if abs(effect_pct) > 10:
-                    st.success(f"💰 **Practically significant**: {abs(effect_pct):.1f}% change")
-                elif abs(effect_pct) > 5:
-                    st.info(f"📊 **Moderate practical impact**: {abs(effect_pct):.1f}% change")
+                    st.metric("P-value (Mann-Whitney)", "N/A")
+            with col3:
+                st.metric("Cohen's d", f"{cohens_d:.3f}")
+            with col4:
+                st.metric("95% CI", f"[{ci_lower:.3f}, {ci_upper:.3f}]")
+            
+            # Results interpretation
+            alpha = 0.05
+            
+            # Statistical significance
+            st.markdown("#### 📊 Statistical Significance")
+            if p_value_ttest < alpha:
+                st.success(f"🎉 **Statistically significant difference!** (t-test, p = {p_value_ttest:.4f})")
+                if ci_lower > 0:
+                    st.info("✅ Confidence interval doesn't include 0 - effect is likely real")
+                elif ci_upper < 0:
+                    st.info("✅ Confidence interval doesn't include 0 - effect is likely real")
+            else:
+                st.warning(f"❌ **No statistically significant difference** (t-test, p = {p_value_ttest:.4f})")
+                st.info("🔍 This could mean: no real effect, insufficient sample size, or high variability")
+            
+            if not np.isnan(p_value_mannwhitney):
+                if p_value_mannwhitney < alpha:
+                    st.success(f"🎉 **Mann-Whitney test also significant!** (p = {p_value_mannwhitney:.4f})")
                 else:
-                    st.warning(f"📉 **Small practical impact**: {abs(effect_pct):.1f}% change")
-                
-                # Visualization
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    # Box plot
-                    fig_box = px.box(test_data, x=group_col, y=metric_col, 
-                                    title=f"Distribution of {metric_col} by Groups")
-                    st.plotly_chart(fig_box, use_container_width=True)
-                
-                with col2:
-                    # Histogram
-                    fig_hist = go.Figure()
-                    
-                    fig_hist.add_trace(go.Histogram(
-                        x=control,
-                        name=f"{groups[0]}",
-                        opacity=0.7,
-                        nbinsx=30
-                    ))
-                    
-                    fig_hist.add_trace(go.Histogram(
-                        x=treatment,
-                        name=f"{groups[1]}",
-                        opacity=0.7,
-                        nbinsx=30
-                    ))
-                    
-                    fig_hist.update_layout(
-                        title="Group Distributions",
-                        xaxis_title=metric_col,
-                        yaxis_title="Frequency",
-                        barmode='overlay'
-                    )
-                    
-                    st.plotly_chart(fig_hist, use_container_width=True)
-                
-                # Statistical power and sample size
-                st.markdown("### 📈 Statistical Power Analysis")
-                
-                power_col1, power_col2, power_col3 = st.columns(3)
-                
-                with power_col1:
-                    st.metric("Current Power", f"{current_power:.3f}")
+                    st.warning(f"❌ **Mann-Whitney test not significant** (p = {p_value_mannwhitney:.4f})")
+            
+            # Effect size interpretation
+            st.markdown("#### 📏 Effect Size Analysis")
+            if abs(cohens_d) < 0.2:
+                effect_size = "negligible"
+                effect_color = "🔵"
+            elif abs(cohens_d) < 0.5:
+                effect_size = "small"
+                effect_color = "🟡"
+            elif abs(cohens_d) < 0.8:
+                effect_size = "medium"
+                effect_color = "🟠"
+            else:
+                effect_size = "large"
+                effect_color = "🔴"
+            
+            st.write(f"{effect_color} **Effect size: {effect_size}** (Cohen's d = {cohens_d:.3f})")
+            
+            # Practical significance
+            if abs(effect_pct) > 10:
+                st.success(f"💰 **Practically significant**: {abs(effect_pct):.1f}% change")
+            elif abs(effect_pct) > 5:
+                st.info(f"📊 **Moderate practical impact**: {abs(effect_pct):.1f}% change")
+            else:
+                st.warning(f"📉 **Small practical impact**: {abs(effect_pct):.1f}% change")
+            
+            # Visualization
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                # Box plot
+                fig_box = distributions.box_figure(
+                    distributions.grouped_box_summaries(test_data, group_col, metric_col),
+                    f"Distribution of {metric_col} by Groups", metric_col, x_title=group_col,
+                    colors=px.colors.qualitative.Plotly
+                )
+                st.plotly_chart(fig_box, use_container_width=True)
+            
+            with col2:
+                # Histogram
+                # Both groups binned on the same edges so the overlay lines up
+                shared_range = (min(control.min(), treatment.min()), max(control.max(), treatment.max()))
+                fig_hist = go.Figure()
                 
-                with power_col2:
-                    st.metric("Current Sample Size", f"{len(control) + len(treatment):,}")
+                fig_hist.add_trace(distributions.histogram_trace(
+                    distributions.histogram_summary(control, 30, shared_range),
+                    name=f"{groups[0]}",
+                    opacity=0.7
+                ))
                 
-                with power_col3:
-                    if n_per_group_80 != np.inf and n_per_group_80 > 0:
-                        st.metric("Sample Size for 80% Power", f"{int(n_per_group_80 * 2):,}")
-                    else:
-                        st.metric("Sample Size for 80% Power", "N/A")
+                fig_hist.add_trace(distributions.histogram_trace(
+                    distributions.histogram_summary(treatment, 30, shared_range),
+                    name=f"{groups[1]}",
+                    opacity=0.7
+                ))
                 
-                # Power interpretation
-                if current_power >= 0.8:
-                    st.success("✅ **Sufficient statistical power** (≥0.8)")
-                    st.write("Your test has enough power to detect meaningful differences")
-                elif current_power >= 0.5:
-                    st.warning("⚠️ **Moderate statistical power** (0.5-0.8)")
-                    st.write("Consider increasing sample size for more reliable results")
-                else:
-                    st.error("❌ **Low statistical power** (<0.5)")
-                    st.write("High risk of missing real effects (Type II error)")
+                fig_hist.update_layout(
+                    title="Group Distributions",
+                    xaxis_title=metric_col,
+                    yaxis_title="Frequency",
+                    barmode='overlay',
+                    bargap=0
+                )
                 
-                # Sample size recommendations
+                st.plotly_chart(fig_hist, use_container_width=True)
+            
+            # Statistical power and sample size
+            st.markdown("### 📈 Statistical Power Analysis")
+            
+            power_col1, power_col2, power_col3 = st.columns(3)
+            
+            with power_col1:
+                st.metric("Current Power", f"{current_power:.3f}")
+            
+            with power_col2:
+                st.metric("Current Sample Size", f"{len(control) + len(treatment):,}")
+            
+            with power_col3:
                 if n_per_group_80 != np.inf and n_per_group_80 > 0:
-                    current_total = len(control) + len(treatment)
-                    recommended_total = int(n_per_group_80 * 2)
-                    
-                    if current_total < recommended_total:
-                        additional_needed = recommended_total - current_total
-                        st.info(f"💡 **Recommendation**: Collect {additional_needed:,} more samples for 80% power")
-                    else:
-                        st.success("🎯 Your sample size exceeds the requirement for 80% power!")
-                
-                # Recommendations
-                st.markdown("### 💡 Recommendations & Conclusions")
-                
-                recommendations = []
-                
-                # Statistical significance + practical significance
-                if p_value_ttest < 0.05 and abs(effect_pct) > 5:
-                    recommendations.append("🎯 **Strong evidence for effect**: Both statistically and practically significant")
-                    recommendations.append("✅ **Action recommended**: Implement the tested change")
-                elif p_value_ttest < 0.05 and abs(effect_pct) <= 5:
-                    recommendations.append("📊 **Statistically significant but small effect**: Consider cost-benefit analysis")
-                    recommendations.append("🤔 **Decision needed**: Is small improvement worth implementation cost?")
-                elif p_value_ttest >= 0.05 and abs(effect_pct) > 10:
-                    recommendations.append("📈 **Large effect but not statistically significant**: Increase sample size")
-                    recommendations.append("🔄 **Action recommended**: Continue testing with more data")
+                    st.metric("Sample Size for 80% Power", f"{int(n_per_group_80 * 2):,}")
                 else:
-                    recommendations.append("📋 **No convincing evidence of effect**: Consider alternative approaches")
-                    recommendations.append("🔄 **Options**: Test different variants or longer duration")
-                
-                # Power-based recommendations
-                if current_power < 0.8:
-                    recommendations.append("📊 **Increase statistical power**: Larger sample size needed for reliable conclusions")
-                
-                # Effect size recommendations
-                if abs(cohens_d) >= 0.5:
-                    recommendations.append("💪 **Meaningful effect size detected**: Worth further investigation")
-                elif abs(cohens_d) < 0.2:
-                    recommendations.append("📉 **Very small effect**: Question if this change is worth pursuing")
-                
-                # Data quality recommendations
-                control_cv = (control_std / control_mean) * 100 if control_mean != 0 else 0
-                treatment_cv = (treatment_std / treatment_mean) * 100 if treatment_mean != 0 else 0
-                
-                if control_cv > 100 or treatment_cv > 100:
-                    recommendations.append("⚠️ **High variability detected**: Consider data cleaning or longer measurement period")
-                
-                # Display recommendations
-                for rec in recommendations:
-                    st.write(f"• {rec}")
-                
-                # Summary conclusion
-                st.markdown("#### 🎯 Executive Summary")
+                    st.metric("Sample Size for 80% Power", "N/A")
+            
+            # Power interpretation
+            if current_power >= 0.8:
+                st.success("✅ **Sufficient statistical power** (≥0.8)")
+                st.write("Your test has enough power to detect meaningful differences")
+            elif current_power >= 0.5:
+                st.warning("⚠️ **Moderate statistical power** (0.5-0.8)")
+                st.write("Consider increasing sample size for more reliable results")
+            else:
+                st.error("❌ **Low statistical power** (<0.5)")
+                st.write("High risk of missing real effects (Type II error)")
+            
+            # Sample size recommendations
+            if n_per_group_80 != np.inf and n_per_group_80 > 0:
+                current_total = len(control) + len(treatment)
+                recommended_total = int(n_per_group_80 * 2)
                 
-                if p_value_ttest < 0.05 and abs(effect_pct) > 5 and current_power > 0.8:
-                    conclusion = "🟢 **STRONG POSITIVE RESULT**: Proceed with implementation"
-                elif p_value_ttest < 0.05 and abs(effect_pct) > 2:
-                    conclusion = "🟡 **MODERATE POSITIVE RESULT**: Consider implementation with monitoring"
-                elif p_value_ttest >= 0.05 and current_power > 0.8:
-                    conclusion = "🔴 **NO SIGNIFICANT EFFECT**: Do not implement this change"
+                if current_total < recommended_total:
+                    additional_needed = recommended_total - current_total
+                    st.info(f"💡 **Recommendation**: Collect {additional_needed:,} more samples for 80% power")
                 else:
-                    conclusion = "🟡 **INCONCLUSIVE RESULT**: Need more data for reliable conclusion"
-                
-                st.write(conclusion)
-                
-                # Key metrics summary
-                summary_metrics = {
-                    "Control Mean": f"{control_mean:.3f}",
-                    "Treatment Mean": f"{treatment_mean:.3f}",
-                    "Difference": f"{effect:.3f}",
-                    "% Change": f"{effect_pct:+.2f}%",
-                    "P-value": f"{p_value_ttest:.4f}",
-                    "Effect Size": f"{cohens_d:.3f}",
-                    "Statistical Power": f"{current_power:.3f}",
-                    "Significance": "Yes" if p_value_ttest < 0.05 else "No"
-                }
-                
-                st.markdown("#### 📋 Key Metrics Summary")
-                summary_df = pd.DataFrame([
-                    {"Metric": k, "Value": v} for k, v in summary_metrics.items()
-                ])
-                st.dataframe(summary_df, use_container_width=True)
-                
+                    st.success("🎯 Your sample size exceeds the requirement for 80% power!")
+            
+            # Recommendations
+            st.markdown("### 💡 Recommendations & Conclusions")
+            
+            recommendations = []
+            
+            # Statistical significance + practical significance
+            if p_value_ttest < 0.05 and abs(effect_pct) > 5:
+                recommendations.append("🎯 **Strong evidence for effect**: Both statistically and practically significant")
+                recommendations.append("✅ **Action recommended**: Implement the tested change")
+            elif p_value_ttest < 0.05 and abs(effect_pct) <= 5:
+                recommendations.append("📊 **Statistically significant but small effect**: Consider cost-benefit analysis")
+                recommendations.append("🤔 **Decision needed**: Is small improvement worth implementation cost?")
+            elif p_value_ttest >= 0.05 and abs(effect_pct) > 10:
+                recommendations.append("📈 **Large effect but not statistically significant**: Increase sample size")
+                recommendations.append("🔄 **Action recommended**: Continue testing with more data")
+            else:
+                recommendations.append("📋 **No convincing evidence of effect**: Consider alternative approaches")
+                recommendations.append("🔄 **Options**: Test different variants or longer duration")
+            
+            # Power-based recommendations
+            if current_power < 0.8:
+                recommendations.append("📊 **Increase statistical power**: Larger sample size needed for reliable conclusions")
+            
+            # Effect size recommendations
+            if abs(cohens_d) >= 0.5:
+                recommendations.append("💪 **Meaningful effect size detected**: Worth further investigation")
+            elif abs(cohens_d) < 0.2:
+                recommendations.append("📉 **Very small effect**: Question if this change is worth pursuing")
+            
+            # Data quality recommendations
+            control_cv = (control_std / control_mean) * 100 if control_mean != 0 else 0
+            treatment_cv = (treatment_std / treatment_mean) * 100 if treatment_mean != 0 else 0
+            
+            if control_cv > 100 or treatment_cv > 100:
+                recommendations.append("⚠️ **High variability detected**: Consider data cleaning or longer measurement period")
+            
+            # Display recommendations
+            for rec in recommendations:
+                st.write(f"• {rec}")
+            
+            # Summary conclusion
+            st.markdown("#### 🎯 Executive Summary")
+            
+            if p_value_ttest < 0.05 and abs(effect_pct) > 5 and current_power > 0.8:
+                conclusion = "🟢 **STRONG POSITIVE RESULT**: Proceed with implementation"
+            elif p_value_ttest < 0.05 and abs(effect_pct) > 2:
+                conclusion = "🟡 **MODERATE POSITIVE RESULT**: Consider implementation with monitoring"
+            elif p_value_ttest >= 0.05 and current_power > 0.8:
+                conclusion = "🔴 **NO SIGNIFICANT EFFECT**: Do not implement this change"
+            else:
+                conclusion = "🟡 **INCONCLUSIVE RESULT**: Need more data for reliable conclusion"
+            
+            st.write(conclusion)
+            
+            # Key metrics summary
+            summary_metrics = {
+                "Control Mean": f"{control_mean:.3f}",
+                "Treatment Mean": f"{treatment_mean:.3f}",
+                "Difference": f"{effect:.3f}",
+                "% Change": f"{effect_pct:+.2f}%",
+                "P-value": f"{p_value_ttest:.4f}",
+                "Effect Size": f"{cohens_d:.3f}",
+                "Statistical Power": f"{current_power:.3f}",
+                "Significance": "Yes" if p_value_ttest < 0.05 else "No"
+            }
+            
+            st.markdown("#### 📋 Key Metrics Summary")
+            summary_df = pd.DataFrame([
+                {"Metric": k, "Value": v} for k, v in summary_metrics.items()
+            ])
+            st.dataframe(summary_df, use_container_width=True)
+            
         except Exception as e:
             st.error(f"⚠️ Error in A/B test analysis: {str(e)}")
-            st.info("💡 **Troubleshooting tips:**")
-            st.write("• Check that your group column has exactly 2 distinct values")
-            st.write("• Ensure your metric column contains numeric data")
-            st.write("• Verify there are no empty or invalid values")
-            st.write("• Try using demo A/B test data to test the functionality")
+            show_ab_troubleshooting()
+    
+    if job is not None:
+        show_job_progress(job)
+
+def run_ab_test(df, group_col, metric_col):
+    """
+    חישוב בדיקת A/B: סטטיסטיקות, מבחנים, גודל אפקט ועוצמה (רץ כמשימת רקע)
+    
+    החזרה:
+        dict: כל ערכי הבדיקה, והערות על הקבוצות להצגה מעל התוצאות
+    """
+    # Data preparation
+    test_data = df[[group_col, metric_col]].dropna()
+    
+    # Notes about the data, shown above the results
+    notes = []
+    
+    # Get unique groups
+    groups = test_data[group_col].unique()
+    
+    if len(groups) != 2:
+        notes.append(('warning', f"⚠️ Found {len(groups)} groups. A/B test works with 2 groups."))
+        notes.append(('write', f"Available groups: {', '.join(map(str, groups))}"))
+        
+        # Take first 2 groups
+        if len(groups) > 2:
+            groups = groups[:2]
+            test_data = test_data[test_data[group_col].isin(groups)]
+            notes.append(('info', f"Analyzing groups: {groups[0]} vs {groups[1]}"))
+    
+    # Split into control and treatment groups
+    control = test_data[test_data[group_col] == groups[0]][metric_col]
+    treatment = test_data[test_data[group_col] == groups[1]][metric_col]
+    
+    # Basic statistics
+    control_mean = control.mean()
+    treatment_mean = treatment.mean()
+    control_std = control.std()
+    treatment_std = treatment.std()
+    
+    jobs.report_progress(0.3, f"Testing {len(control):,} vs {len(treatment):,} observations")
+    
+    # Statistical tests
+    # T-test (Welch's t-test for unequal variances)
+    t_stat, p_value_ttest = stats.ttest_ind(control, treatment, equal_var=False)
+    
+    # Mann-Whitney U test (non-parametric)
+    try:
+        u_stat, p_value_mannwhitney = stats.mannwhitneyu(control, treatment, alternative='two-sided')
+    except Exception as e:
+        notes.append(('warning', f"Mann-Whitney test failed: {e}"))
+        p_value_mannwhitney = np.nan
+    
+    # Effect (difference of means)
+    effect = treatment_mean - control_mean
+    effect_pct = (effect / control_mean) * 100 if control_mean != 0 else 0
+    
+    # Cohen's d (effect size) - corrected calculation
+    pooled_std = np.sqrt(((len(control) - 1) * control_std**2 + (len(treatment) - 1) * treatment_std**2) / (len(control) + len(treatment) - 2))
+    cohens_d = effect / pooled_std if pooled_std != 0 else 0
+    
+    # Confidence interval for the difference
+    se_diff = np.sqrt(control_std**2/len(control) + treatment_std**2/len(treatment))
+    ci_lower = effect - 1.96 * se_diff
+    ci_upper = effect + 1.96 * se_diff
+    
+    # Statistical power calculation
+    from scipy.stats import norm
+    pooled_se = np.sqrt(control_std**2/len(control) + treatment_std**2/len(treatment))
+    z_score = abs(effect) / pooled_se if pooled_se != 0 else 0
+    current_power = 1 - norm.cdf(1.96 - z_score) + norm.cdf(-1.96 - z_score) if pooled_se != 0 else 0
+    
+    # Sample size for 80% power
+    if control_std > 0 and treatment_std > 0:
+        pooled_variance = (control_std**2 + treatment_std**2) / 2
+        n_per_group_80 = 2 * pooled_variance * ((1.96 + 0.84)**2) / (effect**2) if effect != 0 else np.inf
+    else:
+        n_per_group_80 = np.inf
+    
+    return {
+        'test_data': test_data,
+        'groups': groups,
+        'control': control,
+        'treatment': treatment,
+        'control_mean': control_mean,
+        'treatment_mean': treatment_mean,
+        'control_std': control_std,
+        'treatment_std': treatment_std,
+        'p_value_ttest': p_value_ttest,
+        'p_value_mannwhitney': p_value_mannwhitney,
+        'effect': effect,
+        'effect_pct': effect_pct,
+        'cohens_d': cohens_d,
+        'ci_lower': ci_lower,
+        'ci_upper': ci_upper,
+        'current_power': current_power,
+        'n_per_group_80': n_per_group_80,
+        'notes': notes,
+    }
+
+def show_ab_troubleshooting():
+    """
+    טיפים לפתרון תקלות בבדיקת A/B
+    """
+    st.info("💡 **Troubleshooting tips:**")
+    st.write("• Check that your group column has exactly 2 distinct values")
+    st.write("• Ensure your metric column contains numeric data")
+    st.write("• Verify there are no empty or invalid values")
+    st.write("• Try using demo A/B test data to test the functionality")
+
 
 def generate_ab_test_data():
     """
@@ -3394,7 +4411,7 @@ def show_database():
                 )
                 if not res.empty:
                     res = res.sort_values("idx")
-                    fig = px.line(res, x="idx", y=target, title=f"Trend of {target} (last 100 rows)")
+                    fig = chart_factory.line(res, x="idx", y=target, title=f"Trend of {target} (last 100 rows)")
                     st.plotly_chart(fig, use_container_width=True)
                     st.caption("**Explanation (EN):** Uses SQLite internal rowid as an approximate recent order.")
 
@@ -3543,7 +4560,7 @@ def show_database():
                 )
                 if not res.empty:
                     res = res.reset_index().rename(columns={"index": "idx"})
-                    fig = px.line(res, x="idx", y=target, title=f"Trend of {target} (first 100 rows)")
+                    fig = chart_factory.line(res, x="idx", y=target, title=f"Trend of {target} (first 100 rows)")
                     st.plotly_chart(fig, use_container_width=True)
                     st.caption("**Explanation (EN):** No guaranteed ordering without an ID/timestamp; "
                                "we show a simple trend over the fetched sample.")
@@ -3623,19 +4640,26 @@ def show_reports():
         include_correlations = st.checkbox("Include correlations", value=True)
         include_outliers = st.checkbox("Include outlier analysis", value=False)
         
-        if st.button("📄 Generate Report"):
-            with st.spinner("Generating report..."):
-                if report_type == "📈 Brief Overview":
-                    report_content = generate_executive_summary(df)
-                elif report_type == "📊 Detailed Analysis":
-                    report_content = generate_detailed_analysis(df, include_charts, include_stats, include_correlations)
-                elif report_type == "📋 Executive Summary":
-                    report_content = generate_business_summary(df)
-                else:
-                    report_content = generate_custom_report(df, include_charts, include_stats, include_correlations, include_outliers)
-                
-                st.markdown("### 📋 Report Preview")
-                st.markdown(report_content)
+        # Reports are generated as background jobs; the last one stays in the session
+        options = (include_charts, include_stats, include_correlations, include_outliers)
+        report_key = ('report', dataset_fingerprint(df), report_type, options)
+        job, job_result = job_state(report_key)
+        if job_result is not None:
+            st.session_state.report_result = (report_key, job_result)
+        
+        if st.button("📄 Generate Report") and job is None:
+            # The session's trend and outlier tables go to the job as inputs
+            job = start_job(report_key, f"Report ({report_type})", run_report, df, report_type, *options,
+                            trend_table=get_trend_table(df), outlier_report=get_outlier_report(df))
+        
+        saved = st.session_state.get('report_result')
+        if saved is not None and saved[0] == report_key:
+            report_content = saved[1]
+            st.markdown("### 📋 Report Preview")
+            st.markdown(report_content)
+        
+        if job is not None:
+            show_job_progress(job)
     
     with col2:
         st.markdown("### 💾 Data Export")
@@ -3678,7 +4702,30 @@ def show_reports():
                 mime='text/markdown'
             )
 
-def generate_business_summary(df):
+def run_report(df, report_type, include_charts, include_stats, include_correlations, include_outliers,
+               trend_table=None, outlier_report=None):
+    """
+    יצירת תוכן הדוח לפי הסוג וההגדרות שנבחרו (רץ כמשימת רקע)
+    
+    פרמטרים:
+        trend_table (DataFrame): טבלת הטרנדים של הסשן (None - חישוב מחדש)
+        outlier_report (OutlierResult): דוח החריגים של הסשן (None - חישוב מחדש)
+    
+    החזרה:
+        str: תוכן הדוח בפורמט Markdown
+    """
+    jobs.report_progress(0.1, "Analyzing data")
+    if report_type == "📈 Brief Overview":
+        return generate_executive_summary(df)
+    if report_type == "📊 Detailed Analysis":
+        return generate_detailed_analysis(df, include_charts, include_stats, include_correlations,
+                                          trend_table=trend_table, outlier_report=outlier_report)
+    if report_type == "📋 Executive Summary":
+        return generate_business_summary(df, trend_table=trend_table)
+    return generate_custom_report(df, include_charts, include_stats, include_correlations, include_outliers,
+                                  outlier_report=outlier_report)
+
+def generate_business_summary(df, trend_table=None):
     """
     יצירת דוח סיכום מתמקד בתוצאות עסקיות
     
@@ -3690,6 +4737,7 @@ def generate_business_summary(df):
     
     פרמטרים:
         df (DataFrame): מסגרת הנתונים לניתוח
+        trend_table (DataFrame): טבלת טרנדים שכבר חושבה (None - חישוב מהנתונים)
     
     תוכן הדוח:
     - סקירה כללית של הנתונים
@@ -3751,6 +4799,16 @@ def generate_business_summary(df):
                 summary += f"- **{var1}** ↔ **{var2}**: {corr:.3f}\n"
             summary += "\n"
 
+    if len(numeric_cols) > 0:
+        if trend_table is None:
+            trend_table = trends.fit_trends(df)
+        strong_trends = trend_table[trend_table['strength'] == 'strong'].sort_values('r2', ascending=False)
+        if not strong_trends.empty:
+            summary += "### 📉 Clear Trends\n\n"
+            for col, trend in strong_trends.head(3).iterrows():
+                summary += f"- **{col}**: {trends.describe_trend(trend)}\n"
+            summary += "\n"
+
     summary += "## 🎯 Recommendations\n\n"
     recommendations = []
     if missing_pct > 10:
@@ -3767,7 +4825,8 @@ def generate_business_summary(df):
     summary += f"\n---\nReport generated by DataBot Analytics Pro"
     return summary
 
-def generate_detailed_analysis(df, include_charts=True, include_stats=True, include_correlations=True):
+def generate_detailed_analysis(df, include_charts=True, include_stats=True, include_correlations=True,
+                               trend_table=None, outlier_report=None):
     israel_tz = pytz.timezone('Asia/Jerusalem')
     now_israel = datetime.now(israel_tz)
     numeric_cols = df.select_dtypes(include=[np.number]).columns
@@ -3865,6 +4924,18 @@ def generate_detailed_analysis(df, include_charts=True, include_stats=True, incl
                 analysis += "(close to normal)\n"
             analysis += "\n"
 
+    if len(numeric_cols) > 0:
+        analysis += "## 📉 Trend Analysis\n\n"
+        if trend_table is None:
+            trend_table = trends.fit_trends(df)
+        trend_table = trend_table.dropna(subset=['r2']).sort_values('r2', ascending=False)
+        for col, trend in trend_table.head(10).iterrows():
+            analysis += f"- **{col}**: {trends.describe_trend(trend)}\n"
+        if len(trend_table) > 10:
+            strong = (trend_table['strength'] == 'strong').sum()
+            analysis += f"\n*{len(trend_table)} columns analyzed, {strong} with a strong linear trend*\n"
+        analysis += "\n"
+
     analysis += "## 💡 Conclusions and Recommendations\n\n"
     conclusions = []
     missing_pct_total = (df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100
@@ -3887,14 +4958,10 @@ def generate_detailed_analysis(df, include_charts=True, include_stats=True, incl
             conclusions.append("🔗 Strong correlations detected - possible multicollinearity")
         elif max_corr > 0.5:
             conclusions.append("📊 Moderate correlations found between variables")
-    outlier_cols = []
-    for col in numeric_cols:
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        outliers = df[(df[col] < Q1 - 1.5*IQR) | (df[col] > Q3 + 1.5*IQR)]
-        if len(outliers) > len(df) * 0.05:
-            outlier_cols.append(col)
+    if outlier_report is None:
+        outlier_report = outliers.detect_outliers(df)
+    iqr_counts = outlier_report.counts['IQR']
+    outlier_cols = iqr_counts[iqr_counts > len(df) * 0.05].index.tolist()
     if outlier_cols:
         conclusions.append(f"⚠️ Outliers detected in columns: {', '.join(outlier_cols)}")
     for i, conclusion in enumerate(conclusions, 1):
@@ -3939,7 +5006,8 @@ def generate_executive_summary(df):
     summary += f"\n*Overview created: {now_israel.strftime('%Y-%m-%d %H:%M')} (Israel time)*"
     return summary
 
-def generate_custom_report(df, include_charts=True, include_stats=True, include_correlations=True, include_outliers=False):
+def generate_custom_report(df, include_charts=True, include_stats=True, include_correlations=True, include_outliers=False,
+                           outlier_report=None):
     israel_tz = pytz.timezone('Asia/Jerusalem')
     now_israel = datetime.now(israel_tz)
     numeric_cols = df.select_dtypes(include=[np.number]).columns
@@ -3970,10 +5038,12 @@ def generate_custom_report(df, include_charts=True, include_stats=True, include_
         report += f"Maximum correlation: {max_corr:.3f}\n"
     if include_outliers:
         report += f"\n## 🎯 Outlier Analysis\n"
-        for col in numeric_cols[:3]:
-            outliers_info = detect_outliers_advanced(df[col])
-            iqr_outliers = outliers_info['IQR']['count']
-            report += f"**{col}**: {iqr_outliers} outliers by IQR method\n"
+        if outlier_report is None:
+            outlier_report = outliers.detect_outliers(df)
+        outlier_counts = outlier_report.counts
+        for col, counts in outlier_counts.sort_values('IQR', ascending=False).iterrows():
+            report += (f"**{col}**: {counts['IQR']} outliers by IQR method, "
+                       f"{counts['Z-Score']} by Z-Score, {counts['Modified Z-Score']} by Modified Z-Score\n")
     return report
 
 # Helper functions for creating demo data
@@ -4195,7 +5265,7 @@ def calculate_data_quality(df):
     
     return max(0, min(10, score))
 
-def fill_missing_values(df):
+def fill_missing_values(df, group_by=None):
     """
     מילוי ערכים חסרים בשיטות מתאימות לפי סוג הנתונים
     
@@ -4207,46 +5277,22 @@ def fill_missing_values(df):
     
     פרמטרים:
         df (DataFrame): מסגרת הנתונים עם ערכים חסרים
+        group_by (str, optional): עמודה למילוי לפי קבוצות (למשל חציון לכל Region)
     
     שיטות המילוי לפי סוג נתונים:
-    - עמודות נומריות (float64, int64): מילוי בחציון
-      - בחירה בחציון על פני ממוצע להפחתת השפעת ערכים חריגים
-      - שמירה על ההתפלגות המקורית של הנתונים
-    - עמודות טקסט/קטגוריאליות (object): מילוי במצב (Mode)
-      - בחירה בערך השכיח ביותר לכל עמודה
-      - הפחתת השפעה על ההתפלגות הקטגוריאלית
-    - עמודות אחרות: מילוי קדמי (Forward Fill)
-      - שימוש בערך הקודם הזמין
-      - מתאים לסדרות זמן ולנתונים סדרתיים
-    
-    יתרונות השיטה:
-    - גישה מתוחכמת ומותאמת לסוג הנתונים
-    - שמירה על התפלגויות מקוריות
-    - עמידות בפני ערכים חריגים
-    - תוצאות מהימנות לניתוחים סטטיסטיים
+    - עמודות נומריות (כל סוגי int/float, כולל Int64): מילוי בחציון
+    - עמודות תאריך: מילוי בחציון
+    - עמודות טקסט/קטגוריאליות/בוליאניות: מילוי בערך השכיח (Mode) או 'Unknown'
+    
+    ביצועים:
+    - כל ערכי המילוי מחושבים באגרגציה אחת (או אגרגציה קבוצתית אחת)
+    - המילוי מתבצע ברמת הבלוקים ללא העתקה מלאה של המסגרת (Copy-on-Write)
+    - עמודות ללא ערכים חסרים משותפות עם המסגרת המקורית
     
     החזרה:
         DataFrame: מסגרת נתונים מעודכנת ללא ערכים חסרים
     """
-    
-    df_filled = df.copy()
-    
-    for col in df_filled.columns:
-        if df_filled[col].dtype in ['float64', 'int64']:
-            # Numeric - with median
-            df_filled[col] = df_filled[col].fillna(df_filled[col].median())
-        elif df_filled[col].dtype == 'object':
-            # Categorical - with mode or 'Unknown'
-            mode_val = df_filled[col].mode()
-            if len(mode_val) > 0:
-                df_filled[col] = df_filled[col].fillna(mode_val[0])
-            else:
-                df_filled[col] = df_filled[col].fillna('Unknown')
-        elif df_filled[col].dtype == 'datetime64[ns]':
-            # Dates - with median
-            df_filled[col] = df_filled[col].fillna(df_filled[col].median())
-    
-    return df_filled
+    return imputation.fill_missing_values(df, group_by=group_by)
 
 def show_quick_summary():
     """
@@ -4394,17 +5440,19 @@ def show_quick_3d():
         # Auto-select first 3 numeric columns
         x_col, y_col, z_col = numeric_cols[:3]
         
-        fig = go.Figure(data=[go.Scatter3d(
-            x=df[x_col],
-            y=df[y_col],
-            z=df[z_col],
+        points = get_chart_points(df, dataset_fingerprint(df), 'scatter', [x_col, y_col, z_col])
+        fig = go.Figure(data=[chart_factory.trace3d(
+            x=points[x_col],
+            y=points[y_col],
+            z=points[z_col],
             mode='markers',
             marker=dict(
                 size=5,
-                color=df[z_col],
+                color=points[z_col],
                 colorscale='Viridis',
                 opacity=0.8
-            )
+            ),
+            labels=(x_col, y_col, z_col)
         )])
         
         fig.update_layout(
@@ -4418,6 +5466,7 @@ def show_quick_3d():
         )
         
         st.plotly_chart(fig, use_container_width=True)
+        show_point_reduction_note(points, df)
     else:
         st.warning("Need at least 3 numeric columns for 3D plot")
 
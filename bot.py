@@ -43,12 +43,17 @@ from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime
 import pytz
-from sklearn.ensemble import RandomForestRegressor, IsolationForest
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import silhouette_score
 import warnings
+import trends
+import outliers
+from ml_session import MLSession
+import model_registry
+import density_raster
+import distributions
+import pairplot
+import correlation_view
+from utils import dataset_fingerprint
 warnings.filterwarnings('ignore')
 
 # Load environment variables
@@ -101,6 +106,8 @@ class DataAnalyticsBot:
             BotCommand("analyze", "📊 Quick data analysis"),
             BotCommand("visualize", "🎨 Create visualizations"),
             BotCommand("ml", "🤖 Machine learning analysis"),
+            BotCommand("models", "💾 List saved models"),
+            BotCommand("score", "📦 Score data with a saved model"),
             BotCommand("report", "📋 Generate full report"),
             BotCommand("stats", "📈 Advanced statistics"),
             BotCommand("help", "❓ Help and commands")
@@ -116,6 +123,8 @@ class DataAnalyticsBot:
         self.application.add_handler(CommandHandler("visualize", self.visualize))
         self.application.add_handler(CommandHandler("charts", self.create_charts))
         self.application.add_handler(CommandHandler("ml", self.machine_learning))
+        self.application.add_handler(CommandHandler("models", self.list_models))
+        self.application.add_handler(CommandHandler("score", self.score_with_model))
         self.application.add_handler(CommandHandler("report", self.generate_report))
         self.application.add_handler(CommandHandler("stats", self.advanced_statistics))
         self.application.add_handler(CallbackQueryHandler(self.handle_callback))
@@ -196,6 +205,8 @@ Advanced data analysis and machine learning at your fingertips.
 /visualize - Create quick visualizations
 /charts - Generate multiple chart types
 /ml - Machine learning analysis
+/models - List your saved models
+/score <model id> - Score the loaded file with a saved model
 /report - Full analytical report with insights
 /stats - Advanced statistical metrics
 
@@ -213,6 +224,7 @@ Advanced data analysis and machine learning at your fingertips.
 • Feature Importance Analysis
 • Anomaly Detection (Isolation Forest)
 • Predictive modeling insights
+• Save fitted models and score new files without retraining
 
 📋 **Report Features:**
 • Data quality assessment
@@ -259,6 +271,8 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
             await self.generate_report(update, context, callback=True)
         elif callback_data == "adv_stats":
             await self.advanced_statistics(update, context, callback=True)
+        elif callback_data == "save_models":
+            await self.save_models(update, context)
         elif callback_data == "show_help":
             await self.help_command(update, context)
         elif callback_data == "back_to_menu":
@@ -465,8 +479,10 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
             scaler = StandardScaler()
             X_scaled = scaler.fit_transform(X)
             
-            # Machine Learning Results
-            ml_results = self.perform_ml_analysis(X, X_scaled, numeric_cols, filename)
+            # Machine Learning Results (models are fitted once and shared with the charts)
+            session = MLSession(X, X_scaled, numeric_cols, scaler=scaler)
+            context.user_data['ml_session'] = session
+            ml_results = self.perform_ml_analysis(X, X_scaled, numeric_cols, filename, session)
             
             # Send results in chunks
             if len(ml_results) > 4000:
@@ -487,7 +503,14 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
                     await update.message.reply_text(ml_results, parse_mode='Markdown')
             
             # Generate ML visualizations
-            await self.send_ml_charts(update, context, X, X_scaled, numeric_cols)
+            await self.send_ml_charts(update, context, X, X_scaled, numeric_cols, session)
+            
+            keyboard = [[InlineKeyboardButton("💾 Save models for scoring", callback_data="save_models")]]
+            await context.bot.send_message(
+                chat_id=update.effective_chat.id,
+                text="💾 Save these models to score next week's data without retraining.",
+                reply_markup=InlineKeyboardMarkup(keyboard)
+            )
             
         except Exception as e:
             error_msg = f"❌ **ML Analysis Error:** {str(e)}"
@@ -496,6 +519,92 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
             else:
                 await update.message.reply_text(error_msg, parse_mode='Markdown')
     
+    async def save_models(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Save the clustering, PCA and anomaly pipelines of the last /ml run"""
+        session = context.user_data.get('ml_session')
+        if session is None:
+            await update.callback_query.edit_message_text("🤖 Run /ml first, then save its models.")
+            return
+        
+        try:
+            saved = session.save_models(
+                owner=update.effective_chat.id,
+                name=os.path.splitext(context.user_data.get('filename', 'data'))[0]
+            )
+            lines = [f"• `{m['id']}` ({m['kind']})" for m in saved]
+            await update.callback_query.edit_message_text(
+                "💾 **Models saved:**\n" + "\n".join(lines) +
+                "\n\nUpload a new file, then send `/score <model id>`.",
+                parse_mode='Markdown'
+            )
+        except Exception as e:
+            await update.callback_query.edit_message_text(f"❌ Error saving models: {str(e)}")
+    
+    async def list_models(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """List the models this chat has saved"""
+        models = model_registry.list_models(owner=update.effective_chat.id)
+        if not models:
+            await update.message.reply_text(
+                "💾 No saved models yet.\nRun /ml on a file and press \"Save models for scoring\"."
+            )
+            return
+        
+        lines = ["💾 **Saved models** (newest first):\n"]
+        for m in models[:20]:
+            lines.append(f"• `{m['id']}`\n  {m['kind']} · {len(m['features'])} features · "
+                         f"{m.get('n_rows') or 0:,} rows · {m['created']}")
+        lines.append("\nScore the loaded file with `/score <model id>`.")
+        await update.message.reply_text("\n".join(lines), parse_mode='Markdown')
+    
+    async def score_with_model(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Score the loaded file chunk by chunk with a saved model and send the results as CSV"""
+        if 'dataframe' not in context.user_data:
+            await update.message.reply_text(
+                "📁 **No data loaded!**\nUpload the file to score first.", parse_mode='Markdown'
+            )
+            return
+        
+        models = model_registry.list_models(owner=update.effective_chat.id)
+        if context.args:
+            model_id = context.args[0]
+        elif models:
+            model_id = models[0]['id']
+        else:
+            await update.message.reply_text("💾 No saved models yet. Run /ml and save its models first.")
+            return
+        if model_id not in {m['id'] for m in models}:
+            await update.message.reply_text("❌ Unknown model id. Send /models to see your saved models.")
+            return
+        
+        df = context.user_data['dataframe']
+        try:
+            await update.message.reply_text(f"📦 **Scoring {len(df):,} rows** with `{model_id}`...",
+                                            parse_mode='Markdown')
+            pipeline, metadata = model_registry.load_model(model_id)
+            output = io.StringIO()
+            summary = model_registry.score_to_csv(
+                pipeline, metadata, model_registry.iter_frame_chunks(df), output
+            )
+            
+            text = f"✅ **Scored {summary['scored']:,} of {summary['rows']:,} rows** ({metadata['kind']})"
+            if metadata['kind'] == 'clustering':
+                text += "\n" + "\n".join(f"• Cluster {k}: {v:,} rows" for k, v in sorted(summary['counts'].items()))
+            elif metadata['kind'] == 'anomalies':
+                text += f"\n• Anomalies: {summary['counts'].get(True, 0):,} rows"
+            warning = model_registry.compatibility_warning(metadata)
+            if warning:
+                text += f"\n⚠️ {warning}"
+            await update.message.reply_text(text, parse_mode='Markdown')
+            
+            base_name = os.path.splitext(context.user_data.get('filename', 'data'))[0]
+            await context.bot.send_document(
+                chat_id=update.effective_chat.id,
+                document=InputFile(io.BytesIO(output.getvalue().encode('utf-8')),
+                                   filename=f"{base_name}_scored_{metadata['kind']}.csv")
+            )
+        except Exception as e:
+            await update.message.reply_text(f"❌ Scoring error: {str(e)}")
+    
     async def generate_report(self, update: Update, context: ContextTypes.DEFAULT_TYPE, callback=False):
         """Generate comprehensive analytical report"""
         if 'dataframe' not in context.user_data:
@@ -826,23 +935,26 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
                        [{'type': 'heatmap'}, {'type': 'scatter'}]]
             )
             
+            # Histograms and boxes are drawn from precomputed summaries, not the raw columns
+            version = dataset_fingerprint(df)
+            
             # 1. Distribution plot for first numeric column
             col = numeric_cols[0]
             fig.add_trace(
-                go.Histogram(x=df[col], name=col, showlegend=False),
+                distributions.histogram_trace(distributions.cached_histogram(version, df, col),
+                                              name=col, showlegend=False),
                 row=1, col=1
             )
             
             # 2. Box plot for first few numeric columns
             for i, col in enumerate(numeric_cols[:3]):
-                fig.add_trace(
-                    go.Box(y=df[col], name=col),
-                    row=1, col=2
-                )
+                color = px.colors.qualitative.Plotly[i]
+                for trace in distributions.box_traces(distributions.cached_box(version, df, col), col, color=color):
+                    fig.add_trace(trace, row=1, col=2)
             
-            # 3. Correlation matrix if multiple numeric columns
+            # 3. Correlation matrix if multiple numeric columns (clustered, most correlated on wide data)
             if len(numeric_cols) > 1:
-                corr_matrix = df[numeric_cols].corr()
+                corr_matrix = correlation_view.heatmap_view(df, numeric_cols, version)['matrix']
                 fig.add_trace(
                     go.Heatmap(
                         z=corr_matrix.values,
@@ -855,8 +967,12 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
                     row=2, col=1
                 )
             
-            # 4. Scatter plot if at least 2 numeric columns
-            if len(numeric_cols) >= 2:
+            # 4. Scatter plot if at least 2 numeric columns (density raster for large data)
+            if len(numeric_cols) >= 2 and len(df) > density_raster.RASTER_ROW_THRESHOLD:
+                grid = density_raster.aggregate_grid(df[numeric_cols[0]], df[numeric_cols[1]])
+                fig.add_trace(density_raster.heatmap_trace(grid, showscale=False), row=2, col=2)
+                fig.layout.annotations[3].text = f"{numeric_cols[1]} vs {numeric_cols[0]} (density)"
+            elif len(numeric_cols) >= 2:
                 fig.add_trace(
                     go.Scatter(
                         x=df[numeric_cols[0]], 
@@ -917,11 +1033,12 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
                 axes[0, 1].set_title('Box Plot')
                 axes[0, 1].set_ylabel('Values')
             
-            # 3. Correlation heatmap
+            # 3. Correlation heatmap (clustered, most correlated on wide data)
             if len(numeric_cols) > 1:
-                corr_matrix = df[numeric_cols].corr()
+                view = correlation_view.heatmap_view(df, numeric_cols, dataset_fingerprint(df))
+                corr_matrix = view['matrix']
                 im = axes[1, 0].imshow(corr_matrix, cmap='coolwarm', aspect='auto', vmin=-1, vmax=1)
-                axes[1, 0].set_title('Correlation Matrix', fontsize=12)
+                axes[1, 0].set_title('Correlation Matrix' + correlation_view.title_suffix(view), fontsize=12)
                 axes[1, 0].set_xticks(range(len(corr_matrix.columns)))
                 axes[1, 0].set_yticks(range(len(corr_matrix.columns)))
                 
@@ -932,11 +1049,12 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
                 axes[1, 0].set_yticklabels(short_cols, fontsize=8)
                 plt.colorbar(im, ax=axes[1, 0])
                 
-                # Add correlation values as text
-                for i in range(len(corr_matrix.columns)):
-                    for j in range(len(corr_matrix.columns)):
-                        text = axes[1, 0].text(j, i, f'{corr_matrix.iloc[i, j]:.2f}',
-                                             ha="center", va="center", color="black", fontsize=6)
+                # Add correlation values as text (small matrices only)
+                if view['annotate']:
+                    for i in range(len(corr_matrix.columns)):
+                        for j in range(len(corr_matrix.columns)):
+                            text = axes[1, 0].text(j, i, f'{corr_matrix.iloc[i, j]:.2f}',
+                                                 ha="center", va="center", color="black", fontsize=6)
             
             # 4. Scatter plot
             if len(numeric_cols) >= 2:
@@ -996,30 +1114,21 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
                 os.remove(chart_path)
                 charts_created += 1
             
-            # 2. Pair plot if multiple columns
+            # 2. Pair plot if multiple columns (density rasters, bounded time for any row count)
             if len(numeric_cols) >= 2:
-                fig, ax = plt.subplots(figsize=(10, 8))
-                
-                # Create scatter matrix
-                pd.plotting.scatter_matrix(
-                    df[numeric_cols[:4]], 
-                    ax=ax if len(numeric_cols) < 2 else None,
-                    figsize=(10, 8),
-                    diagonal='hist',
-                    alpha=0.5
-                )
-                
-                plt.suptitle('Pair Plot Analysis', fontsize=14)
-                plt.tight_layout()
+                fig, grids = pairplot.pair_plot(df, numeric_cols)
                 
                 chart_path = 'pairplot.png'
-                plt.savefig(chart_path, dpi=100, bbox_inches='tight')
-                plt.close()
+                fig.savefig(chart_path, dpi=100, bbox_inches='tight')
+                plt.close(fig)
                 
+                caption = "📊 Pair Plot Analysis"
+                if grids['sampled_rows']:
+                    caption += f" (sample of {grids['sampled_rows']:,} of {grids['n_rows']:,} rows)"
                 with open(chart_path, 'rb') as chart_file:
                     await update.message.reply_photo(
                         photo=chart_file,
-                        caption="📊 Pair Plot Analysis"
+                        caption=caption
                     )
                 
                 os.remove(chart_path)
@@ -1034,7 +1143,7 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
     #                      MACHINE LEARNING METHODS
     # ================================================================
     
-    def perform_ml_analysis(self, X, X_scaled, numeric_cols, filename):
+    def perform_ml_analysis(self, X, X_scaled, numeric_cols, filename, session=None):
         """
         Perform comprehensive machine learning analysis.
         
@@ -1045,10 +1154,14 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
             X_scaled: Standardized feature matrix
             numeric_cols: List of numeric column names
             filename: Name of analyzed file
+            session: Optional MLSession whose fitted models are shared with the charts
             
         Returns:
             str: Formatted ML analysis results
         """
+        if session is None:
+            session = MLSession(X, X_scaled, numeric_cols)
+        
         results = f"""
 🤖 **Machine Learning Analysis: `{filename}`**
 
@@ -1056,35 +1169,23 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
         """
         
         # Optimal number of clusters using silhouette score
-        best_k = 2
-        best_score = -1
-        silhouette_scores = []
-        
-        for k in range(2, min(8, len(X)//2)):
-            try:
-                kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-                cluster_labels = kmeans.fit_predict(X_scaled)
-                score = silhouette_score(X_scaled, cluster_labels)
-                silhouette_scores.append((k, score))
-                if score > best_score:
-                    best_score = score
-                    best_k = k
-            except:
-                break
-        
-        # Perform clustering with optimal k
-        kmeans = KMeans(n_clusters=best_k, random_state=42, n_init=10)
-        cluster_labels = kmeans.fit_predict(X_scaled)
+        clustering = session.clustering()
+        best_k = clustering['best_k']
+        best_score = clustering['best_score']
         
         results += f"""
 • **Optimal Clusters:** {best_k} (Silhouette Score: {best_score:.3f})
 • **Cluster Distribution:**
 """
         
-        unique, counts = np.unique(cluster_labels, return_counts=True)
-        for cluster, count in zip(unique, counts):
-            percentage = (count / len(cluster_labels)) * 100
-            results += f"  - Cluster {cluster}: {count} points ({percentage:.1f}%)\n"
+        # Sizes and distinguishing features of every cluster from one grouped pass
+        profile = session.cluster_profile()
+        for cluster in profile.clusters:
+            results += f"  - Cluster {cluster}: {profile.sizes[cluster]} points ({profile.shares[cluster]:.1f}%)\n"
+            traits = [f"{feature} {'high' if z > 0 else 'low'} ({z:+.1f}σ)"
+                      for feature, z in profile.top_features(cluster)]
+            if traits:
+                results += f"    {', '.join(traits)}\n"
         
         # PCA Analysis
         results += f"""
@@ -1092,8 +1193,7 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
 📉 **Principal Component Analysis (PCA):**
 """
         
-        pca = PCA()
-        X_pca = pca.fit_transform(X_scaled)
+        pca = session.pca()['model']
         
         # Cumulative explained variance
         cumsum_var = np.cumsum(pca.explained_variance_ratio_)
@@ -1122,8 +1222,7 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
 🔍 **Anomaly Detection (Isolation Forest):**
 """
         
-        iso_forest = IsolationForest(contamination=0.1, random_state=42)
-        anomaly_labels = iso_forest.fit_predict(X_scaled)
+        anomaly_labels = session.anomaly_labels()
         n_anomalies = np.sum(anomaly_labels == -1)
         anomaly_pct = (n_anomalies / len(X)) * 100
         
@@ -1225,6 +1324,21 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
 • Variability: {variability} (CV: {cv:.2f})
 """
 
+        # Trend insights for all numeric columns in one vectorized fit
+        if len(numeric_cols) > 0:
+            trend_table = trends.fit_trends(df, numeric_cols).dropna(subset=['r2'])
+            trend_table = trend_table.sort_values('r2', ascending=False)
+            report += f"""
+
+---
+
+📉 **Trend Insights:**
+"""
+            for col, trend in trend_table.head(5).iterrows():
+                report += f"• **{col}**: {trends.describe_trend(trend)}\n"
+            strong = (trend_table['strength'] == 'strong').sum()
+            report += f"• {strong} of {len(trend_table)} numeric columns show a strong linear trend\n"
+
         # Business recommendations
         report += f"""
 
@@ -1294,6 +1408,9 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
 🔢 **Distribution Analysis:**
         """
         
+        # Outlier counts for the reported columns in one vectorized pass
+        outlier_counts = outliers.detect_outliers(df, numeric_cols[:5]).counts
+        
         for col in numeric_cols[:5]:
             data = df[col].dropna()
             
@@ -1321,17 +1438,14 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
                 kurt_desc = "Normal-tailed (Mesokurtic)"
             
             # Outlier detection using IQR
-            Q1 = data.quantile(0.25)
-            Q3 = data.quantile(0.75)
-            IQR = Q3 - Q1
-            outliers = data[(data < Q1 - 1.5 * IQR) | (data > Q3 + 1.5 * IQR)]
-            outlier_pct = (len(outliers) / len(data)) * 100
+            outlier_count = outlier_counts.loc[col, 'IQR']
+            outlier_pct = (outlier_count / len(data)) * 100
             
             results += f"""
 **{col}:**
 • Skewness: {skewness:.3f} ({skew_desc})
 • Kurtosis: {kurtosis:.3f} ({kurt_desc})
-• Outliers: {len(outliers)} ({outlier_pct:.1f}%) using IQR method
+• Outliers: {outlier_count} ({outlier_pct:.1f}%) using IQR method
 • Coefficient of Variation: {(data.std() / data.mean()):.3f}
 """
 
@@ -1439,13 +1553,15 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
                 ]
             )
             
+            # Histograms and boxes are drawn from precomputed summaries, not the raw columns
+            version = dataset_fingerprint(df)
+            
             # 1. Enhanced distribution plot
             col = numeric_cols[0]
             fig.add_trace(
-                go.Histogram(
-                    x=df[col], 
+                distributions.histogram_trace(
+                    distributions.cached_histogram(version, df, col, bins=30),
                     name=col,
-                    nbinsx=30,
                     showlegend=False,
                     marker_color='lightblue',
                     opacity=0.8
@@ -1453,21 +1569,20 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
                 row=1, col=1
             )
             
-            # 2. Multi-column box plot
+            # 2. Multi-column box plot (outliers as a capped sample of the most extreme values)
             for i, col in enumerate(numeric_cols[:4]):
-                fig.add_trace(
-                    go.Box(
-                        y=df[col], 
-                        name=col,
-                        boxpoints='outliers',
-                        marker_color=px.colors.qualitative.Set1[i % len(px.colors.qualitative.Set1)]
-                    ),
-                    row=1, col=2
-                )
+                color = px.colors.qualitative.Set1[i % len(px.colors.qualitative.Set1)]
+                for trace in distributions.box_traces(distributions.cached_box(version, df, col), col, color=color):
+                    fig.add_trace(trace, row=1, col=2)
             
-            # 3. Enhanced correlation heatmap
+            # 3. Enhanced correlation heatmap (cell values only while they fit)
             if len(numeric_cols) > 1:
-                corr_matrix = df[numeric_cols].corr()
+                view = correlation_view.heatmap_view(df, numeric_cols, version)
+                corr_matrix = view['matrix']
+                labels = {}
+                if view['annotate']:
+                    labels = dict(text=np.round(corr_matrix.values, 2), texttemplate='%{text}',
+                                  textfont={"size": 10})
                 fig.add_trace(
                     go.Heatmap(
                         z=corr_matrix.values,
@@ -1476,15 +1591,23 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
                         colorscale='RdBu',
                         zmid=0,
                         showscale=True,
-                        text=np.round(corr_matrix.values, 2),
-                        texttemplate='%{text}',
-                        textfont={"size": 10}
+                        **labels
                     ),
                     row=2, col=1
                 )
             
-            # 4. Enhanced scatter plot
-            if len(numeric_cols) >= 2:
+            # 4. Enhanced scatter plot (density raster for large data, colored by a third column)
+            if len(numeric_cols) >= 2 and len(df) > density_raster.RASTER_ROW_THRESHOLD:
+                if len(numeric_cols) >= 3:
+                    grid = density_raster.aggregate_grid(df[numeric_cols[0]], df[numeric_cols[1]],
+                                                         df[numeric_cols[2]], how="mean")
+                    panel_title = f"{numeric_cols[1]} vs {numeric_cols[0]} (mean {numeric_cols[2]})"
+                else:
+                    grid = density_raster.aggregate_grid(df[numeric_cols[0]], df[numeric_cols[1]])
+                    panel_title = f"{numeric_cols[1]} vs {numeric_cols[0]} (density)"
+                fig.add_trace(density_raster.heatmap_trace(grid, showscale=False), row=2, col=2)
+                fig.layout.annotations[3].text = panel_title
+            elif len(numeric_cols) >= 2:
                 fig.add_trace(
                     go.Scatter(
                         x=df[numeric_cols[0]], 
@@ -1557,21 +1680,23 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
         except Exception as e:
             await self.send_matplotlib_charts(update, context, df)
     
-    async def send_ml_charts(self, update: Update, context: ContextTypes.DEFAULT_TYPE, X, X_scaled, numeric_cols):
+    async def send_ml_charts(self, update: Update, context: ContextTypes.DEFAULT_TYPE, X, X_scaled, numeric_cols, session=None):
         """Send machine learning visualization charts"""
+        if session is None:
+            session = MLSession(X, X_scaled, numeric_cols)
         try:
             # Create ML visualization dashboard
             fig, axes = plt.subplots(2, 2, figsize=(16, 14))
             fig.suptitle('🤖 Machine Learning Analysis Dashboard', fontsize=18, fontweight='bold')
             plt.subplots_adjust(left=0.1, right=0.95, top=0.93, bottom=0.1, hspace=0.3, wspace=0.3)
             
-            # 1. Clustering visualization
-            kmeans = KMeans(n_clusters=3, random_state=42)
-            cluster_labels = kmeans.fit_predict(X_scaled)
+            # 1. Clustering visualization (same clusters as the text report)
+            clustering = session.clustering()
+            cluster_labels = clustering['labels']
             
             if len(numeric_cols) >= 2:
                 scatter = axes[0, 0].scatter(X.iloc[:, 0], X.iloc[:, 1], c=cluster_labels, cmap='viridis', alpha=0.7)
-                axes[0, 0].set_title('K-Means Clustering Results', fontsize=12)
+                axes[0, 0].set_title(f"K-Means Clustering Results (k={clustering['best_k']})", fontsize=12)
                 # Truncate long column names
                 xlabel = numeric_cols[0][:20] + '...' if len(numeric_cols[0]) > 20 else numeric_cols[0]
                 ylabel = numeric_cols[1][:20] + '...' if len(numeric_cols[1]) > 20 else numeric_cols[1]
@@ -1580,8 +1705,7 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
                 plt.colorbar(scatter, ax=axes[0, 0])
             
             # 2. PCA visualization
-            pca = PCA()
-            X_pca = pca.fit_transform(X_scaled)
+            pca = session.pca()['model']
             
             axes[0, 1].plot(range(1, len(pca.explained_variance_ratio_) + 1), 
                            np.cumsum(pca.explained_variance_ratio_), 'bo-')
@@ -1591,29 +1715,24 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
             axes[0, 1].grid(True, alpha=0.3)
             
             # 3. Feature importance (using Random Forest)
-            if len(X) > 10 and len(numeric_cols) > 1:
-                # Use first column as target for feature importance demo
-                rf = RandomForestRegressor(n_estimators=100, random_state=42)
-                y_temp = X.iloc[:, 0]  # Use first column as pseudo-target
-                X_temp = X.iloc[:, 1:]  # Rest as features
-                
-                if len(X_temp.columns) > 0:
-                    rf.fit(X_temp, y_temp)
-                    importances = rf.feature_importances_
+            # Use first column as pseudo-target, rest as features
+            importance = session.feature_importance()
+            if importance is not None:
+                if len(importance['features']) > 0:
+                    importances = importance['importances']
                     
                     # Truncate long column names for better visibility
-                    shortened_cols = [col[:15] + '...' if len(col) > 15 else col for col in X_temp.columns]
+                    shortened_cols = [col[:15] + '...' if len(col) > 15 else col for col in importance['features']]
                     
                     axes[1, 0].barh(range(len(importances)), importances, color='lightgreen')
                     axes[1, 0].set_yticks(range(len(importances)))
                     axes[1, 0].set_yticklabels(shortened_cols, fontsize=8)
-                    axes[1, 0].set_title('Feature Importance (Random Forest)', fontsize=12)
+                    axes[1, 0].set_title('Feature Importance (Random Forest, held-out permutation)', fontsize=12)
                     axes[1, 0].set_xlabel('Importance')
                     axes[1, 0].grid(True, alpha=0.3)
             
             # 4. Anomaly detection visualization  
-            iso_forest = IsolationForest(contamination=0.1, random_state=42)
-            anomaly_labels = iso_forest.fit_predict(X_scaled)
+            anomaly_labels = session.anomaly_labels()
             
             if len(numeric_cols) >= 2:
                 colors = ['red' if x == -1 else 'blue' for x in anomaly_labels]
@@ -1682,9 +1801,10 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
             
             # Chart 3: Correlation strength overview
             if len(numeric_cols) > 1:
-                corr_matrix = df[numeric_cols].corr()
+                view = correlation_view.heatmap_view(df, numeric_cols, dataset_fingerprint(df))
+                corr_matrix = view['matrix']
                 im = axes[1, 0].imshow(corr_matrix, cmap='RdBu_r', aspect='auto', vmin=-1, vmax=1)
-                axes[1, 0].set_title('Correlation Matrix Overview', fontsize=12)
+                axes[1, 0].set_title('Correlation Matrix Overview' + correlation_view.title_suffix(view), fontsize=12)
                 axes[1, 0].set_xticks(range(len(corr_matrix.columns)))
                 axes[1, 0].set_yticks(range(len(corr_matrix.columns)))
                 
@@ -1695,12 +1815,13 @@ CSV, Excel (XLS/XLSX) - Up to 50MB
                 axes[1, 0].set_yticklabels(short_cols, fontsize=8)
                 plt.colorbar(im, ax=axes[1, 0], fraction=0.046, pad=0.04)
                 
-                # Add correlation values as text for better readability
-                for i in range(len(corr_matrix.columns)):
-                    for j in range(len(corr_matrix.columns)):
-                        text = axes[1, 0].text(j, i, f'{corr_matrix.iloc[i, j]:.2f}',
-                                             ha="center", va="center", color="white" if abs(corr_matrix.iloc[i, j]) > 0.5 else "black", 
-                                             fontsize=6, weight='bold')
+                # Add correlation values as text for better readability (small matrices only)
+                if view['annotate']:
+                    for i in range(len(corr_matrix.columns)):
+                        for j in range(len(corr_matrix.columns)):
+                            text = axes[1, 0].text(j, i, f'{corr_matrix.iloc[i, j]:.2f}',
+                                                 ha="center", va="center", color="white" if abs(corr_matrix.iloc[i, j]) > 0.5 else "black", 
+                                                 fontsize=6, weight='bold')
             
             # Chart 4: Summary statistics
             if len(numeric_cols) >= 1:
@@ -0,0 +1,96 @@
+"""
+========================================================================
+                    chart_factory.py - בניית תרשימי פיזור וקו
+========================================================================
+נקודת כניסה אחת לתרשימי הנקודות והקווים של האפליקציה: מעל סף נקודות
+התרשים עובר לרינדור WebGL (Scattergl) במקום SVG, ובסדרות גדולות הסמנים
+מוקטנים, קווי המתאר שלהם מוסרים והריחוף מצומצם לערכי הצירים בלבד - כך
+שציור, זום והזזה בדפדפן נשארים חלקים גם במאות אלפי נקודות.
+"""
+
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Traces with more points than this are drawn with WebGL
+WEBGL_POINT_THRESHOLD = 1000
+
+# Series with more points than this get small, outline-free markers and minimal hover
+BIG_SERIES_POINTS = 20000
+
+BIG_MARKER_SIZE = 3
+
+
+def _count(values):
+    return 0 if values is None else len(values)
+
+
+def render_mode(n_points):
+    """'webgl' above the point threshold, 'svg' below it"""
+    return 'webgl' if n_points > WEBGL_POINT_THRESHOLD else 'svg'
+
+
+def simplify(fig):
+    """
+    Lighter markers and hover for the big point traces of a figure.
+
+    Markers lose their outline and shrink, and per-point hover text and
+    custom data are dropped (templates that used them fall back to the
+    axis values), which removes most of the per-point work the browser
+    does when drawing and hovering.
+    """
+    for trace in fig.data:
+        if trace.type not in ('scatter', 'scattergl', 'scatter3d'):
+            continue
+        if max(_count(trace.x), _count(trace.y)) <= BIG_SERIES_POINTS:
+            continue
+        if trace.mode is None or 'markers' in trace.mode:
+            trace.marker.size = BIG_MARKER_SIZE
+            trace.marker.line.width = 0
+        template = trace.hovertemplate or ''
+        if any(field in template for field in ('%{text}', '%{hovertext}', '%{customdata')):
+            axes = 'xyz' if trace.type == 'scatter3d' else 'xy'
+            trace.hovertemplate = '<br>'.join(f'{axis}=%{{{axis}}}' for axis in axes) + '<extra></extra>'
+        trace.text = None
+        trace.hovertext = None
+        trace.customdata = None
+    return fig
+
+
+def scatter(data_frame, **kwargs):
+    """px.scatter with WebGL above the threshold and big-series simplifications"""
+    kwargs.setdefault('render_mode', render_mode(len(data_frame)))
+    return simplify(px.scatter(data_frame, **kwargs))
+
+
+def line(data_frame=None, **kwargs):
+    """px.line with WebGL above the threshold and big-series simplifications"""
+    n_points = len(data_frame) if data_frame is not None else _count(kwargs.get('x', kwargs.get('y')))
+    kwargs.setdefault('render_mode', render_mode(n_points))
+    return simplify(px.line(data_frame, **kwargs))
+
+
+def area(data_frame, **kwargs):
+    """
+    px.area; stacked fills have no WebGL counterpart, so only the
+    big-series simplifications apply (callers reduce the points first).
+    """
+    return simplify(px.area(data_frame, **kwargs))
+
+
+def trace(x, y, **kwargs):
+    """go.Scattergl above the threshold, go.Scatter below it"""
+    trace_type = go.Scattergl if max(_count(x), _count(y)) > WEBGL_POINT_THRESHOLD else go.Scatter
+    return trace_type(x=x, y=y, **kwargs)
+
+
+def trace3d(x, y, z, labels=None, extra=None, **kwargs):
+    """
+    go.Scatter3d (always WebGL) with a hover template built from the axis
+    labels and any per-trace constants in ``extra`` (label -> value), so no
+    per-point hover text has to be sent to the browser.
+    """
+    if labels is not None:
+        lines = [f'{label}: %{{{axis}}}' for label, axis in zip(labels, 'xyz')]
+        lines += [f'{label}: {value}' for label, value in (extra or {}).items()]
+        kwargs.setdefault('hovertemplate', '<br>'.join(lines) + '<extra></extra>')
+    return go.Scatter3d(x=x, y=y, z=z, **kwargs)
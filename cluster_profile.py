@@ -0,0 +1,89 @@
+"""
+========================================================================
+                    cluster_profile.py - פרופיל אשכולות וקטורי
+========================================================================
+פרופיל מלא של כל האשכולות במעבר מקובץ אחד על הנתונים: גודל ושיעור כל
+אשכול, מרכזים ביחידות המקוריות, סטיית כל משתנה מהממוצע הכללי ביחידות
+סטיית תקן (z-score) והמשתנים שמבדילים כל אשכול מהשאר - במקום סינון
+בוליאני נפרד לכל אשכול.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Distinguishing features listed per cluster
+TOP_FEATURES = 3
+
+# Smallest deviation (in global standard deviations) worth reporting
+MIN_DEVIATION = 0.25
+
+
+class ClusterProfile:
+    """Per-cluster sizes, centroids and deviations from the global mean"""
+
+    def __init__(self, sizes, centroids, global_mean, global_std):
+        self.sizes = sizes                  # cluster -> number of rows
+        self.centroids = centroids          # cluster x feature means, original units
+        self.global_mean = global_mean
+        self.global_std = global_std
+        self.n_rows = int(sizes.sum())
+        # Deviation of every cluster mean from the global mean, in global standard deviations
+        self.z_scores = (centroids - global_mean) / global_std.replace(0, np.nan)
+
+    @property
+    def clusters(self):
+        return self.sizes.index.tolist()
+
+    @property
+    def shares(self):
+        """Cluster sizes as a percentage of all rows"""
+        return self.sizes / self.n_rows * 100
+
+    def pct_differences(self):
+        """Cluster means relative to the global mean, in percent (NaN where the global mean is 0)"""
+        base = self.global_mean.abs().replace(0, np.nan)
+        return (self.centroids - self.global_mean) / base * 100
+
+    def top_features(self, cluster, n=TOP_FEATURES, min_deviation=MIN_DEVIATION):
+        """(feature, z-score) pairs of the features that set a cluster apart, strongest first"""
+        z = self.z_scores.loc[cluster].dropna()
+        z = z[z.abs() >= min_deviation]
+        order = z.abs().sort_values(ascending=False, kind='stable').index[:n]
+        return [(feature, float(z[feature])) for feature in order]
+
+    def summary(self):
+        """One row per cluster: size, share and centroid"""
+        table = self.centroids.copy()
+        table.insert(0, 'Share %', self.shares.round(1))
+        table.insert(0, 'Size', self.sizes)
+        table.index.name = 'Cluster'
+        return table
+
+
+def profile_clusters(X, labels):
+    """
+    Profile every cluster in one grouped pass over the data.
+
+    ``X`` holds the features in original units (DataFrame or array) and
+    ``labels`` the cluster of every row. Counts, means and within-cluster
+    variances come from a single groupby; the global mean and standard
+    deviation are then combined from the per-cluster results, so no
+    further pass over the rows is needed.
+    """
+    frame = X if isinstance(X, pd.DataFrame) else pd.DataFrame(np.asarray(X))
+    grouped = frame.groupby(np.asarray(labels), sort=True).agg(['count', 'mean', 'var'])
+
+    counts = grouped.xs('count', axis=1, level=1)
+    means = grouped.xs('mean', axis=1, level=1)
+    # Single-row clusters have no variance of their own
+    m2 = grouped.xs('var', axis=1, level=1).fillna(0) * (counts - 1)
+
+    sizes = counts.max(axis=1).astype(int)
+    total = counts.sum()
+    global_mean = (means * counts).sum() / total
+    # Parallel variance: within-cluster spread plus spread of the cluster means
+    global_m2 = m2.sum() + (counts * (means - global_mean) ** 2).sum()
+    global_std = np.sqrt(global_m2 / (total - 1).clip(lower=1))
+
+    sizes.index.name = means.index.name = None
+    return ClusterProfile(sizes, means, global_mean, global_std)
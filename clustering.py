@@ -0,0 +1,147 @@
+"""
+========================================================================
+                    clustering.py - בחירת K ואשכולות בקנה מידה גדול
+========================================================================
+K-Means שמתאים גם למיליוני שורות: מעל סף שורות משתמשים ב-MiniBatchKMeans
+עם אתחול חם מהמרכזים של ה-k הקודם, ציון ה-silhouette מחושב על מדגם
+מרובד בגודל קבוע (במקום O(n²) על כל הנתונים), וערכי ה-k נבדקים במקביל.
+"""
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+# Above this many rows clustering switches to MiniBatchKMeans
+SCALABLE_ROW_THRESHOLD = 20000
+
+# Fixed number of rows the silhouette score is computed on
+SILHOUETTE_SAMPLE_SIZE = 5000
+
+MINI_BATCH_SIZE = 4096
+
+# MiniBatchKMeans is fitted on at most this many rows, then labels every row
+FIT_SAMPLE_SIZE = 100000
+
+
+def is_large(X):
+    return len(X) > SCALABLE_ROW_THRESHOLD
+
+
+def fit_kmeans(X, n_clusters, random_state=42, init=None):
+    """
+    KMeans for small data, MiniBatchKMeans (optionally warm-started) above
+    the row threshold. Very large data is fitted on a random subset of
+    FIT_SAMPLE_SIZE rows and every row is then assigned to a centroid.
+    """
+    if not is_large(X):
+        model = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10)
+    elif init is not None:
+        model = MiniBatchKMeans(n_clusters=n_clusters, init=init, n_init=1,
+                                batch_size=MINI_BATCH_SIZE, random_state=random_state)
+    else:
+        model = MiniBatchKMeans(n_clusters=n_clusters, n_init=3,
+                                batch_size=MINI_BATCH_SIZE, random_state=random_state)
+    if is_large(X) and len(X) > FIT_SAMPLE_SIZE:
+        rng = np.random.default_rng(random_state)
+        model.fit(X[rng.choice(len(X), size=FIT_SAMPLE_SIZE, replace=False)])
+        labels = model.predict(X)
+    else:
+        labels = model.fit_predict(X)
+    return model, labels
+
+
+def stratified_sample(labels, sample_size, random_state=42):
+    """Row indices sampled from every cluster in proportion to its size"""
+    n_rows = len(labels)
+    if n_rows <= sample_size:
+        return np.arange(n_rows)
+    rng = np.random.default_rng(random_state)
+    clusters, counts = np.unique(labels, return_counts=True)
+    # At least two rows per cluster so each one has a defined silhouette
+    quotas = np.maximum(np.round(counts * sample_size / n_rows).astype(int), np.minimum(counts, 2))
+    picked = [
+        rng.choice(np.flatnonzero(labels == cluster), size=quota, replace=False)
+        for cluster, quota in zip(clusters, quotas)
+    ]
+    return np.sort(np.concatenate(picked))
+
+
+def sampled_silhouette(X, labels, sample_size=SILHOUETTE_SAMPLE_SIZE, random_state=42):
+    """Silhouette score on a fixed-size stratified sample (exact when the data is smaller)"""
+    rows = stratified_sample(labels, sample_size, random_state)
+    return silhouette_score(X[rows], labels[rows])
+
+
+def _warm_start_centers(X, centers, random_state):
+    """Previous centroids plus the sampled point farthest from all of them"""
+    rng = np.random.default_rng(random_state)
+    candidates = X[rng.choice(len(X), size=min(len(X), SILHOUETTE_SAMPLE_SIZE), replace=False)]
+    distances = ((candidates[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+    return np.vstack([centers, candidates[np.argmax(distances)]])
+
+
+def _score(X, labels, random_state):
+    try:
+        return sampled_silhouette(X, labels, random_state=random_state)
+    except ValueError:
+        return None
+
+
+def _fit_and_score(X, k, random_state):
+    try:
+        model, labels = fit_kmeans(X, k, random_state)
+    except ValueError:
+        return None
+    score = _score(X, labels, random_state)
+    return None if score is None else (model, labels, score)
+
+
+def select_k(X, k_values, random_state=42, n_jobs=-1):
+    """
+    Pick the number of clusters with the best silhouette score.
+
+    Small data fits a full KMeans per k, with the k values evaluated in
+    parallel. Above SCALABLE_ROW_THRESHOLD the MiniBatchKMeans fits run in
+    order of k, each warm-started from the previous k's centroids, and the
+    sampled silhouette scores are then computed in parallel.
+
+    Returns a dict with best_k, best_score, model, labels and the list of
+    (k, score) pairs. The sweep stops at the first k that cannot be fitted.
+    """
+    X = np.asarray(X)
+    k_values = list(k_values)
+    parallel = Parallel(n_jobs=n_jobs, prefer='threads')
+
+    if not is_large(X):
+        fitted = parallel(delayed(_fit_and_score)(X, k, random_state) for k in k_values)
+    else:
+        fits = []
+        centers = None
+        for k in k_values:
+            init = None if centers is None else _warm_start_centers(X, centers, random_state)
+            try:
+                model, labels = fit_kmeans(X, k, random_state, init=init)
+            except ValueError:
+                break
+            fits.append((model, labels))
+            centers = model.cluster_centers_
+        scores = parallel(delayed(_score)(X, labels, random_state) for _, labels in fits)
+        fitted = [None if score is None else (model, labels, score)
+                  for (model, labels), score in zip(fits, scores)]
+
+    best = None
+    scores = []
+    for k, result in zip(k_values, fitted):
+        if result is None:
+            break
+        model, labels, score = result
+        scores.append((k, score))
+        if best is None or score > best['best_score']:
+            best = {'best_k': k, 'best_score': score, 'model': model, 'labels': labels}
+
+    if best is None:
+        model, labels = fit_kmeans(X, 2, random_state)
+        best = {'best_k': 2, 'best_score': -1, 'model': model, 'labels': labels}
+    best['scores'] = scores
+    return best
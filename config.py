@@ -9,6 +9,9 @@ TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 if TELEGRAM_TOKEN in (None, '', 'your_bot_token_here'):
     TELEGRAM_TOKEN = None
 
+# Saved models (fitted pipelines + metadata) for batch scoring
+MODEL_REGISTRY_DIR = os.getenv('MODEL_REGISTRY_DIR', 'saved_models')
+
 # Streamlit Configuration
 PAGE_TITLE = "DataBot Analytics"
 PAGE_ICON = "📊"
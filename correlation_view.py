@@ -0,0 +1,162 @@
+"""
+========================================================================
+                    correlation_view.py - מפות חום לנתונים רחבים
+========================================================================
+מפת חום של מתאמים שנשארת קריאה ומהירה גם במאות עמודות: המשתנים מסודרים
+לפי אשכולות היררכיים כך שבלוקים של משתנים מתואמים יושבים זה ליד זה,
+בנתונים רחבים מוצגים רק המשתנים המתואמים ביותר, וערכי התאים נכתבים רק
+כשהמטריצה קטנה. המטריצה והסדר נשמרים במטמון לפי גרסת הנתונים.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import leaves_list, linkage
+from scipy.spatial.distance import squareform
+
+from ml_cache import MLResultCache, make_key
+
+# Variables drawn in one heatmap at most; wider data keeps the most correlated ones
+MAX_HEATMAP_COLUMNS = 40
+
+# Up to this many variables every cell gets its value written on it
+ANNOTATION_LIMIT = 15
+
+# Wide data (more variables than MAX_HEATMAP_COLUMNS) is correlated on at most this many rows
+CORR_SAMPLE_ROWS = 50000
+
+# Orderings and matrices per (dataset version, columns, settings)
+_CACHE = MLResultCache(max_bytes=64 * 1024 ** 2)
+
+
+def pairwise_complete_corr(values):
+    """
+    Pearson correlations of the columns of ``values`` over the rows where
+    both columns are present (what pandas' ``DataFrame.corr`` computes).
+
+    Missing cells are zeroed, so the cross products of every pair come from
+    one BLAS product; the per-pair counts, sums and sums of squares are the
+    column totals minus products with the missing-value mask, taken only
+    over the columns that have gaps.
+    """
+    missing = np.isnan(values)
+    n_rows, n_cols = values.shape
+    n_missing = missing.sum(axis=0)
+    present = n_rows - n_missing
+    # Centering on the column means keeps the sums of squares well conditioned
+    means = np.nansum(values, axis=0) / np.maximum(present, 1)
+    centered = np.where(missing, 0.0, values - means)
+    squares = centered ** 2
+
+    gaps = np.flatnonzero(n_missing)
+    mask = missing[:, gaps].astype('float64')
+    both_missing = np.zeros((n_cols, n_cols))
+    both_missing[np.ix_(gaps, gaps)] = mask.T @ mask
+    # missing_sums[j, i]: sum of column i over the rows where column j is missing
+    missing_sums = np.zeros((n_cols, n_cols))
+    missing_sums[gaps] = mask.T @ centered
+    missing_squares = np.zeros((n_cols, n_cols))
+    missing_squares[gaps] = mask.T @ squares
+
+    counts = n_rows - n_missing[:, None] - n_missing[None, :] + both_missing
+    # sums[i, j]: sum of column i over the rows where column j is present
+    sums = centered.sum(axis=0)[:, None] - missing_sums.T
+    sum_squares = squares.sum(axis=0)[:, None] - missing_squares.T
+    products = centered.T @ centered
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = products - sums * sums.T / counts
+        var = sum_squares - sums ** 2 / counts
+        corr = cov / np.sqrt(var * var.T)
+    defined = (counts >= 2) & (var > 0) & (var.T > 0)
+    corr = np.where(defined, np.clip(corr, -1, 1), np.nan)
+    diagonal = np.diag_indices_from(corr)
+    corr[diagonal] = np.where(defined[diagonal], 1.0, np.nan)
+    return corr
+
+
+def correlation_matrix(df, columns, random_state=42):
+    """
+    Pearson correlations of ``columns``.
+
+    Complete data goes through one BLAS product (np.corrcoef); data with
+    missing values gets pairwise-complete correlations from masked
+    products (pairwise_complete_corr). Wide data is correlated on a
+    uniform row sample.
+    """
+    frame = df[list(columns)]
+    if len(frame.columns) > MAX_HEATMAP_COLUMNS and len(frame) > CORR_SAMPLE_ROWS:
+        rng = np.random.default_rng(random_state)
+        frame = frame.iloc[np.sort(rng.choice(len(frame), size=CORR_SAMPLE_ROWS, replace=False))]
+    values = frame.to_numpy(dtype='float64', na_value=np.nan)
+    if np.isnan(values).any():
+        corr = pairwise_complete_corr(values)
+    else:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = np.corrcoef(values, rowvar=False)
+    return pd.DataFrame(np.atleast_2d(corr), index=frame.columns, columns=frame.columns)
+
+
+def cluster_order(corr):
+    """Column order from average-linkage clustering on 1 - |r|, so correlated blocks sit together"""
+    if len(corr) < 3:
+        return list(corr.columns)
+    distance = 1 - np.abs(np.nan_to_num(corr.to_numpy()))
+    np.fill_diagonal(distance, 0)
+    distance = np.clip((distance + distance.T) / 2, 0, None)
+    tree = linkage(squareform(distance, checks=False), method='average')
+    return [corr.columns[i] for i in leaves_list(tree)]
+
+
+def top_correlated(corr, n):
+    """The ``n`` variables with the strongest correlation to any other variable"""
+    strength = np.abs(np.nan_to_num(corr.to_numpy()))
+    np.fill_diagonal(strength, 0)
+    order = np.argsort(-strength.max(axis=1), kind='stable')[:n]
+    return [corr.columns[i] for i in sorted(order)]
+
+
+def strong_pairs(corr, threshold=0.7):
+    """(var1, var2, r) for every pair with |r| above the threshold, strongest first"""
+    values = corr.to_numpy()
+    rows, cols = np.triu_indices(len(values), k=1)
+    r = values[rows, cols]
+    hits = np.flatnonzero(np.abs(np.nan_to_num(r)) > threshold)
+    hits = hits[np.argsort(-np.abs(r[hits]), kind='stable')]
+    return [(corr.columns[rows[i]], corr.columns[cols[i]], float(r[i])) for i in hits]
+
+
+def heatmap_view(df, columns, version=None, max_columns=MAX_HEATMAP_COLUMNS):
+    """
+    What a correlation heatmap should draw.
+
+    Returns a dict with the full matrix ``corr``, the ``matrix`` to draw
+    (at most ``max_columns`` of the most correlated variables, reordered by
+    hierarchical clustering), ``annotate`` (whether per-cell values fit)
+    and ``n_total``. With ``version`` set the result is cached.
+    """
+    columns = list(columns)
+    key = None
+    if version is not None:
+        key = make_key(version, 'correlation_view', columns, {'max_columns': max_columns})
+        view = _CACHE.get(key)
+        if view is not None:
+            return view
+
+    corr = correlation_matrix(df, columns)
+    shown = top_correlated(corr, max_columns) if len(columns) > max_columns else columns
+    ordered = cluster_order(corr.loc[shown, shown])
+    view = {
+        'corr': corr,
+        'matrix': corr.loc[ordered, ordered],
+        'annotate': len(ordered) <= ANNOTATION_LIMIT,
+        'n_total': len(columns),
+    }
+    if key is not None:
+        _CACHE.put(key, view)
+    return view
+
+
+def title_suffix(view):
+    """' (top N of M variables)' when the heatmap shows a subset, else ''"""
+    shown = len(view['matrix'])
+    return f" (top {shown} of {view['n_total']} variables)" if shown < view['n_total'] else ""
@@ -0,0 +1,111 @@
+"""
+========================================================================
+                    dataset_store.py - מאגר נתונים משותף בין סשנים
+========================================================================
+מאגר ברמת התהליך שמחזיק כל מסגרת נתונים פעם אחת, לפי טביעת האצבע של
+התוכן שלה, עם מונה הפניות. סשן שטוען נתונים מקבל ידית (handle) למסגרת
+המשותפת במקום עותק משלו, כך שעשרים אנליסטים שפותחים את אותו קובץ מחזיקים
+עותק אחד בזיכרון. המסגרת המשותפת לא משתנה במקומה: ניקוי או שינוי יוצרים
+מסגרת חדשה שנרשמת כרשומה נפרדת (copy-on-write), והרשומה הישנה משוחררת
+כשאף סשן כבר לא מחזיק בה.
+"""
+
+import threading
+import weakref
+
+from utils import dataset_fingerprint
+
+
+class _Entry:
+    """A shared frame and the number of live handles to it"""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.refs = 0
+
+
+class DatasetHandle:
+    """
+    A session's reference to a shared frame.
+
+    The frame is shared with every other session holding the same content
+    and must be treated as read-only: operations that change data return a
+    new frame, which is stored under its own fingerprint. The reference is
+    released by ``release()`` or, at the latest, when the handle is garbage
+    collected (for example when its session ends).
+    """
+
+    def __init__(self, store, key, frame):
+        self.key = key
+        self.frame = frame
+        self._finalizer = weakref.finalize(self, store._release, key)
+
+    def release(self):
+        """Drop this handle's reference; calling it again does nothing"""
+        self._finalizer()
+
+    @property
+    def released(self):
+        return not self._finalizer.alive
+
+
+class DatasetStore:
+    """Thread-safe, reference-counted frames keyed by content fingerprint"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, df):
+        """
+        A handle to the shared frame with the contents of ``df``.
+
+        When an equal frame is already stored, the handle points at that
+        frame and ``df`` can be dropped by the caller; otherwise ``df``
+        itself becomes the shared frame.
+        """
+        key = dataset_fingerprint(df)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(df)
+            entry.refs += 1
+            return DatasetHandle(self, key, entry.frame)
+
+    def _release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs <= 0:
+                del self._entries[key]
+
+    def refs(self, key):
+        """Live handles to a stored frame (0 when it is not stored)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.refs if entry is not None else 0
+
+    def stats(self):
+        """Distinct frames, live handles and the bytes held by the stored frames"""
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            'datasets': len(entries),
+            'handles': sum(entry.refs for entry in entries),
+            'bytes': sum(int(entry.frame.memory_usage(index=True, deep=False).sum()) for entry in entries),
+        }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def default_store():
+    """The process-wide store, shared by every session"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DatasetStore()
+        return _store
@@ -0,0 +1,120 @@
+"""
+========================================================================
+                    dataset_versions.py - היסטוריית גרסאות לנתונים
+========================================================================
+מיכל גרסאות לנתוני הסשן: כל שלב ניקוי (הסרת כפילויות, מילוי ערכים
+חסרים) נרשם כגרסה חדשה במקום לדרוס את הקודמת, וביטול/חזרה (undo/redo)
+רק מזיזים מצביע בין הגרסאות. בעזרת Copy-on-Write של pandas גרסה חדשה
+חולקת עם הקודמת את כל העמודות שהשלב לא שינה, כך שתמונת מצב עולה בערך את
+העמודות שהשתנו בלבד. מזהה הגרסה הוא טביעת האצבע של הנתונים, ולכן גם
+מפתחות המטמון של הניתוחים עוקבים אחרי הגרסה: חזרה לגרסה קודמת מוצאת את
+התוצאות שכבר חושבו עבורה.
+"""
+
+import numpy as np
+
+from utils import dataset_fingerprint
+
+# Versions kept per dataset; the oldest snapshots are dropped beyond this
+MAX_VERSIONS = 20
+
+
+def _buffers(series):
+    """
+    The memory behind a column: its numpy arrays, or (address, size) ranges
+    of its Arrow buffers. ``to_numpy`` cannot be used, as it builds a new
+    array for string and other extension columns.
+    """
+    array = series.array
+    chunked = getattr(array, '_pa_array', None)
+    if chunked is not None:
+        return [(buf.address, buf.size) for chunk in chunked.chunks
+                for buf in chunk.buffers() if buf is not None and buf.size > 0]
+    # numpy-backed (_ndarray, also codes of categoricals) and masked (_data) arrays
+    arrays = [getattr(array, name, None) for name in ('_ndarray', '_data')]
+    return [values for values in arrays if isinstance(values, np.ndarray)]
+
+
+def _share_memory(a, b):
+    if a is b:
+        return True
+    buffers_a, buffers_b = _buffers(a), _buffers(b)
+    for x in buffers_a:
+        for y in buffers_b:
+            if isinstance(x, np.ndarray) and isinstance(y, np.ndarray):
+                if np.shares_memory(x, y):
+                    return True
+            elif isinstance(x, tuple) and isinstance(y, tuple):
+                if x[0] < y[0] + y[1] and y[0] < x[0] + x[1]:
+                    return True
+    return False
+
+
+def shared_columns(previous, frame):
+    """Columns of ``frame`` whose data buffer is shared with the same column of ``previous``"""
+    return [col for col in frame.columns
+            if col in previous.columns and _share_memory(previous[col], frame[col])]
+
+
+class DatasetVersion:
+    """One snapshot of the data and the step that produced it"""
+
+    def __init__(self, frame, step, parent=None):
+        self.frame = frame
+        self.step = step
+        self.id = dataset_fingerprint(frame)
+        # Only the parent's id is kept, so trimmed snapshots can be freed
+        self.parent_id = parent.id if parent is not None else None
+        self.shared = shared_columns(parent.frame, frame) if parent is not None else []
+
+
+class VersionedDataset:
+    """
+    A linear history of dataset versions with a cursor.
+
+    ``commit`` adds a version after the current one (dropping any versions
+    that were undone), ``undo`` and ``redo`` move the cursor. Versions hold
+    their frames, so moving the cursor never recomputes or copies data.
+    """
+
+    def __init__(self, frame, step="Original", max_versions=MAX_VERSIONS):
+        self.max_versions = max_versions
+        self._versions = [DatasetVersion(frame, step)]
+        self._cursor = 0
+
+    @property
+    def current(self):
+        return self._versions[self._cursor]
+
+    @property
+    def can_undo(self):
+        return self._cursor > 0
+
+    @property
+    def can_redo(self):
+        return self._cursor < len(self._versions) - 1
+
+    def commit(self, frame, step):
+        """Record ``frame`` as the result of ``step`` on the current version"""
+        del self._versions[self._cursor + 1:]
+        self._versions.append(DatasetVersion(frame, step, parent=self.current))
+        if len(self._versions) > self.max_versions:
+            del self._versions[:len(self._versions) - self.max_versions]
+        self._cursor = len(self._versions) - 1
+        return self.current
+
+    def undo(self):
+        """Step back one version; returns the new current version"""
+        if self.can_undo:
+            self._cursor -= 1
+        return self.current
+
+    def redo(self):
+        """Step forward to a version that was undone; returns the new current version"""
+        if self.can_redo:
+            self._cursor += 1
+        return self.current
+
+    def history(self):
+        """(version, is_current) from the oldest kept version to the newest"""
+        return [(version, i == self._cursor) for i, version in enumerate(self._versions)]
@@ -0,0 +1,175 @@
+"""
+========================================================================
+                    distributions.py - סיכומי התפלגות לתרשימים
+========================================================================
+חישוב היסטוגרמות (בעזרת numpy) וסטטיסטיקות Box Plot (רבעונים, שפמים
+ומדגם מוגבל של ערכים חריגים) בצד השרת, ובניית תרשימי Plotly מהסיכומים.
+התרשים מקבל עשרות מספרים במקום העמודה המלאה, כך שגודל ה-JSON וזמן
+הרינדור ב-Kaleido אינם תלויים במספר השורות. הסיכומים נשמרים במטמון לפי
+גרסת הנתונים והעמודה.
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+
+from ml_cache import MLResultCache, make_key
+
+DEFAULT_BINS = 30
+
+# Outlier points drawn per box at most (the most extreme ones on each side)
+MAX_OUTLIER_POINTS = 200
+
+# Tukey fences: whiskers reach the furthest values within IQR_FACTOR * IQR of the box
+IQR_FACTOR = 1.5
+
+# Summaries per (dataset version, column, settings)
+_CACHE = MLResultCache(max_bytes=32 * 1024 ** 2)
+
+
+def _finite(values):
+    values = np.asarray(values, dtype='float64')
+    return values[np.isfinite(values)]
+
+
+class HistogramSummary:
+    """Bin counts over equal-width bins: ``edges`` has one more entry than ``counts``"""
+
+    def __init__(self, counts, edges):
+        self.counts = counts
+        self.edges = edges
+
+    @property
+    def centers(self):
+        return (self.edges[:-1] + self.edges[1:]) / 2
+
+    @property
+    def widths(self):
+        return np.diff(self.edges)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+
+class BoxSummary:
+    """Quartiles, whiskers, mean and a capped sample of the outliers of one column"""
+
+    def __init__(self, n, q1, median, q3, lower, upper, mean, outliers, n_outliers):
+        self.n = n
+        self.q1, self.median, self.q3 = q1, median, q3
+        self.lower, self.upper = lower, upper       # whisker ends
+        self.mean = mean
+        self.outliers = outliers                    # at most MAX_OUTLIER_POINTS values
+        self.n_outliers = n_outliers                # all values beyond the whiskers
+
+
+def histogram_summary(values, bins=DEFAULT_BINS, value_range=None):
+    """Equal-width histogram of the finite values, over ``value_range`` when given"""
+    values = _finite(values)
+    if values.size == 0:
+        return HistogramSummary(np.zeros(0, dtype=np.int64), np.zeros(1))
+    counts, edges = np.histogram(values, bins=bins, range=value_range)
+    return HistogramSummary(counts, edges)
+
+
+def box_summary(values, max_outliers=MAX_OUTLIER_POINTS):
+    """
+    Tukey box statistics of the finite values.
+
+    Quartiles come from one partition-based quantile call. When there are
+    more outliers than ``max_outliers``, the most extreme ones on each side
+    are kept, so the drawn range matches the data.
+    """
+    values = _finite(values)
+    if values.size == 0:
+        return BoxSummary(0, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.zeros(0), 0)
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    low_fence, high_fence = q1 - IQR_FACTOR * iqr, q3 + IQR_FACTOR * iqr
+    within = values[(values >= low_fence) & (values <= high_fence)]
+    low_out = values[values < low_fence]
+    high_out = values[values > high_fence]
+
+    n_outliers = low_out.size + high_out.size
+    half = max_outliers // 2
+    if low_out.size > half:
+        low_out = np.partition(low_out, half)[:half]
+    if high_out.size > max_outliers - low_out.size:
+        keep = max_outliers - low_out.size
+        high_out = np.partition(high_out, high_out.size - keep)[high_out.size - keep:]
+    return BoxSummary(int(values.size), float(q1), float(median), float(q3),
+                      float(within.min()), float(within.max()), float(values.mean()),
+                      np.concatenate([low_out, high_out]), int(n_outliers))
+
+
+def grouped_box_summaries(df, group_col, value_col, max_outliers=MAX_OUTLIER_POINTS):
+    """(group, BoxSummary) per group, in order of first appearance"""
+    grouped = df.groupby(group_col, sort=False, observed=True)[value_col]
+    return [(group, box_summary(values.to_numpy(), max_outliers)) for group, values in grouped]
+
+
+def cached_histogram(version, df, col, bins=DEFAULT_BINS, value_range=None):
+    """histogram_summary of a column, cached per dataset version"""
+    key = make_key(version, 'histogram', [col], {'bins': bins, 'range': value_range})
+    summary = _CACHE.get(key)
+    if summary is None:
+        summary = _CACHE.put(key, histogram_summary(df[col], bins, value_range))
+    return summary
+
+
+def cached_box(version, df, col, group_col=None):
+    """
+    box_summary of a column, or its grouped_box_summaries by ``group_col``,
+    cached per dataset version
+    """
+    key = make_key(version, 'box', [col], {'group': group_col})
+    summary = _CACHE.get(key)
+    if summary is None:
+        if group_col is None:
+            summary = box_summary(df[col])
+        else:
+            summary = grouped_box_summaries(df, group_col, col)
+        summary = _CACHE.put(key, summary)
+    return summary
+
+
+def histogram_trace(summary, name=None, **kwargs):
+    """Bars from a histogram summary, one per bin, touching like a Plotly histogram"""
+    return go.Bar(x=summary.centers, y=summary.counts, width=summary.widths, name=name,
+                  marker_line_width=0, **kwargs)
+
+
+def box_traces(summary, name, color=None, showlegend=True):
+    """
+    A precomputed go.Box plus a marker trace of the sampled outliers,
+    both placed at category ``name``.
+    """
+    name = str(name)
+    marker = dict(color=color) if color is not None else {}
+    box = go.Box(
+        x=[name], q1=[summary.q1], median=[summary.median], q3=[summary.q3],
+        lowerfence=[summary.lower], upperfence=[summary.upper], mean=[summary.mean],
+        name=name, marker=marker, showlegend=showlegend, boxpoints=False,
+    )
+    points = go.Scatter(
+        x=[name] * len(summary.outliers), y=summary.outliers, mode='markers',
+        name=f"{name} outliers", marker=dict(size=4, **marker), showlegend=False,
+    )
+    return [box, points]
+
+
+def histogram_figure(summary, title, x_title, name=None):
+    """A histogram figure built from a summary"""
+    fig = go.Figure(histogram_trace(summary, name=name))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title="count", bargap=0)
+    return fig
+
+
+def box_figure(summaries, title, y_title, x_title=None, colors=None):
+    """A box plot figure from (name, BoxSummary) pairs, one box per pair"""
+    fig = go.Figure()
+    for i, (name, summary) in enumerate(summaries):
+        color = colors[i % len(colors)] if colors else None
+        fig.add_traces(box_traces(summary, name, color=color, showlegend=False))
+    fig.update_layout(title=title, yaxis_title=y_title, xaxis_title=x_title)
+    return fig
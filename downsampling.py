@@ -0,0 +1,162 @@
+"""
+========================================================================
+                    downsampling.py - הקטנת מספר הנקודות בתרשימים
+========================================================================
+שכבת הקטנת נקודות בצד השרת לפני השליחה לדפדפן: LTTB לתרשימי קו (שומר
+על צורת הסדרה, כולל שיאים ושפלים) ודגימה משמרת-צפיפות לתרשימי פיזור -
+כל תא ברשת שיש בו נקודות מקבל לפחות נציג אחד, כך שאזורים דלילים וערכים
+חריגים נשארים גלויים גם כשמיליון שורות מצוירות מכמה אלפי נקודות.
+"""
+
+import numpy as np
+from pandas.api import types as ptypes
+
+# Points a line chart draws per figure before LTTB kicks in
+LINE_POINT_BUDGET = 4000
+
+# Points a scatter plot draws before density-preserving sampling kicks in
+SCATTER_POINT_BUDGET = 5000
+
+# Share of the scatter budget at most spent on one representative per occupied cell
+_CELL_SHARE = 0.5
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Positions of the ``n_out`` points Largest-Triangle-Three-Buckets keeps.
+
+    ``x`` must be sorted. The first and last points are always kept; every
+    bucket in between contributes the point forming the largest triangle
+    with the previously kept point and the next bucket's average, which
+    preserves peaks, dips and the overall shape of the series.
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    sizes = np.maximum(ends - starts, 1)
+    avg_x = np.append(np.add.reduceat(x[:-1], starts) / sizes, x[-1])
+    avg_y = np.append(np.add.reduceat(y[:-1], starts) / sizes, y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = starts[i], max(ends[i], starts[i] + 1)
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[i + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def density_sample_indices(points, n_out, random_state=42):
+    """
+    Positions of at most ``n_out`` rows of ``points`` (n x d, finite values).
+
+    Rows are binned on a regular grid: every occupied cell keeps one random
+    row, so sparse regions and isolated outliers survive, and the rest of
+    the budget is a uniform sample, so dense regions keep their relative
+    density. The extreme row of every axis is always kept to hold the
+    axis ranges.
+    """
+    points = np.asarray(points, dtype='float64')
+    n, dims = points.shape
+    if n <= n_out:
+        return np.arange(n)
+    rng = np.random.default_rng(random_state)
+
+    low, high = points.min(axis=0), points.max(axis=0)
+    span = np.where(high > low, high - low, 1.0)
+    # Coarsen the grid until the per-cell representatives fit their share of the budget
+    bins = max(2, int(np.ceil((n_out * _CELL_SHARE) ** (1 / dims))))
+    order = rng.permutation(n)
+    while True:
+        q = np.minimum(((points - low) / span * bins).astype(np.int64), bins - 1)
+        cells = (q * bins ** np.arange(dims)).sum(axis=1)
+        _, first = np.unique(cells[order], return_index=True)
+        if len(first) <= n_out * _CELL_SHARE or bins <= 2:
+            break
+        bins //= 2
+    representatives = order[first]
+
+    extremes = np.concatenate([points.argmin(axis=0), points.argmax(axis=0)])
+    chosen = np.zeros(n, dtype=bool)
+    chosen[representatives] = True
+    chosen[extremes] = True
+
+    remaining = n_out - int(chosen.sum())
+    if remaining > 0:
+        rest = order[~chosen[order]]
+        chosen[rest[:remaining]] = True
+    return np.flatnonzero(chosen)
+
+
+def _numeric_axis(values):
+    """Float positions for an axis column: numbers as is, datetimes as nanoseconds"""
+    if ptypes.is_datetime64_any_dtype(values.dtype):
+        as_int = values.to_numpy(dtype='datetime64[ns]').view('int64')
+        return (as_int - as_int[0]).astype('float64')
+    if ptypes.is_numeric_dtype(values.dtype) and not ptypes.is_bool_dtype(values.dtype):
+        return values.to_numpy(dtype='float64', na_value=np.nan)
+    return None
+
+
+def reduce_line(df, x, y_cols, budget=LINE_POINT_BUDGET):
+    """
+    Rows of ``df`` a line chart of ``y_cols`` over ``x`` needs, via LTTB.
+
+    ``x`` is a column name or None for the row order. The union of the
+    points LTTB keeps for every series is returned in the original order,
+    so the figure is built exactly as before. Frames within the budget are
+    returned unchanged.
+    """
+    if len(df) <= budget:
+        return df
+    y_cols = list(y_cols)
+    positions = np.arange(len(df), dtype='float64')
+    x_values = _numeric_axis(df[x]) if x is not None else positions
+    # Unsorted or non-numeric x is drawn in row order, so reduce in row order
+    if x_values is None or np.isnan(x_values).any() or (np.diff(x_values) < 0).any():
+        x_values = positions
+
+    per_series = max(3, budget // max(len(y_cols), 1))
+    keep = np.zeros(len(df), dtype=bool)
+    for col in y_cols:
+        y = df[col].to_numpy(dtype='float64', na_value=np.nan)
+        finite = np.flatnonzero(np.isfinite(y))
+        keep[finite[lttb_indices(x_values[finite], y[finite], per_series)]] = True
+    return df.iloc[np.flatnonzero(keep)]
+
+
+def reduce_scatter(df, columns, budget=SCATTER_POINT_BUDGET, keep=None, random_state=42):
+    """
+    Rows of ``df`` a scatter plot of ``columns`` needs, density-preserving.
+
+    Rows missing any plotted value are dropped (they are not drawn anyway).
+    ``keep`` names a boolean column of rows that must stay visible, such as
+    anomalies; they are all kept while they fit in half the budget and are
+    density-sampled themselves beyond that. Frames within the budget are
+    returned unchanged.
+    """
+    if len(df) <= budget:
+        return df
+    points = df[list(columns)].to_numpy(dtype='float64', na_value=np.nan)
+    finite = np.flatnonzero(np.isfinite(points).all(axis=1))
+
+    if keep is None:
+        priority = np.array([], dtype=np.int64)
+    else:
+        flags = df[keep].to_numpy(dtype=bool, na_value=False)[finite]
+        priority = finite[flags]
+        finite = finite[~flags]
+        if len(priority) > budget // 2:
+            priority = priority[density_sample_indices(points[priority], budget // 2, random_state)]
+
+    sampled = finite[density_sample_indices(points[finite], budget - len(priority), random_state)]
+    return df.iloc[np.sort(np.concatenate([priority, sampled]))]
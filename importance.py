@@ -0,0 +1,127 @@
+"""
+========================================================================
+                    importance.py - מנוע חשיבות משתנים
+========================================================================
+חשיבות משתנים מהירה וכנה יותר: המודלים מתאמנים על כל הליבות, קיימת
+אפשרות של Gradient Boosting מבוסס היסטוגרמות לנתונים גדולים, והדירוג
+מחושב כ-permutation importance על סט מבחן שלא שימש לאימון (במקביל).
+התוצאות נשמרות במטמון לפי גרסת הנתונים, המטרה והעמודות.
+"""
+
+import numpy as np
+import pandas as pd
+from joblib import parallel_backend
+from sklearn.ensemble import (
+    ExtraTreesRegressor,
+    GradientBoostingRegressor,
+    HistGradientBoostingRegressor,
+    RandomForestRegressor,
+)
+from sklearn.inspection import permutation_importance
+from sklearn.model_selection import train_test_split
+
+from ml_cache import MLResultCache, make_key
+
+ALGORITHMS = ("Random Forest", "Gradient Boosting", "Extra Trees", "Histogram Gradient Boosting")
+
+# Above this many training rows "Gradient Boosting" runs the histogram-based variant
+HIST_GB_ROW_THRESHOLD = 100000
+
+# Row caps for the training split and the held-out split the permutations run on
+MAX_TRAIN_ROWS = 500000
+MAX_EVAL_ROWS = 20000
+
+# Forests draw at most this many bootstrap rows per tree on large training sets
+FOREST_MAX_SAMPLES = 20000
+
+PERMUTATION_REPEATS = 5
+
+# Importances per (dataset version, target, features, settings), shared by app and bot
+_CACHE = MLResultCache(max_bytes=64 * 1024 ** 2)
+
+
+def _build_model(algorithm, n_estimators, random_state, n_jobs, n_rows):
+    # Large training sets: each tree is grown on a bootstrap subsample
+    forest_kwargs = {}
+    if n_rows > FOREST_MAX_SAMPLES:
+        forest_kwargs = {'bootstrap': True, 'max_samples': FOREST_MAX_SAMPLES}
+    if algorithm == "Random Forest":
+        return RandomForestRegressor(n_estimators=n_estimators, random_state=random_state,
+                                     n_jobs=n_jobs, **forest_kwargs)
+    if algorithm == "Extra Trees":
+        return ExtraTreesRegressor(n_estimators=n_estimators, random_state=random_state,
+                                   n_jobs=n_jobs, **forest_kwargs)
+    if algorithm == "Gradient Boosting":
+        return GradientBoostingRegressor(n_estimators=n_estimators, random_state=random_state)
+    if algorithm == "Histogram Gradient Boosting":
+        return HistGradientBoostingRegressor(max_iter=n_estimators, random_state=random_state)
+    raise ValueError(f"algorithm must be one of {ALGORITHMS}")
+
+
+def compute_importance(X, y, algorithm="Random Forest", n_estimators=100, random_state=42,
+                       test_size=0.25, n_jobs=-1, version=None):
+    """
+    Rank features by permutation importance on a held-out split.
+
+    The model is trained on a train split (all cores for the forests, with
+    per-tree row subsampling on large data) and every feature is permuted
+    on the test split, with the features scored in parallel threads.
+    Impurity importances are reported alongside when the model provides
+    them. With ``version`` set, results are cached per (version, target,
+    features, settings).
+
+    Returns a dict with the algorithm actually used, train and held-out R²,
+    and a DataFrame of importances sorted from most to least important.
+    The fitted forest itself is not kept, since it can be far larger than
+    the rankings it produced.
+    """
+    features = list(X.columns)
+    params = {'target': y.name, 'algorithm': algorithm, 'n_estimators': n_estimators,
+              'random_state': random_state, 'test_size': test_size}
+    key = make_key(version, 'importance', features, params) if version is not None else None
+    if key is not None and key in _CACHE:
+        return _CACHE.get(key)
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state
+    )
+    if len(X_train) > MAX_TRAIN_ROWS:
+        X_train, y_train = X_train.iloc[:MAX_TRAIN_ROWS], y_train.iloc[:MAX_TRAIN_ROWS]
+    if len(X_test) > MAX_EVAL_ROWS:
+        X_test, y_test = X_test.iloc[:MAX_EVAL_ROWS], y_test.iloc[:MAX_EVAL_ROWS]
+
+    used = algorithm
+    if algorithm == "Gradient Boosting" and len(X_train) > HIST_GB_ROW_THRESHOLD:
+        used = "Histogram Gradient Boosting"
+    model = _build_model(used, n_estimators, random_state, n_jobs, len(X_train))
+    model.fit(X_train, y_train)
+
+    with parallel_backend('threading', n_jobs=n_jobs):
+        permuted = permutation_importance(
+            model, X_test, y_test, n_repeats=PERMUTATION_REPEATS,
+            random_state=random_state, n_jobs=n_jobs
+        )
+
+    scores = np.clip(permuted.importances_mean, 0, None)
+    total = scores.sum()
+    table = pd.DataFrame({
+        'Feature': features,
+        'Importance': permuted.importances_mean,
+        'Importance_Std': permuted.importances_std,
+        'Importance_Pct': scores / total * 100 if total > 0 else np.zeros(len(features)),
+    })
+    if hasattr(model, 'feature_importances_'):
+        table['Impurity_Importance'] = model.feature_importances_
+    table = table.sort_values('Importance', ascending=False, kind='stable').reset_index(drop=True)
+
+    result = {
+        'algorithm': used,
+        'train_r2': model.score(X_train.iloc[:MAX_EVAL_ROWS], y_train.iloc[:MAX_EVAL_ROWS]),
+        'test_r2': model.score(X_test, y_test),
+        'n_train': len(X_train),
+        'n_test': len(X_test),
+        'importances': table,
+    }
+    if key is not None:
+        _CACHE.put(key, result)
+    return result
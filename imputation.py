@@ -0,0 +1,168 @@
+"""
+========================================================================
+                    imputation.py - מנוע מילוי ערכים חסרים וקטורי
+========================================================================
+מילוי ערכים חסרים לכל העמודות בבת אחת: ערכי המילוי מחושבים באגרגציה אחת
+לכל משפחת טיפוסים, והמילוי עצמו מתבצע ברמת הבלוקים (Copy-on-Write) כך
+שעמודות ללא ערכים חסרים משותפות עם מסגרת המקור ואינן מועתקות.
+תומך גם במילוי לפי קבוצות (למשל חציון לכל Region).
+"""
+
+import pandas as pd
+from pandas.api import types as ptypes
+
+# Fallback value for text columns that have no observed values at all
+UNKNOWN_LABEL = 'Unknown'
+
+NUMERIC_STRATEGIES = ('median', 'mean')
+
+
+def _split_columns(df, columns):
+    """Split columns into numeric, datetime and categorical families"""
+    numeric, datetimes, categorical = [], [], []
+    for col in columns:
+        dtype = df[col].dtype
+        if ptypes.is_bool_dtype(dtype):
+            categorical.append(col)
+        elif ptypes.is_numeric_dtype(dtype):
+            numeric.append(col)
+        elif ptypes.is_datetime64_any_dtype(dtype) or ptypes.is_timedelta64_dtype(dtype):
+            datetimes.append(col)
+        else:
+            categorical.append(col)
+    return numeric, datetimes, categorical
+
+
+def _cast_for_column(value, dtype):
+    """Round fill values for integer columns so nullable Int dtypes accept them"""
+    if pd.isna(value):
+        return value
+    if ptypes.is_integer_dtype(dtype):
+        return int(round(float(value)))
+    return value
+
+
+def _holds_label(dtype):
+    """Whether a column of ``dtype`` can take UNKNOWN_LABEL (text and categorical columns)"""
+    return (ptypes.is_object_dtype(dtype) or ptypes.is_string_dtype(dtype)
+            or isinstance(dtype, pd.CategoricalDtype))
+
+
+def _add_fill_categories(out, fill_values):
+    """Add fill values that are not yet categories of their categorical columns"""
+    for col, value in fill_values.items():
+        dtype = out[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype) and value not in dtype.categories:
+            out[col] = out[col].cat.add_categories([value])
+    return out
+
+
+def _column_mode(series):
+    """Most frequent non-missing value of a column, or None if it is empty"""
+    counts = series.value_counts(dropna=True, sort=False)
+    # Categorical columns also list categories that never occur
+    counts = counts[counts > 0]
+    if counts.empty:
+        return None
+    return counts.idxmax()
+
+
+def compute_fill_values(df, numeric_strategy='median', columns=None):
+    """Compute one fill value per column that has missing values"""
+    if numeric_strategy not in NUMERIC_STRATEGIES:
+        raise ValueError(f"numeric_strategy must be one of {NUMERIC_STRATEGIES}")
+
+    if columns is None:
+        missing = df.isna().any()
+        columns = missing.index[missing.values].tolist()
+    numeric, datetimes, categorical = _split_columns(df, columns)
+
+    fill_values = {}
+    if numeric:
+        # One aggregation over all numeric columns
+        stats = df[numeric].agg(numeric_strategy)
+        for col in numeric:
+            fill_values[col] = _cast_for_column(stats[col], df[col].dtype)
+    if datetimes:
+        stats = df[datetimes].median()
+        fill_values.update(stats.to_dict())
+    for col in categorical:
+        mode_val = _column_mode(df[col])
+        if mode_val is not None:
+            fill_values[col] = mode_val
+        elif _holds_label(df[col].dtype):
+            # Boolean and other typed columns cannot take the label and stay empty
+            fill_values[col] = UNKNOWN_LABEL
+
+    # Columns that are entirely empty have no statistic to fill with
+    return {col: val for col, val in fill_values.items() if not pd.isna(val)}
+
+
+def _group_fill(df, out, group_by, columns, numeric_strategy):
+    """Fill columns in `out` from per-group statistics of `df`"""
+    grouped = df.groupby(group_by, sort=False, observed=True, dropna=False)
+    codes = grouped.ngroup().to_numpy()
+    numeric, datetimes, categorical = _split_columns(df, columns)
+
+    if numeric or datetimes:
+        # One grouped aggregation for every numeric and datetime column
+        agg_cols = numeric + datetimes
+        how = {col: (numeric_strategy if col in numeric else 'median') for col in agg_cols}
+        group_stats = grouped[agg_cols].agg(how)
+        for col in agg_cols:
+            per_row = group_stats[col].to_numpy()[codes]
+            filler = pd.Series(per_row, index=df.index)
+            if ptypes.is_integer_dtype(df[col].dtype):
+                filler = filler.round()
+            out[col] = df[col].fillna(filler)
+
+    for col in categorical:
+        counts = (pd.DataFrame({'_g': codes, '_v': df[col]})
+                  .dropna(subset=['_v'])
+                  .groupby(['_g', '_v'], sort=False, observed=True)
+                  .size())
+        if counts.empty:
+            continue
+        modes = counts.sort_values(ascending=False).reset_index()
+        modes = modes.drop_duplicates('_g').set_index('_g')['_v']
+        filler = pd.Series(codes, index=df.index).map(modes)
+        out[col] = df[col].fillna(filler)
+
+    return out
+
+
+def fill_missing_values(df, numeric_strategy='median', group_by=None):
+    """
+    Fill missing values in every column without duplicating the frame.
+
+    Numeric columns get the median (or mean), datetime columns the median,
+    and all other columns the most frequent value. When ``group_by`` is
+    given, statistics are computed per group first and the global
+    statistic is used for groups that have no observed values.
+    """
+    if df is None or df.empty:
+        return df
+
+    missing = df.isna().any()
+    columns = missing.index[missing.values].tolist()
+    if group_by is not None:
+        group_keys = [group_by] if isinstance(group_by, str) else list(group_by)
+        columns = [col for col in columns if col not in group_keys]
+    if not columns:
+        return df
+
+    out = df
+    if group_by is not None:
+        out = _group_fill(df, df.copy(deep=False), group_keys, columns, numeric_strategy)
+        still_missing = out[columns].isna().any()
+        columns = still_missing.index[still_missing.values].tolist()
+        if not columns:
+            return out
+
+    # Global statistics from the original data (not from group-filled values)
+    fill_values = compute_fill_values(df, numeric_strategy, columns)
+    if not fill_values:
+        return out
+    if out is df:
+        out = df.copy(deep=False)
+    return _add_fill_categories(out, fill_values).fillna(value=fill_values)
@@ -0,0 +1,166 @@
+"""
+========================================================================
+                    jobs.py - הרצת ניתוחים ארוכים ברקע
+========================================================================
+מאגר תהליכוני עבודה ברמת התהליך, שחי מעבר לריצות החוזרות של Streamlit:
+ניתוח ארוך נשלח כמשימה עם מזהה, מדווח התקדמות, ותוצאתו נשמרת תחת המזהה
+עד שהדף שביקש אותה אוסף אותה. המשתמש יכול לעבור בין דפים בזמן שהמשימה רצה.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from ml_cache import estimate_size
+
+# Analyses that may run at the same time across all sessions
+DEFAULT_WORKERS = 2
+
+# Finished jobs kept for pickup before the oldest are dropped: at most this many,
+# holding at most this many bytes of results, and none older than the age limit
+# (their session was closed or never came back for them)
+MAX_FINISHED_JOBS = 100
+MAX_FINISHED_BYTES = 512 * 1024 ** 2
+MAX_FINISHED_AGE = 30 * 60
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+_local = threading.local()
+
+
+class JobCancelled(Exception):
+    """Raised inside a job's function when the job was cancelled"""
+
+
+class Job:
+    """One background analysis: status, progress and, once finished, its result or error"""
+
+    def __init__(self, name):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Waiting for a free worker"
+        self.result = None
+        self.size = 0
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel_requested = False
+
+    @property
+    def done(self):
+        return self.status in (DONE, FAILED, CANCELLED)
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def report(self, fraction, message=None):
+        if self._cancel_requested:
+            raise JobCancelled(self.name)
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+    def cancel(self):
+        """Queued jobs never start; running ones stop at their next progress report"""
+        self._cancel_requested = True
+        if self.status == QUEUED:
+            self.status = CANCELLED
+            self.finished = time.time()
+
+
+def report_progress(fraction, message=None):
+    """Progress of the job running on this thread (no-op outside a job)"""
+    job = getattr(_local, 'job', None)
+    if job is not None:
+        job.report(fraction, message)
+
+
+class JobRunner:
+    """Thread pool running jobs by id; results wait in the runner until collected"""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name, fn, *args, **kwargs):
+        """
+        Queue ``fn(*args, **kwargs)`` and return its Job right away.
+
+        Worker threads are shared by all callers, so ``fn`` gets everything
+        it needs as arguments. It reports progress with report_progress().
+        """
+        job = Job(name)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        if job.status == CANCELLED:
+            return
+        job.status = RUNNING
+        job.started = time.time()
+        job.message = "Starting"
+        _local.job = job
+        try:
+            job.result = fn(*args, **kwargs)
+            job.progress = 1.0
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            _local.job = None
+            job.size = estimate_size(job.result) if job.result is not None else 0
+            job.finished = time.time()
+            with self._lock:
+                self._prune()
+
+    def get(self, job_id):
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def discard(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _prune(self):
+        """Drop uncollected results, oldest first, beyond the count, byte and age limits"""
+        finished = sorted((job for job in self._jobs.values() if job.done and job.finished is not None),
+                          key=lambda job: job.finished)
+        now = time.time()
+        total = sum(job.size for job in finished)
+        # The newest result is kept even when it alone is over the byte budget
+        for i, job in enumerate(finished[:-1]):
+            if (now - job.finished <= MAX_FINISHED_AGE and total <= MAX_FINISHED_BYTES
+                    and len(finished) - i <= MAX_FINISHED_JOBS):
+                break
+            total -= job.size
+            del self._jobs[job.id]
+        if finished and now - finished[-1].finished > MAX_FINISHED_AGE:
+            del self._jobs[finished[-1].id]
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def default_runner():
+    """The process-wide runner, shared by every session and every rerun"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
@@ -0,0 +1,91 @@
+"""
+========================================================================
+                    ml_cache.py - מטמון תוצאות למידת מכונה
+========================================================================
+מטמון LRU למודלים מאומנים ולתוצאותיהם, לפי גרסת הנתונים, העמודות שנבחרו
+וההיפר-פרמטרים. גודל המטמון מוגבל בבתים: כשהוא מתמלא, התוצאות שלא נעשה
+בהן שימוש הכי הרבה זמן מפונות ראשונות.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Default memory budget for one session's cached models and outputs
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+
+
+def estimate_size(obj, _seen=None):
+    """Approximate memory footprint of a result: arrays, frames, estimators and containers"""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = obj.memory_usage(index=True, deep=False)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(v, _seen) for v in obj.values())
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(estimate_size(v, _seen) for v in obj)
+    if hasattr(obj, '__dict__'):
+        # Fitted estimators keep their learned state as attributes
+        return sys.getsizeof(obj) + estimate_size(vars(obj), _seen)
+    return sys.getsizeof(obj)
+
+
+def make_key(version, kind, features, params):
+    """Cache key from dataset version, analysis kind, selected features and hyperparameters"""
+    return (version, kind, tuple(features), tuple(sorted(params.items())))
+
+
+class MLResultCache:
+    """Memory-bounded LRU cache of fitted models and their outputs"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()   # key -> (value, size in bytes)
+        # Background jobs may read and fill the same cache concurrently
+        self._lock = threading.RLock()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        """Store a result and evict the least recently used ones beyond the budget"""
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
@@ -0,0 +1,103 @@
+"""
+========================================================================
+                    ml_session.py - סשן למידת מכונה משותף
+========================================================================
+אובייקט שמתאים כל מודל (K-Means, PCA, Isolation Forest, Random Forest)
+פעם אחת בלבד על אותה מטריצה מנורמלת, ומשתף את התוויות וההטלות בין
+דוח הטקסט לבין התרשימים כך שהתרשים מציג בדיוק את האשכולות שדווחו.
+"""
+
+from sklearn.ensemble import IsolationForest
+
+import model_registry
+from cluster_profile import profile_clusters
+from clustering import select_k
+from importance import compute_importance
+from pca_engine import fit_pca
+from utils import dataset_fingerprint
+
+
+class MLSession:
+    """Lazily fitted models over one standardized feature matrix"""
+
+    def __init__(self, X, X_scaled, numeric_cols, random_state=42, scaler=None):
+        self.X = X
+        self.X_scaled = X_scaled
+        self.scaler = scaler
+        self.numeric_cols = list(numeric_cols)
+        self.random_state = random_state
+        self._results = {}
+
+    def _memo(self, key, fit):
+        if key not in self._results:
+            self._results[key] = fit()
+        return self._results[key]
+
+    def clustering(self, max_k=7):
+        """
+        K sweep over k=2..max_k, keeping the best silhouette model.
+
+        The model for the best k comes from the sweep itself instead of a
+        second fit; large data uses the scalable path of clustering.select_k.
+        """
+        def fit():
+            k_values = range(2, min(max_k + 1, len(self.X_scaled) // 2))
+            return select_k(self.X_scaled, k_values, random_state=self.random_state)
+        return self._memo(('clustering', max_k), fit)
+
+    def cluster_profile(self, max_k=7):
+        """Sizes, centroids (original units) and distinguishing features of the best clustering"""
+        return self._memo(('profile', max_k),
+                          lambda: profile_clusters(self.X, self.clustering(max_k)['labels']))
+
+    def pca(self):
+        """PCA fit (solver chosen by data shape) and the leading projected components"""
+        return self._memo('pca', lambda: fit_pca(self.X_scaled, random_state=self.random_state))
+
+    def anomalies(self, contamination=0.1):
+        """Fitted Isolation Forest and its labels (-1 = anomaly, 1 = normal)"""
+        def fit():
+            model = IsolationForest(contamination=contamination, random_state=self.random_state)
+            return {'model': model, 'labels': model.fit_predict(self.X_scaled)}
+        return self._memo(('anomalies', contamination), fit)
+
+    def anomaly_labels(self, contamination=0.1):
+        return self.anomalies(contamination)['labels']
+
+    def feature_importance(self, n_estimators=100):
+        """Held-out permutation importances of the other columns for predicting the first one"""
+        def fit():
+            if len(self.X) <= 10 or len(self.numeric_cols) < 2:
+                return None
+            result = compute_importance(
+                self.X.iloc[:, 1:], self.X.iloc[:, 0], "Random Forest", n_estimators,
+                self.random_state, version=dataset_fingerprint(self.X)
+            )
+            table = result['importances']
+            return {'features': table['Feature'].tolist(),
+                    'importances': table['Importance_Pct'].to_numpy() / 100}
+        return self._memo(('importance', n_estimators), fit)
+
+    def save_models(self, owner=None, name=None):
+        """
+        Save the clustering, PCA and anomaly pipelines (scaler + model) to
+        the model registry; returns the metadata of every saved model.
+        """
+        fingerprint = dataset_fingerprint(self.X)
+        best = self.clustering()
+        detection_params = {'method': 'Isolation Forest', 'contamination': 0.1}
+        fitted = [
+            ('clustering', best['model'], {'n_clusters': best['best_k']},
+             {'silhouette': float(best['best_score'])}),
+            ('pca', self.pca()['model'], {'solver': self.pca()['solver']}, {}),
+            ('anomalies', self.anomalies()['model'], detection_params,
+             {'anomaly_pct': float((self.anomaly_labels() == -1).mean() * 100)}),
+        ]
+        return [
+            model_registry.save_model(
+                model_registry.build_pipeline(self.scaler, model), kind, self.numeric_cols,
+                fingerprint, params=params, metrics=metrics, n_rows=len(self.X),
+                name=f"{name or 'bot'} · {kind}", owner=owner
+            )
+            for kind, model, params, metrics in fitted
+        ]
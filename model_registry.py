@@ -0,0 +1,233 @@
+"""
+========================================================================
+                    model_registry.py - מאגר מודלים שמורים
+========================================================================
+שמירת צינורות מאומנים (נרמול + מודל) לדיסק יחד עם מטא-דאטה וטביעת
+האצבע של הנתונים שעליהם אומנו, וניקוד קבצים חדשים במקטעים: מעבר לינארי
+אחד על הקובץ במקום אימון מחדש של אשכולות, PCA או גלאי אנומליות.
+"""
+
+import json
+import os
+import re
+import time
+import uuid
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.pipeline import Pipeline
+
+from config import MODEL_REGISTRY_DIR
+
+KINDS = ("clustering", "pca", "anomalies")
+
+# Rows scored per chunk when applying a saved model to a new file
+SCORE_CHUNK_SIZE = 50000
+
+# Number of projected components written for a saved PCA model
+PCA_OUTPUT_COMPONENTS = 3
+
+# Rows kept in memory from a scoring run for display
+PREVIEW_ROWS = 20
+
+_MODEL_ID = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+def _directory(directory=None):
+    return directory or MODEL_REGISTRY_DIR
+
+
+def _paths(model_id, directory=None):
+    # Ids arrive from chat commands and widgets, so they never become arbitrary paths
+    if not _MODEL_ID.match(model_id or ''):
+        raise ValueError(f"Invalid model id: {model_id!r}")
+    base = os.path.join(_directory(directory), model_id)
+    return base + '.joblib', base + '.json'
+
+
+def build_pipeline(scaler, model):
+    """
+    Pipeline of the fitted scaler and model (no refit).
+
+    A (feature map, model) pair, as returned by the scalable One-Class SVM,
+    becomes two consecutive steps; a missing scaler is a passthrough step.
+    """
+    steps = [('scaler', scaler if scaler is not None else 'passthrough')]
+    if isinstance(model, tuple):
+        feature_map, model = model
+        steps.append(('features', feature_map))
+    steps.append(('model', model))
+    return Pipeline(steps)
+
+
+def save_model(pipeline, kind, features, fingerprint, params=None, metrics=None,
+               n_rows=None, name=None, owner=None, directory=None):
+    """
+    Persist a fitted pipeline and its metadata; returns the metadata dict.
+
+    The pipeline goes to ``<id>.joblib`` and the metadata (kind, feature
+    columns, hyperparameters, metrics, training row count and the training
+    dataset fingerprint) to ``<id>.json`` next to it.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {KINDS}")
+    directory = _directory(directory)
+    os.makedirs(directory, exist_ok=True)
+
+    model_id = f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    metadata = {
+        'id': model_id,
+        'name': name or model_id,
+        'kind': kind,
+        'features': list(map(str, features)),
+        'params': params or {},
+        'metrics': metrics or {},
+        'n_rows': n_rows,
+        'fingerprint': fingerprint,
+        'owner': owner,
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'sklearn_version': sklearn.__version__,
+    }
+    model_path, meta_path = _paths(model_id, directory)
+    joblib.dump(pipeline, model_path)
+    with open(meta_path, 'w', encoding='utf-8') as handle:
+        json.dump(metadata, handle, ensure_ascii=False, indent=2, default=str)
+    return metadata
+
+
+def list_models(kind=None, owner=None, directory=None):
+    """Metadata of the saved models, newest first, optionally filtered by kind and owner"""
+    directory = _directory(directory)
+    if not os.path.isdir(directory):
+        return []
+    models = []
+    for filename in os.listdir(directory):
+        if not filename.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, filename), encoding='utf-8') as handle:
+                metadata = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        if kind is not None and metadata.get('kind') != kind:
+            continue
+        if owner is not None and metadata.get('owner') != owner:
+            continue
+        models.append(metadata)
+    return sorted(models, key=lambda m: m.get('created', ''), reverse=True)
+
+
+def load_model(model_id, directory=None):
+    """(pipeline, metadata) of a saved model"""
+    model_path, meta_path = _paths(model_id, directory)
+    if not os.path.exists(meta_path):
+        raise KeyError(f"No saved model with id {model_id}")
+    with open(meta_path, encoding='utf-8') as handle:
+        metadata = json.load(handle)
+    return joblib.load(model_path), metadata
+
+
+def compatibility_warning(metadata):
+    """Message when a model was saved with a different scikit-learn version, else None"""
+    saved = metadata.get('sklearn_version')
+    if saved != sklearn.__version__:
+        return f"Model saved with scikit-learn {saved}, running {sklearn.__version__}"
+    return None
+
+
+def delete_model(model_id, directory=None):
+    for path in _paths(model_id, directory):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def iter_file_chunks(source, filename, chunk_size=SCORE_CHUNK_SIZE):
+    """Row chunks of a CSV (streamed) or Excel file (read once, then sliced)"""
+    if filename.lower().endswith('.csv'):
+        yield from pd.read_csv(source, chunksize=chunk_size)
+    else:
+        yield from iter_frame_chunks(pd.read_excel(source), chunk_size)
+
+
+def iter_frame_chunks(df, chunk_size=SCORE_CHUNK_SIZE):
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def score_chunk(pipeline, metadata, chunk):
+    """
+    The chunk with the model's outputs appended.
+
+    Clustering adds ``Cluster``, PCA adds the leading ``PC`` columns and
+    anomaly detectors add ``Anomaly`` and ``Anomaly_Score`` (lower is more
+    anomalous). Rows with missing feature values get empty outputs.
+    """
+    features = metadata['features']
+    missing = [col for col in features if col not in chunk.columns]
+    if missing:
+        raise ValueError(f"File is missing the model's feature columns: {', '.join(missing)}")
+
+    values = chunk[features].apply(pd.to_numeric, errors='coerce')
+    complete = values.notna().all(axis=1).to_numpy()
+    X = values[complete].astype('float64')
+    if not hasattr(pipeline.steps[0][1], 'feature_names_in_'):
+        # Steps fitted on plain arrays warn when given column names
+        X = X.to_numpy()
+    scored = chunk.copy()
+    kind = metadata['kind']
+
+    if kind == 'clustering':
+        labels = pd.Series(pd.NA, index=chunk.index, dtype='Int64')
+        if len(X):
+            labels[complete] = pipeline.predict(X)
+        scored['Cluster'] = labels
+    elif kind == 'pca':
+        n_out = min(PCA_OUTPUT_COMPONENTS, len(pipeline.named_steps['model'].components_))
+        projected = np.full((len(chunk), n_out), np.nan)
+        if len(X):
+            projected[complete] = pipeline.transform(X)[:, :n_out]
+        for i in range(n_out):
+            scored[f'PC{i + 1}'] = projected[:, i]
+    else:
+        flags = pd.Series(pd.NA, index=chunk.index, dtype='boolean')
+        scores = np.full(len(chunk), np.nan)
+        if len(X):
+            flags[complete] = pipeline.predict(X) == -1
+            scores[complete] = pipeline.decision_function(X)
+        scored['Anomaly'] = flags
+        scored['Anomaly_Score'] = scores
+    return scored
+
+
+def score_to_csv(pipeline, metadata, chunks, out, progress=None):
+    """
+    Score chunk by chunk and stream the results as CSV into ``out``.
+
+    Only a small preview and running counts stay in memory, so the cost is
+    one linear pass over the input. ``progress`` is called with the number
+    of rows done after every chunk.
+
+    Returns a summary dict: rows, scored rows, preview frame and, for
+    clustering and anomalies, the counts per cluster / anomaly count.
+    """
+    summary = {'rows': 0, 'scored': 0, 'preview': None, 'counts': {}}
+    for i, chunk in enumerate(chunks):
+        scored = score_chunk(pipeline, metadata, chunk)
+        scored.to_csv(out, index=False, header=(i == 0))
+        summary['rows'] += len(scored)
+        if summary['preview'] is None:
+            summary['preview'] = scored.head(PREVIEW_ROWS)
+
+        output = {'clustering': 'Cluster', 'anomalies': 'Anomaly'}.get(metadata['kind'])
+        if output is not None:
+            summary['scored'] += int(scored[output].notna().sum())
+            counts = scored[output].value_counts()
+            for value, count in zip(counts.index.tolist(), counts.tolist()):
+                summary['counts'][value] = summary['counts'].get(value, 0) + count
+        else:
+            summary['scored'] += int(scored['PC1'].notna().sum())
+        if progress is not None:
+            progress(summary['rows'])
+    return summary
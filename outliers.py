@@ -0,0 +1,115 @@
+"""
+========================================================================
+                    outliers.py - מנוע זיהוי ערכים חריגים וקטורי
+========================================================================
+זיהוי ערכים חריגים בשיטות IQR, Z-Score ו-Modified Z-Score (MAD) לכל
+העמודות הנומריות במעבר אחד על המטריצה. התוצאה נשמרת כמסכת ביטים
+קומפקטית (בייט אחד לתא) יחד עם ספירות לכל עמודה ושיטה.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Method name -> bit in the flag matrix
+IQR = 1
+Z_SCORE = 2
+MODIFIED_Z = 4
+METHODS = {'IQR': IQR, 'Z-Score': Z_SCORE, 'Modified Z-Score': MODIFIED_Z}
+
+
+class OutlierResult:
+    """Per-cell outlier bitmask and per-column counts for one frame"""
+
+    def __init__(self, columns, flags, valid, index=None):
+        self.columns = list(columns)
+        self.flags = flags          # uint8 array (rows x columns), one bit per method
+        self.valid = valid          # non-missing values per column
+        self.index = index
+        self.counts = pd.DataFrame(
+            {name: np.count_nonzero(flags & bit, axis=0) for name, bit in METHODS.items()},
+            index=pd.Index(self.columns, dtype=object),
+        )
+        self.counts['valid'] = valid
+
+    def percentages(self):
+        """Share of non-missing values flagged by each method, in percent"""
+        valid = self.counts['valid'].where(self.counts['valid'] > 0)
+        return self.counts[list(METHODS)].div(valid, axis=0) * 100
+
+    def method_results(self, column):
+        """{method: {'count', 'percentage'}} for one column"""
+        row = self.counts.loc[column]
+        valid = row['valid']
+        return {
+            name: {
+                'count': int(row[name]),
+                'percentage': row[name] / valid * 100 if valid else 0.0,
+            }
+            for name in METHODS
+        }
+
+    def row_mask(self, method='IQR', column=None):
+        """Boolean mask of rows flagged by a method, in one column or in any column"""
+        bits = self.flags & METHODS[method]
+        if column is not None:
+            mask = bits[:, self.columns.index(column)] > 0
+        else:
+            mask = bits.any(axis=1)
+        return pd.Series(mask, index=self.index) if self.index is not None else mask
+
+
+def _sorted_quantiles(ordered, valid, quantiles):
+    """Linear-interpolated quantiles of column-sorted data with NaNs sorted last"""
+    cols = np.arange(ordered.shape[1])
+    last = np.maximum(valid - 1, 0)
+    results = []
+    for q in quantiles:
+        pos = q * last
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.ceil(pos).astype(np.int64)
+        low_val = ordered[lo, cols]
+        value = low_val + (ordered[hi, cols] - low_val) * (pos - lo)
+        results.append(np.where(valid > 0, value, np.nan))
+    return results
+
+
+def detect_outliers(df, columns=None, iqr_k=1.5, z_threshold=3.0, modified_z_threshold=3.5):
+    """
+    Flag outliers in every numeric column with all three methods at once.
+
+    Every column is sorted once in a single matrix sort (NaNs sort last)
+    and quartiles, median and MAD are read off by position, so k columns
+    cost one pass instead of k.
+    Missing values are never flagged and do not count as valid values.
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    columns = list(columns)
+    if not columns or len(df) == 0:
+        return OutlierResult(columns, np.zeros((len(df), len(columns)), dtype=np.uint8),
+                             np.zeros(len(columns), dtype=np.int64), df.index)
+
+    values = df[columns].to_numpy(dtype='float64', na_value=np.nan)
+    valid = np.count_nonzero(~np.isnan(values), axis=0)
+    flags = np.zeros(values.shape, dtype=np.uint8)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # IQR fences
+        ordered = np.sort(values, axis=0)
+        q1, median, q3 = _sorted_quantiles(ordered, valid, (0.25, 0.5, 0.75))
+        iqr = q3 - q1
+        flags[(values < q1 - iqr_k * iqr) | (values > q3 + iqr_k * iqr)] |= IQR
+
+        # Z-score against the sample standard deviation
+        present = np.where(np.isnan(values), 0.0, values)
+        mean = present.sum(axis=0) / valid
+        deviation = np.where(np.isnan(values), 0.0, values - mean)
+        std = np.sqrt((deviation ** 2).sum(axis=0) / (valid - 1))
+        flags[np.abs((values - mean) / std) > z_threshold] |= Z_SCORE
+
+        # Modified z-score from the median absolute deviation
+        abs_dev = np.abs(values - median)
+        (mad,) = _sorted_quantiles(np.sort(abs_dev, axis=0), valid, (0.5,))
+        flags[np.abs(0.6745 * (values - median) / mad) > modified_z_threshold] |= MODIFIED_Z
+
+    return OutlierResult(columns, flags, valid, df.index)
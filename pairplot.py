@@ -0,0 +1,141 @@
+"""
+========================================================================
+                    pairplot.py - מטריצת פיזור מדרגית
+========================================================================
+מטריצת פיזור (pair plot) בזמן חסום לכל מספר שורות: כל עמודה מחולקת
+לתאים פעם אחת, כל זוג עמודות נצבר להיסטוגרמה דו-ממדית אחת בעזרת
+bincount ומצויר כתמונה (במקום אובייקט matplotlib לכל נקודה), והאלכסון
+משתמש באותה חלוקה לתאים. בנתונים גדולים מאוד נדגם מספר שורות קבוע,
+ובנתונים קטנים התאים מצוירים כנקודות.
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from distributions import HistogramSummary
+
+# Columns drawn at most (the grid has columns² cells)
+MAX_PAIR_COLUMNS = 8
+
+# Bins per axis of every off-diagonal 2D histogram and of the diagonal histograms
+PAIR_BINS = 60
+
+# Up to this many rows the off-diagonal cells are plain scatter plots
+SCATTER_ROWS = 5000
+
+# Rows binned for the off-diagonal rasters; larger data is sampled uniformly
+MAX_RASTER_ROWS = 1000000
+
+CELL_INCHES = 2.2
+
+
+def _ranges(frame):
+    """(low, high) per column, widened where a column is constant or empty"""
+    low = np.nan_to_num(frame.min().to_numpy(dtype='float64', na_value=np.nan))
+    high = np.nan_to_num(frame.max().to_numpy(dtype='float64', na_value=np.nan))
+    same = high <= low
+    return np.where(same, low - 0.5, low), np.where(same, high + 0.5, high)
+
+
+def pair_grids(df, columns, bins=PAIR_BINS, max_rows=MAX_RASTER_ROWS, random_state=42):
+    """
+    Everything a pair plot draws, computed up front.
+
+    Returns a dict with the column ``ranges`` (over all rows), one diagonal
+    histogram per column, and either the ``points`` (small data) or the 2D
+    ``counts`` of every column pair i < j. Above ``max_rows`` rows the
+    histograms come from a uniform row sample, so the cost is bounded
+    whatever the row count. Each column is binned once and the diagonal
+    histograms are read off those bins, so a pair costs a single
+    ``np.bincount``.
+    """
+    columns = list(columns)
+    frame = df[columns]
+    low, high = _ranges(frame)
+    grids = {'columns': columns, 'ranges': list(zip(low, high)), 'n_rows': len(frame),
+             'sampled_rows': None, 'points': None, 'counts': {}}
+
+    if len(frame) > max_rows:
+        rng = np.random.default_rng(random_state)
+        frame = frame.iloc[np.sort(rng.choice(len(frame), size=max_rows, replace=False))]
+        grids['sampled_rows'] = max_rows
+    # Column-major, so every column below is a contiguous slice
+    values = np.asfortranarray(frame.to_numpy(dtype='float64', na_value=np.nan))
+    if len(values) <= SCATTER_ROWS:
+        grids['points'] = values
+
+    # Bin index of every value per column, -1 where missing
+    with np.errstate(invalid='ignore'):
+        scaled = (values - low) / (high - low) * bins
+    binned = np.where(np.isfinite(scaled), np.clip(scaled, 0, bins - 1), -1).astype(np.int64)
+    binned = np.asfortranarray(binned)
+
+    grids['diagonals'] = []
+    for i in range(len(columns)):
+        present = binned[:, i][binned[:, i] >= 0]
+        edges = np.linspace(low[i], high[i], bins + 1)
+        grids['diagonals'].append(HistogramSummary(np.bincount(present, minlength=bins), edges))
+    if grids['points'] is not None:
+        return grids
+
+    for i in range(len(columns)):
+        for j in range(i + 1, len(columns)):
+            both = (binned[:, i] >= 0) & (binned[:, j] >= 0)
+            cells = binned[both, j] * bins + binned[both, i]
+            grids['counts'][(i, j)] = np.bincount(cells, minlength=bins * bins).reshape(bins, bins)
+    return grids
+
+
+def draw_pair_plot(grids, title='Pair Plot Analysis'):
+    """
+    Matplotlib figure of the grids: histograms on the diagonal and a log
+    density image (or the scatter points) in every off-diagonal cell.
+    """
+    columns, ranges = grids['columns'], grids['ranges']
+    k = len(columns)
+    fig, axes = plt.subplots(k, k, figsize=(CELL_INCHES * k, CELL_INCHES * k), squeeze=False)
+
+    for row in range(k):
+        for col in range(k):
+            ax = axes[row, col]
+            x_low, x_high = ranges[col]
+            if row == col:
+                summary = grids['diagonals'][col]
+                ax.bar(summary.centers, summary.counts, width=summary.widths,
+                       color='steelblue', edgecolor='none')
+                ax.set_xlim(x_low, x_high)
+            elif grids['points'] is not None:
+                ax.scatter(grids['points'][:, col], grids['points'][:, row], s=3, alpha=0.5, rasterized=True)
+                ax.set_xlim(x_low, x_high)
+                ax.set_ylim(*ranges[row])
+            else:
+                # Cell (row, col) plots column `col` on x against column `row` on y
+                if col < row:
+                    counts = grids['counts'][(col, row)]
+                else:
+                    counts = grids['counts'][(row, col)].T
+                image = np.where(counts > 0, np.log10(np.maximum(counts, 1)) + 1, np.nan)
+                ax.imshow(image, origin='lower', aspect='auto', cmap='viridis', interpolation='nearest',
+                          extent=(x_low, x_high, *ranges[row]))
+
+            ax.tick_params(labelsize=6)
+            if row < k - 1:
+                ax.set_xticklabels([])
+            else:
+                ax.set_xlabel(str(columns[col])[:15], fontsize=8)
+            if col > 0:
+                ax.set_yticklabels([])
+            else:
+                ax.set_ylabel(str(columns[row])[:15], fontsize=8)
+
+    fig.suptitle(title, fontsize=14)
+    fig.tight_layout(rect=(0, 0, 1, 0.97))
+    return fig
+
+
+def pair_plot(df, columns=None, max_columns=MAX_PAIR_COLUMNS, title='Pair Plot Analysis'):
+    """Pair plot figure of the first ``max_columns`` numeric columns; returns (figure, grids)"""
+    if columns is None:
+        columns = df.select_dtypes(include=['number']).columns
+    grids = pair_grids(df, list(columns)[:max_columns])
+    return draw_pair_plot(grids, title), grids
@@ -0,0 +1,139 @@
+"""
+========================================================================
+                    pca_engine.py - מנוע PCA לנתונים רחבים וארוכים
+========================================================================
+בחירת אלגוריתם הפירוק לפי צורת הנתונים: SVD מלא לנתונים קטנים, SVD
+אקראי (randomized) כשיש מאות עמודות ורק מעט רכיבים נדרשים, ו-IncrementalPCA
+שמתאים את המודל במקטעים עבור מיליוני שורות או נתונים שאינם נכנסים לזיכרון.
+"""
+
+import numpy as np
+from sklearn.decomposition import PCA, IncrementalPCA
+
+# Up to this many columns a full decomposition is cheap enough
+FULL_SVD_MAX_COLUMNS = 50
+
+# With at least this many rows per column the full solver works on the small
+# columns x columns covariance matrix, which beats a randomized SVD
+COVARIANCE_ROWS_PER_COLUMN = 10
+
+# Above this many rows the decomposition is fitted chunk by chunk
+INCREMENTAL_ROW_THRESHOLD = 500000
+CHUNK_SIZE = 50000
+
+# Starting number of components for the truncated solvers
+INITIAL_COMPONENTS = 20
+
+# Tall data: rows sampled to choose the number of components before the single
+# incremental pass (at least SAMPLE_ROWS_PER_COLUMN rows per column), and the
+# extra share of components kept to absorb sampling noise
+COMPONENT_SAMPLE_ROWS = 50000
+SAMPLE_ROWS_PER_COLUMN = 20
+COMPONENT_MARGIN = 0.1
+
+# Number of projected components kept for plotting
+EMBEDDING_COMPONENTS = 3
+
+
+def iter_chunks(X, chunk_size=CHUNK_SIZE):
+    """Consecutive row blocks of a matrix"""
+    for start in range(0, len(X), chunk_size):
+        yield X[start:start + chunk_size]
+
+
+def fit_incremental(chunks, n_components):
+    """
+    IncrementalPCA fitted block by block from any iterable of row chunks.
+
+    partial_fit needs at least n_components rows per call, so short chunks
+    are gathered into blocks, and a short tail is merged into the last block.
+    """
+    model = IncrementalPCA(n_components=n_components)
+    gathered, gathered_rows = [], 0
+    pending = None
+    for chunk in chunks:
+        gathered.append(np.asarray(chunk, dtype='float64'))
+        gathered_rows += len(gathered[-1])
+        if gathered_rows < n_components:
+            continue
+        # Each block is fitted only once the next one exists, so a tail can still join it
+        if pending is not None:
+            model.partial_fit(pending)
+        pending = np.vstack(gathered) if len(gathered) > 1 else gathered[0]
+        gathered, gathered_rows = [], 0
+    if gathered:
+        pending = np.vstack(gathered if pending is None else [pending] + gathered)
+    if pending is not None:
+        model.partial_fit(pending)
+    return model
+
+
+def _components_needed(model, variance_target):
+    cumulative = np.cumsum(model.explained_variance_ratio_)
+    return cumulative[-1] >= variance_target
+
+
+def _fit_randomized(X, variance_target, random_state):
+    """Randomized SVD, doubling the components until they explain ``variance_target``"""
+    max_components = min(X.shape)
+    n_components = min(INITIAL_COMPONENTS, max_components)
+    while True:
+        model = PCA(n_components=n_components, svd_solver='randomized', random_state=random_state).fit(X)
+        if n_components >= max_components or _components_needed(model, variance_target):
+            return model
+        n_components = min(n_components * 2, max_components)
+
+
+def choose_components(X, variance_target, random_state=42):
+    """
+    Components a tall matrix needs to explain ``variance_target``, estimated
+    from a randomized fit on a uniform row sample plus a small margin.
+    """
+    n_rows, n_cols = X.shape
+    sample_size = min(n_rows, max(COMPONENT_SAMPLE_ROWS, SAMPLE_ROWS_PER_COLUMN * n_cols))
+    rng = np.random.default_rng(random_state)
+    sample = X[np.sort(rng.choice(n_rows, size=sample_size, replace=False))]
+    cumulative = np.cumsum(_fit_randomized(sample, variance_target, random_state).explained_variance_ratio_)
+    needed = min(int(np.searchsorted(cumulative, variance_target)) + 1, len(cumulative))
+    return min(int(np.ceil(needed * (1 + COMPONENT_MARGIN))) + 1, min(n_rows, n_cols))
+
+
+def fit_pca(X, variance_target=0.95, random_state=42):
+    """
+    Fit PCA on a standardized matrix with the solver that fits its shape.
+
+    Narrow or short data gets a full decomposition (all components). Wide
+    data (many columns, relatively few rows) uses a randomized SVD that
+    starts from a few components and doubles them until they explain
+    ``variance_target`` of the total variance (or all are used). Tall data
+    gets a single IncrementalPCA pass over row chunks: all components when
+    the data is narrow, otherwise the number estimated by
+    choose_components on a row sample.
+
+    Returns a dict with the fitted model, the data projected on the first
+    EMBEDDING_COMPONENTS components, and the solver that was used.
+    """
+    X = np.asarray(X, dtype='float64')
+    n_rows, n_cols = X.shape
+    max_components = min(n_rows, n_cols)
+    tall = n_rows > INCREMENTAL_ROW_THRESHOLD
+    wide = n_cols > FULL_SVD_MAX_COLUMNS and n_rows < COVARIANCE_ROWS_PER_COLUMN * n_cols
+
+    if not tall and not wide:
+        model = PCA(random_state=random_state).fit(X)
+        solver = 'full'
+    elif tall:
+        if n_cols <= FULL_SVD_MAX_COLUMNS:
+            n_components = max_components
+        else:
+            n_components = choose_components(X, variance_target, random_state)
+        model = fit_incremental(iter_chunks(X), n_components)
+        solver = 'incremental'
+    else:
+        model = _fit_randomized(X, variance_target, random_state)
+        solver = 'randomized'
+
+    # Project only the leading components (the model's own transform would build all of them)
+    leading = model.components_[:EMBEDDING_COMPONENTS]
+    embedding = np.vstack([(chunk - model.mean_) @ leading.T for chunk in iter_chunks(X)])
+    return {'model': model, 'embedding': embedding, 'solver': solver}
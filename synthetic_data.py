@@ -0,0 +1,168 @@
+"""
+========================================================================
+                    synthetic_data.py - נתונים סינתטיים לבדיקות עומס
+========================================================================
+מחולל נתונים סינתטיים דטרמיניסטי (לפי seed), וקטורי ובחלקים (chunks):
+מיליוני שורות עם תמהיל עמודות לבחירה - מספריות מתואמות, קטגוריאליות
+בהתפלגות לא אחידה ועמודות זמן עולות - ועם שיעור ערכים חסרים ושיעור שורות
+כפולות לבחירה. כל חלק נוצר ממחולל אקראי משלו ונכתב ישירות למערכים
+המוקצים מראש, כך שהזיכרון הנוסף חסום בגודל חלק אחד. התוצאות, וגם נתוני
+הדוגמה הקבועים של האפליקציה, נשמרות במטמון ברמת התהליך: לחיצה חוזרת על
+כפתור מחזירה את אותה מסגרת במקום לייצר אותה מחדש.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ml_cache import MLResultCache, make_key
+
+# Rows generated per chunk (each chunk has its own seeded random stream)
+CHUNK_ROWS = 250000
+
+MAX_ROWS = 20000000
+
+# Time columns start here and span at most this long (within the nanosecond
+# range of pandas 2); longer data repeats timestamps instead
+TIME_START = np.datetime64('2020-01-01T00:00')
+MAX_TIME_SPAN = np.timedelta64(10 * 365, 'D')
+
+# Generated datasets and demo presets, shared by every session
+_CACHE = MLResultCache(max_bytes=2 * 1024 ** 3)
+
+# Numeric columns cycle through these distributions and latent-factor loadings,
+# so the generated columns have a mix of shapes and of correlations
+_NUMERIC_KINDS = ("normal", "lognormal", "uniform", "count")
+_LOADINGS = (0.8, -0.6, 0.4, 0.0, 0.9, -0.3)
+
+# Categorical columns cycle through these cardinalities; frequencies follow 1/rank
+_CARDINALITIES = (4, 12, 50)
+
+
+def _categorical_labels(j, cardinality):
+    return np.array([f"C{j + 1}_{k:02d}" for k in range(cardinality)], dtype=object)
+
+
+def _numeric_chunk(rng, kind, factor, loading, j):
+    """One numeric column of a chunk: a distribution of ``kind`` shifted by the latent factor"""
+    n = len(factor)
+    noise = rng.standard_normal(n)
+    signal = loading * factor + np.sqrt(1 - loading ** 2) * noise
+    if kind == "normal":
+        return 100.0 * (j + 1) + 15.0 * signal
+    if kind == "lognormal":
+        return np.exp(3.0 + 0.5 * signal)
+    if kind == "uniform":
+        # Probability integral transform keeps the correlation with the factor
+        return 10.0 * (j + 1) * (0.5 + 0.5 * np.tanh(signal))
+    return rng.poisson(np.exp(1.5 + 0.4 * signal))
+
+
+def generate_dataset(n_rows, n_numeric=6, n_categorical=3, n_datetime=1, missing_rate=0.0,
+                     duplicate_rate=0.0, seed=42, chunk_rows=CHUNK_ROWS, progress=None):
+    """
+    A synthetic DataFrame of ``n_rows`` rows.
+
+    Columns: ``row_id``, ``n_datetime`` non-decreasing timestamps (one
+    row per minute, hour or day, with repeated timestamps once a column
+    would span more than MAX_TIME_SPAN), ``n_numeric``
+    numeric columns (normal, lognormal, uniform and count distributions, all
+    loaded on one latent factor with different weights, so they correlate)
+    and ``n_categorical`` text columns with skewed frequencies. Float and
+    text columns get ``missing_rate`` missing cells; ``duplicate_rate`` of
+    the rows are then overwritten with exact copies of the nearest earlier
+    row that is kept, so the time columns stay sorted.
+
+    Rows are produced in chunks of ``chunk_rows``, each from its own stream
+    of ``np.random.SeedSequence(seed)``, and written straight into
+    preallocated arrays. The same arguments always give the same data.
+    ``progress(fraction, message)`` is called after every chunk.
+    """
+    if not 0 < n_rows <= MAX_ROWS:
+        raise ValueError(f"n_rows must be between 1 and {MAX_ROWS:,}")
+    if not (0 <= missing_rate < 1 and 0 <= duplicate_rate < 1):
+        raise ValueError("missing_rate and duplicate_rate must be in [0, 1)")
+
+    kinds = [_NUMERIC_KINDS[j % len(_NUMERIC_KINDS)] for j in range(n_numeric)]
+    cardinalities = [_CARDINALITIES[j % len(_CARDINALITIES)] for j in range(n_categorical)]
+    labels = [_categorical_labels(j, c) for j, c in enumerate(cardinalities)]
+    weights = [1 / np.arange(1, c + 1) for c in cardinalities]
+    weights = [w / w.sum() for w in weights]
+
+    numeric = [np.empty(n_rows, dtype='int64' if kind == "count" else 'float64') for kind in kinds]
+    categorical = [np.empty(n_rows, dtype=object) for _ in range(n_categorical)]
+
+    n_chunks = -(-n_rows // chunk_rows)
+    streams = np.random.SeedSequence(seed).spawn(n_chunks + 1)
+    for i in range(n_chunks):
+        rng = np.random.default_rng(streams[i])
+        start, stop = i * chunk_rows, min((i + 1) * chunk_rows, n_rows)
+        factor = rng.standard_normal(stop - start)
+        for j, kind in enumerate(kinds):
+            numeric[j][start:stop] = _numeric_chunk(rng, kind, factor, _LOADINGS[j % len(_LOADINGS)], j)
+        for j in range(n_categorical):
+            codes = rng.choice(len(labels[j]), size=stop - start, p=weights[j])
+            categorical[j][start:stop] = labels[j][codes]
+        if missing_rate > 0:
+            for values in numeric + categorical:
+                if values.dtype.kind == 'i':
+                    continue
+                hit = np.flatnonzero(rng.random(stop - start) < missing_rate) + start
+                values[hit] = np.nan if values.dtype.kind == 'f' else None
+        if progress is not None:
+            progress(0.9 * stop / n_rows, f"Generated {stop:,} of {n_rows:,} rows")
+
+    data = {'row_id': np.arange(1, n_rows + 1)}
+    for k in range(n_datetime):
+        # One row per minute (per hour, day, ... for further time columns)
+        step = (np.timedelta64(1, 'm'), np.timedelta64(1, 'h'), np.timedelta64(1, 'D'))[k % 3]
+        periods = min(n_rows, int(MAX_TIME_SPAN // step))
+        data[f'time_{k + 1}' if n_datetime > 1 else 'timestamp'] = (
+            TIME_START + (np.arange(n_rows) * periods // n_rows) * step)
+    for j, kind in enumerate(kinds):
+        data[f'{kind}_{j + 1}'] = numeric[j]
+    for j in range(n_categorical):
+        data[f'category_{j + 1}'] = categorical[j]
+
+    n_duplicates = int(round(duplicate_rate * n_rows))
+    if n_duplicates > 0 and n_rows > 1:
+        # Exact copies of the nearest earlier row that is not itself overwritten
+        # (the first row never is), which keeps the time columns sorted
+        rng = np.random.default_rng(streams[-1])
+        n_duplicates = min(n_duplicates, n_rows - 1)
+        targets = np.zeros(n_rows, dtype=bool)
+        targets[1 + rng.choice(n_rows - 1, size=n_duplicates, replace=False)] = True
+        kept = np.flatnonzero(~targets)
+        targets = np.flatnonzero(targets)
+        sources = kept[np.searchsorted(kept, targets) - 1]
+        for values in data.values():
+            values[targets] = values[sources]
+    df = pd.DataFrame(data, copy=False)
+    if progress is not None:
+        progress(1.0, f"Generated {n_rows:,} rows")
+    return df
+
+
+def synthetic_dataset(n_rows, n_numeric=6, n_categorical=3, n_datetime=1, missing_rate=0.0,
+                      duplicate_rate=0.0, seed=42, progress=None):
+    """generate_dataset, cached per arguments: the same request returns the same frame object"""
+    params = {'n_rows': n_rows, 'n_numeric': n_numeric, 'n_categorical': n_categorical,
+              'n_datetime': n_datetime, 'missing_rate': missing_rate,
+              'duplicate_rate': duplicate_rate, 'seed': seed}
+    key = make_key('synthetic', 'dataset', [], params)
+    df = _CACHE.get(key)
+    if df is None:
+        df = _CACHE.put(key, generate_dataset(progress=progress, **params))
+    return df
+
+
+def cached_preset(name, build):
+    """
+    A fixed demo dataset, built once per process by ``build()`` and then
+    served from the cache. The returned frame is shared and must not be
+    changed in place.
+    """
+    key = make_key('synthetic', 'preset', [name], {})
+    df = _CACHE.get(key)
+    if df is None:
+        df = _CACHE.put(key, build())
+    return df
@@ -0,0 +1,133 @@
+"""
+========================================================================
+                    timeseries.py - מנוע סדרות זמן ורזולוציות מצטברות
+========================================================================
+זיהוי עמודות תאריך, בניית rollups (שעה/יום/שבוע/חודש) עם sum, mean,
+count, min ו-max במעבר אחד על הנתונים, ובחירת הרזולוציה המתאימה לתרשים
+כך שסדרה של מיליוני שורות תצויר מכמה אלפי נקודות בלבד.
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api import types as ptypes
+
+# Resolution name -> (pandas frequency, nominal bucket length)
+RESOLUTIONS = {
+    'hour': ('h', pd.Timedelta(hours=1)),
+    'day': ('D', pd.Timedelta(days=1)),
+    'week': ('W', pd.Timedelta(weeks=1)),
+    'month': ('MS', pd.Timedelta(days=30)),
+}
+
+ROLLUP_STATS = ('sum', 'mean', 'count', 'min', 'max')
+
+# Default number of points a trend chart should draw
+DEFAULT_POINT_BUDGET = 3000
+
+
+def detect_datetime_columns(df, sample_size=200, min_parse_ratio=0.9):
+    """Datetime columns, including text columns that parse as dates"""
+    detected = []
+    for col in df.columns:
+        dtype = df[col].dtype
+        if ptypes.is_datetime64_any_dtype(dtype):
+            detected.append(col)
+        elif ptypes.is_object_dtype(dtype) or ptypes.is_string_dtype(dtype):
+            sample = df[col].dropna().head(sample_size)
+            if sample.empty:
+                continue
+            parsed = pd.to_datetime(sample, errors='coerce', format='mixed')
+            if parsed.notna().mean() >= min_parse_ratio:
+                detected.append(col)
+    return detected
+
+
+class TimeSeriesRollups:
+    """Multi-resolution rollups of every numeric column over one time column"""
+
+    def __init__(self, df, time_col, version=None):
+        self.time_col = time_col
+        self.version = version
+        self.n_rows = len(df)
+
+        timestamps = df[time_col]
+        if not ptypes.is_datetime64_any_dtype(timestamps.dtype):
+            # Text with UTC offsets parses to UTC; text without offsets is kept as is
+            timestamps = pd.to_datetime(timestamps, errors='coerce', format='mixed', utc=True)
+        if timestamps.dt.tz is not None:
+            # Buckets are built on naive UTC timestamps
+            timestamps = timestamps.dt.tz_convert(None)
+        valid = timestamps.notna().to_numpy()
+        timestamps = timestamps[valid]
+
+        self.numeric_cols = [
+            col for col in df.select_dtypes(include=[np.number]).columns if col != time_col
+        ]
+        self.native_step = self._native_step(timestamps)
+
+        # The only pass over the raw rows: aggregate into hourly buckets
+        hours = timestamps.dt.floor('h')
+        frame = df.loc[valid, self.numeric_cols]
+        base = frame.groupby(hours.to_numpy()).agg(['sum', 'count', 'min', 'max'])
+        base.index.name = time_col
+        self._rollups = {'hour': base}
+
+    @staticmethod
+    def _native_step(timestamps, sample_size=10000):
+        """Typical spacing between consecutive observations"""
+        if len(timestamps) < 2:
+            return pd.Timedelta(0)
+        sample = np.sort(timestamps.head(sample_size).to_numpy())
+        steps = np.diff(sample)
+        steps = steps[steps > np.timedelta64(0)]
+        if len(steps) == 0:
+            return pd.Timedelta(0)
+        return pd.Timedelta(np.median(steps.astype('timedelta64[ns]').astype('int64')))
+
+    def _rollup(self, resolution):
+        """Coarser rollups are derived from the hourly table, not from raw rows"""
+        if resolution not in self._rollups:
+            freq = RESOLUTIONS[resolution][0]
+            base = self._rollups['hour']
+            how = {column: ('sum' if column[1] in ('sum', 'count') else column[1])
+                   for column in base.columns}
+            rolled = base.resample(freq).agg(how)
+            rolled = rolled[rolled.xs('count', axis=1, level=1).sum(axis=1) > 0]
+            self._rollups[resolution] = rolled
+        return self._rollups[resolution]
+
+    def available_resolutions(self):
+        """Resolutions that are not finer than the data's own sampling step"""
+        usable = [name for name, (_, length) in RESOLUTIONS.items() if length >= self.native_step]
+        return usable or ['month']
+
+    def bucket_count(self, resolution):
+        return len(self._rollup(resolution))
+
+    def choose_resolution(self, point_budget=DEFAULT_POINT_BUDGET):
+        """Finest usable resolution whose bucket count fits the point budget"""
+        usable = self.available_resolutions()
+        for resolution in usable:
+            if self.bucket_count(resolution) <= point_budget:
+                return resolution
+        return usable[-1]
+
+    def series(self, column, resolution, stat='mean'):
+        """One statistic of one column at the given resolution"""
+        if stat not in ROLLUP_STATS:
+            raise ValueError(f"stat must be one of {ROLLUP_STATS}")
+        table = self._rollup(resolution)
+        if stat == 'mean':
+            count = table[(column, 'count')]
+            result = table[(column, 'sum')] / count.where(count > 0)
+        else:
+            result = table[(column, stat)]
+        return result.rename(column)
+
+    def frame(self, column, resolution):
+        """All rollup statistics of one column as a tidy DataFrame"""
+        return pd.DataFrame({stat: self.series(column, resolution, stat) for stat in ROLLUP_STATS})
+
+    def moving_average(self, column, resolution, window):
+        """Moving average of the bucket means at the given resolution"""
+        return self.series(column, resolution, 'mean').rolling(window=window, min_periods=1).mean()
@@ -0,0 +1,99 @@
+"""
+========================================================================
+                    trends.py - מנוע ניתוח טרנדים וקטורי
+========================================================================
+התאמת קו מגמה לינארי (שיפוע, חותך, R²) ושיעור שינוי אחוזי לכל העמודות
+הנומריות בבת אחת: פתרון ריבועים פחותים אחד במטריצה, עם מסכות לערכים חסרים,
+במקום קריאה ל-polyfit ו-corrcoef עבור כל עמודה בנפרד.
+"""
+
+import numpy as np
+import pandas as pd
+
+# |r| thresholds for the verbal trend strength
+STRONG_TREND = 0.7
+MODERATE_TREND = 0.4
+
+TREND_FIELDS = ('slope', 'intercept', 'r2', 'pct_change', 'n_obs', 'direction', 'strength')
+
+
+def _strength(abs_r):
+    if abs_r > STRONG_TREND:
+        return 'strong'
+    if abs_r > MODERATE_TREND:
+        return 'moderate'
+    return 'weak'
+
+
+def fit_trends(df, columns=None):
+    """
+    Fit a linear trend over the row position for every numeric column.
+
+    All columns are solved together: the least-squares sums are two
+    matrix-vector products over a NaN mask, so missing values only drop
+    out of their own column. Returns one row per column with slope,
+    intercept, R², percent change (first to last observed value), the
+    number of observations used, and a verbal direction and strength.
+    """
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns.tolist()
+    columns = list(columns)
+    if not columns or len(df) == 0:
+        return pd.DataFrame(columns=list(TREND_FIELDS), index=pd.Index(columns, dtype=object))
+
+    values = df[columns].to_numpy(dtype='float64', na_value=np.nan)
+    mask = ~np.isnan(values)
+    n_rows = values.shape[0]
+
+    n_obs = mask.sum(axis=0).astype('float64')
+    safe_n = np.where(n_obs > 0, n_obs, np.nan)
+
+    # Center x and y so the sums stay well conditioned for long series
+    x = np.arange(n_rows, dtype='float64') - (n_rows - 1) / 2.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        y_mean = np.where(mask, values, 0.0).sum(axis=0) / safe_n
+        y = np.where(mask, values - y_mean, 0.0)
+        m = mask.astype('float64')
+
+        sum_x = x @ m
+        sum_xx = (x * x) @ m
+        sum_xy = x @ y
+        sum_yy = (y * y).sum(axis=0)
+        # sum_y is zero after centering on the observed mean
+
+        sxx = sum_xx - sum_x ** 2 / safe_n
+        slope = sum_xy / np.where(sxx > 0, sxx, np.nan)
+        intercept = y_mean - slope * (sum_x / safe_n + (n_rows - 1) / 2.0)
+        r = sum_xy / np.sqrt(np.where(sxx * sum_yy > 0, sxx * sum_yy, np.nan))
+
+        # First and last observed value of every column
+        first_idx = mask.argmax(axis=0)
+        last_idx = n_rows - 1 - mask[::-1].argmax(axis=0)
+        col_idx = np.arange(len(columns))
+        first_val = values[first_idx, col_idx]
+        last_val = values[last_idx, col_idx]
+        pct_change = np.where(first_val != 0, (last_val - first_val) / first_val * 100, 0.0)
+
+    enough = n_obs >= 2
+    slope = np.where(enough, np.nan_to_num(slope, nan=0.0), np.nan)
+    r = np.where(enough, np.nan_to_num(r, nan=0.0), np.nan)
+
+    result = pd.DataFrame({
+        'slope': slope,
+        'intercept': np.where(enough, intercept, np.nan),
+        'r2': r ** 2,
+        'pct_change': np.where(enough, pct_change, np.nan),
+        'n_obs': n_obs.astype('int64'),
+    }, index=pd.Index(columns, dtype=object))
+    result['direction'] = np.select([slope > 0, slope < 0], ['upward', 'downward'], 'flat')
+    result['strength'] = [_strength(abs(val)) for val in np.nan_to_num(r)]
+    result.loc[~enough, ['direction', 'strength']] = None
+    return result
+
+
+def describe_trend(trend):
+    """Verbal summary of one row of fit_trends, e.g. 'Strong upward trend (R²=0.891, +15.3% change)'"""
+    if trend['n_obs'] < 2:
+        return "Insufficient clean data"
+    return (f"{trend['strength'].title()} {trend['direction']} trend "
+            f"(R²={trend['r2']:.3f}, {trend['pct_change']:+.1f}% change)")
@@ -1 +1,45 @@
- 
+"""
+========================================================================
+                    utils.py - כלי עזר משותפים לאפליקציה ולבוט
+========================================================================
+פונקציות עזר קטנות המשמשות גם את אפליקציית Streamlit וגם את בוט הטלגרם
+"""
+
+import hashlib
+import weakref
+
+import pandas as pd
+
+# id(df) -> (weak reference to df, fingerprint)
+_FINGERPRINTS = {}
+
+
+def _compute_fingerprint(df):
+    """Hash the schema and the full contents of a DataFrame"""
+    digest = hashlib.sha1()
+    digest.update(repr(df.shape).encode())
+    digest.update(repr(list(map(str, df.columns))).encode())
+    digest.update(repr([str(dtype) for dtype in df.dtypes]).encode())
+    if len(df) > 0 and len(df.columns) > 0:
+        row_hashes = pd.util.hash_pandas_object(df, index=True)
+        digest.update(row_hashes.to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def dataset_fingerprint(df):
+    """
+    Content fingerprint of a DataFrame, memoized per frame object.
+
+    The app never mutates a loaded frame in place (cleaning steps produce a
+    new frame), so the fingerprint is computed once per object and reused
+    as a cache key by every analysis that runs on it.
+    """
+    key = id(df)
+    entry = _FINGERPRINTS.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+
+    fingerprint = _compute_fingerprint(df)
+    ref = weakref.ref(df, lambda _ref, k=key: _FINGERPRINTS.pop(k, None))
+    _FINGERPRINTS[key] = (ref, fingerprint)
+    return fingerprint